@@ -29,6 +29,7 @@ __all__ = [
     "get_csv_example_filepath",
     "get_xlsx_example_filepath",
     "import_ecoinvent_release",
+    "import_ecoinvent_releases",
     "install_project",
     "lci_matrices_to_excel",
     "lci_matrices_to_matlab",
@@ -45,80 +46,124 @@ __all__ = [
     "unlinked_data",
     "UnlinkedData",
     "useeio20",
+    "write_lci_matrices",
 ]
 
 __version__ = "0.9.17"
 
-from .backup import (
-    backup_data_directory,
-    backup_project_directory,
-    restore_project_directory,
-)
-from .chemidplus import ChemIDPlus
-from .data import (
-    add_ecoinvent_33_biosphere_flows,
-    add_ecoinvent_34_biosphere_flows,
-    add_ecoinvent_35_biosphere_flows,
-    add_ecoinvent_36_biosphere_flows,
-    add_ecoinvent_37_biosphere_flows,
-    add_ecoinvent_38_biosphere_flows,
-    add_ecoinvent_39_biosphere_flows,
-    add_example_database,
-    get_csv_example_filepath,
-    get_xlsx_example_filepath,
-)
-from .export import (
-    DatabaseSelectionToGEXF,
-    DatabaseToGEXF,
-    keyword_to_gephi_graph,
-    lci_matrices_to_excel,
-    lci_matrices_to_matlab,
-)
-from .importers import (
-    CSVImporter,
-    CSVLCIAImporter,
-    Ecospold1LCIAImporter,
-    ExcelImporter,
-    ExcelLCIAImporter,
-    Exiobase3HybridImporter,
-    Exiobase3MonetaryImporter,
-    MultiOutputEcospold1Importer,
-    SimaProCSVImporter,
-    SimaProLCIACSVImporter,
-    SingleOutputEcospold1Importer,
-    SingleOutputEcospold2Importer,
-)
-from .migrations import Migration, create_core_migrations, migrations
-from .package import BW2Package
-from .remote import install_project
-from .units import normalize_units
-from .unlinked_data import UnlinkedData, unlinked_data
-from .utils import activity_hash, es2_activity_hash, load_json_data_file
-
-try:
-    from .importers import SimaProBlockCSVImporter
-
+import importlib
+import importlib.util
+import sys
+import types
+
+# Public names, and the modules which define them. These are only imported on
+# first access (PEP 562), as importing them pulls in ``bw2data``, ``scipy``, and
+# more; ``import bw2io`` itself is nearly free.
+_LAZY = {
+    "backup_data_directory": ".backup",
+    "backup_project_directory": ".backup",
+    "restore_project_directory": ".backup",
+    "ChemIDPlus": ".chemidplus",
+    "add_ecoinvent_33_biosphere_flows": ".data",
+    "add_ecoinvent_34_biosphere_flows": ".data",
+    "add_ecoinvent_35_biosphere_flows": ".data",
+    "add_ecoinvent_36_biosphere_flows": ".data",
+    "add_ecoinvent_37_biosphere_flows": ".data",
+    "add_ecoinvent_38_biosphere_flows": ".data",
+    "add_ecoinvent_39_biosphere_flows": ".data",
+    "add_example_database": ".data",
+    "get_csv_example_filepath": ".data",
+    "get_xlsx_example_filepath": ".data",
+    "DatabaseSelectionToGEXF": ".export",
+    "DatabaseToGEXF": ".export",
+    "keyword_to_gephi_graph": ".export",
+    "lci_matrices_to_excel": ".export",
+    "lci_matrices_to_matlab": ".export",
+    "write_lci_matrices": ".export",
+    "CSVImporter": ".importers",
+    "CSVLCIAImporter": ".importers",
+    "Ecospold1LCIAImporter": ".importers",
+    "ExcelImporter": ".importers",
+    "ExcelLCIAImporter": ".importers",
+    "Exiobase3HybridImporter": ".importers",
+    "Exiobase3MonetaryImporter": ".importers",
+    "MultiOutputEcospold1Importer": ".importers",
+    "SimaProBlockCSVImporter": ".importers",
+    "SimaProCSVImporter": ".importers",
+    "SimaProLCIACSVImporter": ".importers",
+    "SingleOutputEcospold1Importer": ".importers",
+    "SingleOutputEcospold2Importer": ".importers",
+    "Migration": ".migrations",
+    "create_core_migrations": ".migrations",
+    "migrations": ".migrations",
+    "BW2Package": ".package",
+    "install_project": ".remote",
+    "normalize_units": ".units",
+    "UnlinkedData": ".unlinked_data",
+    "unlinked_data": ".unlinked_data",
+    "activity_hash": ".utils",
+    "es2_activity_hash": ".utils",
+    "load_json_data_file": ".utils",
+    "import_ecoinvent_release": ".ecoinvent",
+    "import_ecoinvent_releases": ".ecoinvent",
+    # Imported from ``bw2data`` by earlier versions, and used as ``bw2io.databases``
+    "config": "bw2data",
+    "databases": "bw2data",
+}
+
+# Only available with the optional dependencies; find them without importing them
+if all(
+    importlib.util.find_spec(name) for name in ("bw_simapro_csv", "multifunctional")
+):
     __all__.append("SimaProBlockCSVImporter")
-except ImportError:
-    pass
 
-try:
-    from .ecoinvent import import_ecoinvent_release
-except ImportError:
+
+def _import_ecoinvent_release_missing(*args, **kwargs):
     import warnings
 
-    def import_ecoinvent_release(*args, **kwargs):
-        warnings.warn("Please install `ecoinvent_interface` to use this function")
+    warnings.warn("Please install `ecoinvent_interface` to use this function")
+
+
+def __getattr__(name):
+    try:
+        module_name = _LAZY[name]
+    except KeyError:
+        # Submodules, like ``bw2io.strategies``, used to be imported with the public API
+        try:
+            return importlib.import_module("." + name, __name__)
+        except ModuleNotFoundError as err:
+            if err.name != "{}.{}".format(__name__, name):
+                raise
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
 
+    try:
+        module = importlib.import_module(module_name, __name__)
+        value = getattr(module, name)
+    except AttributeError:
+        # `SimaProBlockCSVImporter` without its optional dependencies
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+    if module_name == ".ecoinvent" and module.ei is None:
+        value = _import_ecoinvent_release_missing
+    globals()[name] = value
+    return value
 
-from bw2data import config, databases
 
-config.metadata.extend(
-    [
-        migrations,
-        unlinked_data,
-    ]
-)
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY))
+
+
+class _Module(types.ModuleType):
+    def __setattr__(self, name, value):
+        # Importing the submodules ``bw2io.migrations`` and ``bw2io.unlinked_data``
+        # binds them to the package, but these names belong to the objects they define
+        if name in ("migrations", "unlinked_data") and isinstance(
+            value, types.ModuleType
+        ):
+            value = getattr(value, name)
+        super().__setattr__(name, value)
+
+
+sys.modules[__name__].__class__ = _Module
 
 
 def create_default_biosphere3(overwrite=False):
@@ -161,6 +206,10 @@ def create_default_lcia_methods(
 
 
 def bw2setup():
+    from bw2data import databases
+
+    from .migrations import create_core_migrations
+
     if "biosphere3" in databases:
         print("Biosphere database already present!!! No setup is needed")
         return
@@ -176,19 +225,21 @@ def useeio20(name="USEEIO-2.0", collapse_products=False, prune=False):
     """"""
     URL = "https://www.lcacommons.gov/lca-collaboration/ws/public/download/json/repository_US_Environmental_Protection_Agency@USEEIO_v2"
 
-    if name in databases:
-        print(f"{name} already present")
-        return
-
     import tempfile
     import zipfile
     from pathlib import Path
 
+    from bw2data import databases
+
     from .download_utils import download_with_progressbar
     from .importers.json_ld import JSONLDImporter
     from .importers.json_ld_lcia import JSONLDLCIAImporter
     from .strategies import remove_random_exchanges, remove_useeio_products
 
+    if name in databases:
+        print(f"{name} already present")
+        return
+
     with tempfile.TemporaryDirectory() as td:
         dp = Path(td)
         print("Downloading US EEIO 2.0")
@@ -229,6 +280,7 @@ def exiobase_monetary(
     from pathlib import Path
 
     from .download_utils import download_with_progressbar
+    from .importers import Exiobase3MonetaryImporter
 
     mapping = {
         (3, 8, 2): {
@@ -0,0 +1,598 @@
+"""Bulk read and write helpers working directly on the ``bw2data`` SQLite tables.
+
+These skip the ORM proxies (``Activity``, ``Exchange``) and issue a few batched
+queries instead of one (or more) query per node.
+
+"""
+
+import itertools
+import threading
+from collections import OrderedDict, defaultdict
+from queue import Queue
+from typing import Iterable, Iterator, List, Sequence
+
+from bw2data import calculation_setups, databases, geomapping, labels, projects
+from bw2data.backends import sqlite3_lci_db
+from bw2data.backends.schema import ActivityDataset, ExchangeDataset
+from bw2data.backends.typos import (
+    check_activity_keys,
+    check_activity_type,
+    check_exchange_keys,
+    check_exchange_type,
+)
+from bw2data.backends.utils import dict_as_activitydataset, dict_as_exchangedataset
+from bw2data.errors import InvalidExchange, UnknownObject, UntypedExchange
+from bw2data.search import IndexManager
+from bw2data.signals import (
+    on_database_delete,
+    on_database_reset,
+    on_database_write,
+    project_changed,
+)
+from bw2data.utils import (
+    as_uncertainty_dict,
+    get_geocollection,
+    set_correct_process_type,
+)
+
+# SQLite has a limit on the number of variables in one query
+# 7 fields * 125 rows for ``insert_many``, and 500 values for ``<<``
+INSERT_CHUNK_SIZE = 125
+SELECT_CHUNK_SIZE = 500
+
+# ``ActivityDataset`` columns; ``product`` is the ``reference product``
+NODE_COLUMNS = ("id", "code", "database", "location", "name", "product", "type")
+
+# Least recently used ``{(project directory, database, fields): (version, rows)}``
+PROJECTION_CACHE_SIZE = 8
+_projections = OrderedDict()
+_projections_lock = threading.Lock()
+
+
+def clear_projections(*args, name: str = None, **kwargs) -> None:
+    """Remove the cached ``project_nodes`` results of database ``name``, or all of them.
+
+    Connected to the ``bw2data`` signals sent when a database is deleted or the
+    project is changed."""
+    with _projections_lock:
+        for key in list(_projections):
+            if name is None or key[1] == name:
+                del _projections[key]
+
+
+on_database_delete.connect(clear_projections)
+on_database_reset.connect(clear_projections)
+project_changed.connect(clear_projections)
+
+
+def chunked(iterable: Iterable, size: int) -> Iterator[list]:
+    """Yield successive lists of length ``size`` (the last one can be shorter)."""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _insert_many(model, rows: List[dict]) -> None:
+    for chunk in chunked(rows, INSERT_CHUNK_SIZE):
+        model.insert_many(chunk).execute()
+
+
+def _split_dataset(ds: dict, check_typos: bool = True) -> (dict, List[dict]):
+    """Split ``ds`` into node document and edge documents, validated like
+    ``SQLiteBackend.write``."""
+    key = (ds["database"], ds["code"])
+    edges = []
+    for exc in ds.get("exchanges", []):
+        if "input" not in exc or "amount" not in exc:
+            raise InvalidExchange
+        if "type" not in exc:
+            raise UntypedExchange
+        if check_typos:
+            check_exchange_type(exc.get("type"))
+            check_exchange_keys(exc)
+        if "output" not in exc:
+            exc["output"] = key
+        edges.append(exc)
+
+    node = {k: v for k, v in ds.items() if k != "exchanges"}
+    if check_typos:
+        check_activity_type(node.get("type"))
+        check_activity_keys(node)
+    return node, edges
+
+
+def _edge_sort_key(edge: dict) -> str:
+    return repr(sorted(edge.items(), key=lambda item: item[0]))
+
+
+def _same_edges(stored: List[dict], edges: List[dict]) -> bool:
+    """Compare edge documents regardless of their order."""
+    if stored == edges:
+        return True
+    elif len(stored) != len(edges):
+        return False
+    return sorted(stored, key=_edge_sort_key) == sorted(edges, key=_edge_sort_key)
+
+
+def load_nodes_and_edges(database: str, codes: Iterable[str]) -> (dict, dict):
+    """Load stored node documents and outgoing edges for ``codes`` in ``database``.
+
+    Returns ``({code: (id, node document)}, {code: [edge documents]})``. Unlike
+    ``Database.load``, only the given nodes are read."""
+    nodes, edges = {}, defaultdict(list)
+    for chunk in chunked(codes, SELECT_CHUNK_SIZE):
+        for id_, code, data in (
+            ActivityDataset.select(
+                ActivityDataset.id, ActivityDataset.code, ActivityDataset.data
+            )
+            .where(ActivityDataset.database == database, ActivityDataset.code << chunk)
+            .tuples()
+        ):
+            nodes[code] = (id_, data)
+        for code, data in (
+            ExchangeDataset.select(ExchangeDataset.output_code, ExchangeDataset.data)
+            .where(
+                ExchangeDataset.output_database == database,
+                ExchangeDataset.output_code << chunk,
+            )
+            .tuples()
+        ):
+            edges[code].append(data)
+    return nodes, edges
+
+
+def get_id_mapping(database_names: Iterable[str]) -> dict:
+    """Return ``{(database, code): id}`` for all nodes in ``database_names``."""
+    mapping = {}
+    for chunk in chunked(database_names, SELECT_CHUNK_SIZE):
+        mapping.update(
+            ((database, code), id_)
+            for id_, database, code in ActivityDataset.select(
+                ActivityDataset.id, ActivityDataset.database, ActivityDataset.code
+            )
+            .where(ActivityDataset.database << chunk)
+            .tuples()
+        )
+    return mapping
+
+
+def project_nodes(database: str, fields: Sequence[str] = ("code",)) -> tuple:
+    """Return a tuple of ``fields`` value tuples for every node in ``database``.
+
+    Fields in ``NODE_COLUMNS`` are selected directly from the ``ActivityDataset``
+    table, in one query, without creating ``Activity`` proxies. Other fields, like
+    ``categories``, are read from the node documents (``None`` if missing), which
+    are only loaded if such a field is requested.
+
+    Results are cached per project, database and ``fields`` until the database is
+    modified or its number of nodes changes. They are shared between callers, and
+    must not be modified. Only the ``PROJECTION_CACHE_SIZE`` most recently used
+    results are kept. Returns an empty tuple if ``database`` doesn't exist."""
+    if database not in databases:
+        return ()
+    fields = tuple(fields)
+    version = (
+        databases[database].get("modified"),
+        ActivityDataset.select().where(ActivityDataset.database == database).count(),
+    )
+    cache_key = (str(projects.dir), database, fields)
+    with _projections_lock:
+        cached = _projections.get(cache_key)
+        if cached is not None and cached[0] == version:
+            _projections.move_to_end(cache_key)
+            return cached[1]
+
+    columns = [field for field in fields if field in NODE_COLUMNS]
+    document_fields = [field for field in fields if field not in NODE_COLUMNS]
+    selected = [getattr(ActivityDataset, field) for field in columns]
+    if document_fields:
+        selected.append(ActivityDataset.data)
+    query = (
+        ActivityDataset.select(*selected)
+        .where(ActivityDataset.database == database)
+        .tuples()
+    )
+
+    if not document_fields:
+        rows = tuple(query)
+    else:
+        rows = []
+        for row in query:
+            values = dict(zip(columns, row))
+            document = row[-1] if document_fields else {}
+            rows.append(
+                tuple(
+                    values[field] if field in values else document.get(field)
+                    for field in fields
+                )
+            )
+        rows = tuple(rows)
+
+    with _projections_lock:
+        _projections[cache_key] = (version, rows)
+        _projections.move_to_end(cache_key)
+        while len(_projections) > PROJECTION_CACHE_SIZE:
+            _projections.popitem(last=False)
+    return rows
+
+
+def upsert_nodes(
+    db,
+    data: List[dict],
+    searchable: bool = True,
+    check_typos: bool = True,
+    process: bool = True,
+    signal: bool = None,
+) -> dict:
+    """Insert or update the nodes in ``data`` without rewriting the rest of ``db``.
+
+    ``db`` is an existing SQLite ``Database``; ``data`` is a list of datasets with
+    their ``exchanges``. Incoming datasets are compared to the stored ones by key
+    and content:
+
+    * Nodes not yet in ``db`` are inserted with their edges
+    * Nodes whose document or edges changed are updated, keeping their ``id``, and
+      their edges are replaced
+    * Nodes with identical content are not touched, even if their edges are in a
+      different order
+
+    Nodes in ``db`` but not in ``data`` are kept, like ``write_database`` with
+    ``delete_existing=False``. All writes happen in one transaction. The search
+    index is only updated for inserted and changed nodes, and the database is only
+    processed if something changed.
+
+    Like ``Database.write``, ``on_database_write`` is sent after a change if
+    ``signal``, which defaults to whether the project is sourced (has revisions).
+
+    Returns a dict with the number of ``inserted``, ``updated`` and ``unchanged``
+    nodes."""
+    data = [set_correct_process_type(ds) for ds in data]
+    stored_nodes, stored_edges = load_nodes_and_edges(
+        db.name, [ds["code"] for ds in data]
+    )
+
+    new_nodes, new_edges, changed_nodes, changed_edges = [], [], [], []
+    unchanged = 0
+    for ds in data:
+        node, edges = _split_dataset(ds, check_typos)
+        if ds["code"] not in stored_nodes:
+            new_nodes.append(dict_as_activitydataset(node, add_snowflake_id=True))
+            new_edges.extend(dict_as_exchangedataset(exc) for exc in edges)
+        elif stored_nodes[ds["code"]][1] == node and _same_edges(
+            stored_edges[ds["code"]], edges
+        ):
+            unchanged += 1
+        else:
+            row = dict_as_activitydataset(node)
+            row["id"] = stored_nodes[ds["code"]][0]
+            changed_nodes.append(row)
+            changed_edges.extend(dict_as_exchangedataset(exc) for exc in edges)
+
+    if new_nodes or changed_nodes:
+        with sqlite3_lci_db.transaction():
+            for chunk in chunked(changed_nodes, SELECT_CHUNK_SIZE):
+                ActivityDataset.delete().where(
+                    ActivityDataset.id << [row["id"] for row in chunk]
+                ).execute()
+                ExchangeDataset.delete().where(
+                    ExchangeDataset.output_database == db.name,
+                    ExchangeDataset.output_code << [row["code"] for row in chunk],
+                ).execute()
+            _insert_many(ActivityDataset, new_nodes + changed_nodes)
+            _insert_many(ExchangeDataset, new_edges + changed_edges)
+
+        _update_metadata(db, [row["data"] for row in new_nodes + changed_nodes])
+        _update_search_index(
+            db,
+            inserted=[row["data"] for row in new_nodes],
+            updated=[row["data"] for row in changed_nodes],
+            searchable=searchable,
+        )
+        if process:
+            db.process()
+        _send_write_signal(db, signal)
+
+    return {
+        "inserted": len(new_nodes),
+        "updated": len(changed_nodes),
+        "unchanged": unchanged,
+    }
+
+
+def append_nodes(
+    db,
+    data: List[dict],
+    searchable: bool = True,
+    check_typos: bool = True,
+    process: bool = True,
+    signal: bool = None,
+) -> List[dict]:
+    """Add the nodes in ``data`` which aren't in ``db`` yet, with their edges.
+
+    ``db`` is an existing SQLite ``Database``; ``data`` is a list of datasets, whose
+    ``database`` is set to ``db.name``. Datasets whose ``code`` is already in ``db``
+    are skipped; stored nodes are never changed, see ``upsert_nodes`` for that.
+
+    Replaces ``db.new_activity(**ds).save()`` in a loop, which is a transaction and
+    a search index update per node: all nodes are inserted in one transaction, the
+    search index is updated once, and the database is processed once (if
+    ``process``; otherwise it is marked as dirty). ``signal`` is as in
+    ``upsert_nodes``.
+
+    Returns the added datasets."""
+    existing = {code for (code,) in project_nodes(db.name)}
+    new, seen = [], set()
+    for ds in data:
+        if ds["code"] in existing or ds["code"] in seen:
+            continue
+        seen.add(ds["code"])
+        ds["database"] = db.name
+        new.append(set_correct_process_type(ds))
+    if not new:
+        return new
+
+    nodes, edges = [], []
+    for ds in new:
+        node, node_edges = _split_dataset(ds, check_typos)
+        nodes.append(dict_as_activitydataset(node, add_snowflake_id=True))
+        edges.extend(dict_as_exchangedataset(exc) for exc in node_edges)
+    with sqlite3_lci_db.transaction():
+        _insert_many(ActivityDataset, nodes)
+        _insert_many(ExchangeDataset, edges)
+
+    _update_metadata(db, [row["data"] for row in nodes])
+    _update_search_index(
+        db, inserted=[row["data"] for row in nodes], updated=[], searchable=searchable
+    )
+    if process:
+        db.process()
+    else:
+        databases.set_dirty(db.name)
+    _send_write_signal(db, signal)
+    return new
+
+
+class _Abort(Exception):
+    pass
+
+
+# Queue sentinels
+_DONE, _ABORT = object(), object()
+
+
+def write_nodes_pipelined(
+    db,
+    datasets: Iterable[dict],
+    searchable: bool = True,
+    check_typos: bool = True,
+    process: bool = True,
+    queue_size: int = 1000,
+    signal: bool = None,
+) -> List[dict]:
+    """Replace the contents of ``db`` with ``datasets`` while they are produced.
+
+    ``datasets`` is normally a generator which does CPU-bound work (e.g. applying
+    strategies) on each dataset. Datasets are passed through a bounded queue to a
+    writer thread, which inserts them in batches in one transaction, so writing
+    overlaps with the production of the next datasets.
+
+    If the generator or the writer raises an error, the transaction is rolled back
+    and the previous contents of ``db`` are kept, including its search index and
+    the calculation setups which use its nodes. These are only updated after the
+    new contents are committed. ``signal`` is as in ``upsert_nodes``.
+
+    Returns the list of written datasets."""
+    queue = Queue(maxsize=queue_size)
+    errors = []
+    previous = list(
+        ActivityDataset.select(ActivityDataset.id, ActivityDataset.code)
+        .where(ActivityDataset.database == db.name)
+        .tuples()
+    )
+
+    def writer():
+        nodes, edges = [], []
+        try:
+            with sqlite3_lci_db.atomic():
+                # Only the rows; everything else is updated after the commit
+                ActivityDataset.delete().where(
+                    ActivityDataset.database == db.name
+                ).execute()
+                ExchangeDataset.delete().where(
+                    ExchangeDataset.output_database == db.name
+                ).execute()
+                while True:
+                    ds = queue.get()
+                    if ds is _ABORT:
+                        raise _Abort
+                    elif ds is _DONE:
+                        break
+                    node, node_edges = _split_dataset(
+                        set_correct_process_type(ds), check_typos
+                    )
+                    nodes.append(dict_as_activitydataset(node, add_snowflake_id=True))
+                    edges.extend(dict_as_exchangedataset(exc) for exc in node_edges)
+                    if len(nodes) >= INSERT_CHUNK_SIZE:
+                        _insert_many(ActivityDataset, nodes)
+                        nodes = []
+                    if len(edges) >= INSERT_CHUNK_SIZE:
+                        _insert_many(ExchangeDataset, edges)
+                        edges = []
+                _insert_many(ActivityDataset, nodes)
+                _insert_many(ExchangeDataset, edges)
+        except _Abort:
+            pass
+        except Exception as err:
+            errors.append(err)
+            # Keep consuming so that the producer can't block on a full queue
+            while queue.get() not in (_DONE, _ABORT):
+                pass
+        finally:
+            # Connections are per thread
+            sqlite3_lci_db.db.close()
+
+    thread = threading.Thread(target=writer, daemon=True)
+    thread.start()
+    written = []
+    try:
+        for ds in datasets:
+            if errors:
+                break
+            queue.put(ds)
+            written.append(ds)
+    except BaseException:
+        queue.put(_ABORT)
+        thread.join()
+        raise
+    queue.put(_DONE)
+    thread.join()
+    if errors:
+        raise errors[0]
+
+    _purge_calculation_setups(
+        {id_ for id_, _ in previous} | {(db.name, code) for _, code in previous}
+    )
+    _update_metadata(db, written, reset=True)
+    if searchable:
+        db.make_searchable(reset=True, signal=False)
+    else:
+        IndexManager(db.filename).delete_database()
+    if process:
+        db.process()
+    _send_write_signal(db, signal)
+    return written
+
+
+def _send_write_signal(db, signal: bool = None) -> None:
+    """Send ``on_database_write`` for ``db`` under the same condition as
+    ``Database.write``, so that sourced projects record a revision."""
+    if signal is None:
+        signal = projects.dataset.is_sourced
+    if signal:
+        on_database_write.send(name=db.name)
+
+
+def _purge_calculation_setups(removed: set) -> None:
+    """Remove the node ids and keys in ``removed`` from the calculation setups, like
+    ``Database.delete``."""
+    for setup in calculation_setups.values():
+        if any(key in removed for func_unit in setup["inv"] for key in func_unit):
+            setup["inv"] = [
+                purged
+                for purged in (
+                    {key: value for key, value in dct.items() if key not in removed}
+                    for dct in setup["inv"]
+                )
+                if purged
+            ]
+    calculation_setups.flush()
+
+
+def _update_metadata(db, nodes: List[dict], reset: bool = False) -> None:
+    """Update the ``databases`` entry of ``db`` after writing ``nodes``.
+
+    If ``reset``, ``nodes`` is the complete database."""
+    metadata = databases[db.name]
+    metadata["number"] = (
+        ActivityDataset.select().where(ActivityDataset.database == db.name).count()
+    )
+    geocollections = set([] if reset else metadata.get("geocollections") or []).union(
+        get_geocollection(node.get("location"))
+        for node in nodes
+        if node.get("type") in labels.process_node_types
+    )
+    geocollections.discard(None)
+    metadata["geocollections"] = sorted(geocollections)
+    geomapping.add({node["location"] for node in nodes if node.get("location")})
+    databases.set_modified(db.name)
+
+
+def _update_search_index(
+    db, inserted: List[dict], updated: List[dict], searchable: bool = True
+) -> None:
+    if not searchable:
+        return
+    if not databases[db.name].get("searchable"):
+        # Build full index once
+        db.make_searchable(reset=True, signal=False)
+        return
+    index = IndexManager(db.filename)
+    for node in updated:
+        index.update_dataset(node)
+    if inserted:
+        index.add_datasets(inserted)
+
+
+def write_nodes_as_datapackage(
+    db,
+    data: List[dict],
+    searchable: bool = True,
+    check_typos: bool = True,
+    signal: bool = None,
+) -> None:
+    """Write ``data`` to ``db``, an ``IOTableBackend`` database, without edge tables.
+
+    Node documents (without ``exchanges``) are stored in SQLite as usual, but edges are
+    written directly to the processed ``bw_processing`` datapackage, using the same
+    rules as ``SQLiteBackend.process``. This is faster and takes less disk space, but
+    edges can't be edited or queried through ``bw2data`` afterwards.
+
+    All edges must be linked to existing nodes. ``signal`` is passed to ``db.write``,
+    which sends ``on_database_write`` for the nodes; ``bw2data`` doesn't allow
+    ``IOTableBackend`` databases in sourced projects."""
+    data = [set_correct_process_type(ds) for ds in data]
+    split = [_split_dataset(ds, check_typos) for ds in data]
+    db.write(
+        {(node["database"], node["code"]): node for node, _ in split},
+        searchable=searchable,
+        check_typos=check_typos,
+        signal=signal,
+    )
+
+    dependents = {exc["input"][0] for _, edges in split for exc in edges}
+    ids = get_id_mapping(dependents.union({db.name}))
+
+    def get_id(key):
+        try:
+            return ids[tuple(key)]
+        except KeyError:
+            raise UnknownObject(
+                "Exchange input {} is unknown (i.e. doesn't exist as a node)".format(
+                    key
+                )
+            )
+
+    technosphere, biosphere = [], []
+    for node, edges in split:
+        if node.get("type") not in labels.process_node_types:
+            continue
+        col = ids[(node["database"], node["code"])]
+        has_production = False
+        for exc in edges:
+            if exc["type"] in labels.biosphere_edge_types:
+                target, flip = biosphere, False
+            elif exc["type"] in labels.technosphere_negative_edge_types:
+                target, flip = technosphere, True
+            elif exc["type"] in labels.technosphere_positive_edge_types:
+                target, flip = technosphere, False
+                has_production = True
+            else:
+                continue
+            target.append(
+                {
+                    **as_uncertainty_dict(exc),
+                    "row": get_id(exc["input"]),
+                    "col": col,
+                    "flip": flip,
+                }
+            )
+        if (
+            not has_production
+            and node.get("type") in labels.implicit_production_allowed_node_types
+        ):
+            technosphere.append({"row": col, "col": col, "amount": 1})
+
+    db.write_exchanges(technosphere, biosphere, dependents)
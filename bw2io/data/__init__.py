@@ -10,6 +10,7 @@ from bw2data import Database, Method, config, databases, methods, parameters
 from bw2data.parameters import Group
 from openpyxl import load_workbook
 
+from ..bulk import append_nodes
 from ..compatibility import ECOSPOLD_2_3_BIOSPHERE, SIMAPRO_BIOSPHERE
 from ..units import normalize_units
 
@@ -319,15 +320,12 @@ def _add_new_ecoinvent_biosphere_flows(version):
     )
 
     db = Database(config.biosphere)
-    count = 0
 
     for flow in flows:
         flow["categories"] = tuple(flow["categories"])
-        if (config.biosphere, flow["code"]) not in db:
-            count += 1
-            db.new_activity(**flow).save()
+    added = append_nodes(db, flows)
 
-    print("Added {} new biosphere flows".format(count))
+    print("Added {} new biosphere flows".format(len(added)))
     return db
 
 
@@ -0,0 +1,144 @@
+import contextlib
+import json
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Any, Optional, Union
+
+from bw2data.logs import close_log, get_io_logger
+
+from .utils import format_for_logging
+
+# Fields of each record
+FIELDS = ("source", "kind", "message", "dataset", "obj")
+
+_active = threading.local()
+
+
+class Diagnostics(object):
+    """
+    Buffered collector of issues found during extraction and by strategies.
+
+    Recording an issue only appends a tuple with references to its (constant) message
+    and offending object; nothing is formatted or written until the records are exported
+    with ``to_jsonl`` or ``write_log``. The objects aren't copied, so they should not be
+    changed afterwards; purged exchanges, for example, aren't.
+
+    Importers collect the issues of their strategies in ``importer.diagnostics``, see
+    ``collecting``. Each record is a tuple of ``FIELDS``:
+
+    * source: Name of the strategy or extractor
+    * kind: Short label of the issue, e.g. "purged-unlinked-exchange"
+    * message: Human-readable description, the same for each issue of this kind
+    * dataset: Identifier of the affected dataset, e.g. its filename, or None
+    * obj: The offending object, e.g. an exchange, or None
+
+    """
+
+    def __init__(self):
+        self.records = []
+        self.source = None
+        self.logfile = None
+
+    def record(self, kind: str, message: str, obj: Any = None, dataset: Any = None):
+        self.records.append((self.source, kind, message, dataset, obj))
+
+    def __iter__(self):
+        return iter(self.records)
+
+    def __len__(self):
+        return len(self.records)
+
+    def filter(self, source: Optional[str] = None, kind: Optional[str] = None) -> list:
+        """Return the records with the given ``source`` and/or ``kind``."""
+        return [
+            record
+            for record in self.records
+            if (source is None or record[0] == source)
+            and (kind is None or record[1] == kind)
+        ]
+
+    def counts(self) -> Counter:
+        """Count records by ``(source, kind)``."""
+        return Counter((record[0], record[1]) for record in self.records)
+
+    def clear(self):
+        self.records = []
+
+    def to_jsonl(self, filepath: Union[str, Path]) -> Path:
+        """
+        Write the records to ``filepath`` as JSON lines, with the keys ``FIELDS``.
+
+        Values which JSON can't represent, like ``(database, code)`` keys, are written
+        as lists or strings.
+
+        Returns the filepath.
+
+        """
+        filepath = Path(filepath)
+        with open(filepath, "w", encoding="utf-8") as f:
+            for record in self.records:
+                f.write(json.dumps(dict(zip(FIELDS, record)), default=str))
+                f.write("\n")
+        return filepath
+
+    def write_log(self, name: str) -> Path:
+        """Write the formatted records to a new log file, and return its path."""
+        log, logfile = get_io_logger(name)
+        log.info("\n".join(format_record(record) for record in self.records))
+        close_log(log)
+        self.logfile = logfile
+        return logfile
+
+
+def format_record(record: tuple) -> str:
+    """Format a record as text, like the log files of earlier versions."""
+    source, kind, message, dataset, obj = record
+    lines = [message + ":"]
+    if dataset is not None:
+        lines.append("Filename: {}".format(dataset))
+    if obj is not None:
+        lines.append(format_for_logging(obj))
+    return "\n".join(lines)
+
+
+def active_diagnostics() -> Optional[Diagnostics]:
+    """Return the ``Diagnostics`` which is currently collecting issues, if any."""
+    return getattr(_active, "diagnostics", None)
+
+
+@contextlib.contextmanager
+def collecting(diagnostics: Diagnostics, source: str):
+    """
+    Make ``diagnostics`` collect the issues recorded in this thread, from ``source``.
+
+    Used by importers around each strategy; can be nested.
+
+    """
+    previous, previous_source = active_diagnostics(), diagnostics.source
+    _active.diagnostics, diagnostics.source = diagnostics, source
+    try:
+        yield diagnostics
+    finally:
+        _active.diagnostics, diagnostics.source = previous, previous_source
+
+
+@contextlib.contextmanager
+def diagnostics_or_log(name: str):
+    """
+    Yield the active ``Diagnostics``, or, if there is none, a new one whose records are
+    written to a log file called ``name`` afterwards.
+
+    The log file is only created if something was recorded; its path is then in the
+    ``logfile`` attribute.
+
+    """
+    diagnostics = active_diagnostics()
+    if diagnostics is not None:
+        yield diagnostics
+        return
+    diagnostics = Diagnostics()
+    diagnostics.source = name
+    yield diagnostics
+    if diagnostics.records:
+        diagnostics.write_log(name)
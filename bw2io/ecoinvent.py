@@ -1,17 +1,53 @@
+import filecmp
+import gzip
+import json
+import os
 import re
+import tempfile
+import threading
 import zipfile
 from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+from itertools import groupby
+from operator import itemgetter
 from pathlib import Path
-from typing import Any, Optional
+from time import perf_counter
+from typing import Any, Optional, Sequence
 
 import bw2data as bd
-import ecoinvent_interface as ei
-from ecoinvent_interface.core import SYSTEM_MODELS
-from ecoinvent_interface.string_distance import damerau_levenshtein
 
-from .extractors import ExcelExtractor
+try:
+    import ecoinvent_interface as ei
+    from ecoinvent_interface.core import SYSTEM_MODELS
+    from ecoinvent_interface.string_distance import damerau_levenshtein
+except ImportError:
+    # Needed to download the releases and to match misspelled flow names; the
+    # functions which parse and link local files work without it
+    ei = None
+
+from .bulk import append_nodes, project_nodes
+from .extractors import Ecospold2DataExtractor, ExcelExtractor
 from .importers import Ecospold2BiosphereImporter, SingleOutputEcospold2Importer
 
+# Columns read from the LCIA workbook, in the order used for linking
+LCIA_UNIT_COLUMNS = ("method", "category", "indicator")
+LCIA_CF_COLUMNS = (
+    "method",
+    "category",
+    "indicator",
+    "name",
+    "compartment",
+    "subcompartment",
+)
+CF_COLUMN_LABELS = {
+    "3.4": "cf 3.4",
+    "3.5": "cf 3.5",
+    "3.6": "cf 3.6",
+}
+# Change when the cached form of the LCIA workbook changes
+LCIA_CACHE_FORMAT = 1
+
 
 def get_excel_sheet_names(file_path: Path) -> list[str]:
     """Read XML metadata file instead of using openpyxl, which loads the whole workbook.
@@ -26,14 +62,6 @@ def get_excel_sheet_names(file_path: Path) -> list[str]:
     return sheets
 
 
-def header_dict(array: list) -> list[dict]:
-    return [
-        {header.lower(): value for header, value in zip(array[0], row)}
-        for row in array[1:]
-        if any(row)
-    ]
-
-
 def drop_unspecified(a: str, b: str, c: str) -> tuple:
     if c.lower() == "unspecified":
         return (a, b)
@@ -49,6 +77,334 @@ def pick_a_unit_label_already(obj: dict) -> str:
     raise KeyError("Can't find suitable column label for LCIA units")
 
 
+class StageTimer:
+    """
+    Record when each stage of an import starts and ends, in seconds since the timer was
+    created.
+
+    Stages can run in different threads; ``report`` lists them by start time, so stages
+    which overlapped, and the critical path, can be seen.
+    """
+
+    def __init__(self):
+        self.origin = perf_counter()
+        self.timings = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        start = perf_counter() - self.origin
+        try:
+            yield
+        finally:
+            self.timings[name] = (start, perf_counter() - self.origin)
+
+    def report(self) -> str:
+        lines = ["Stage timings in seconds (start - end, duration):"]
+        for name, (start, end) in sorted(self.timings.items(), key=lambda x: x[1]):
+            lines.append(f"\t{name}: {start:.2f} - {end:.2f} ({end - start:.2f})")
+        return "\n".join(lines)
+
+
+def _submit(executor, timer: StageTimer, name: str, func, *args) -> Future:
+    """
+    Run ``func(*args)`` as the stage ``name`` in ``executor``, or right away if
+    ``executor`` is None.
+    """
+
+    def stage():
+        with timer.stage(name):
+            return func(*args)
+
+    if executor is not None:
+        return executor.submit(stage)
+    future = Future()
+    try:
+        future.set_result(stage())
+    except Exception as err:
+        future.set_exception(err)
+    return future
+
+
+def _parse_biosphere(filepath: Path, biosphere_name: str) -> Ecospold2BiosphereImporter:
+    eb = Ecospold2BiosphereImporter(name=biosphere_name, filepath=filepath)
+    eb.apply_strategies()
+    if not eb.all_linked:
+        raise ValueError(
+            f"Can't ingest biosphere database {biosphere_name} - unlinked flows."
+        )
+    return eb
+
+
+def _write_biosphere(
+    eb: Ecospold2BiosphereImporter, biosphere_name: str, biosphere_write_mode: str
+) -> None:
+    if biosphere_name not in bd.databases or biosphere_write_mode == "replace":
+        eb.write_database(overwrite=False)
+    else:
+        existing = {code for (code,) in project_nodes(biosphere_name)}
+        new = [flow for flow in eb.data if flow["code"] not in existing]
+        if new:
+            new_list = "\n\t".join(
+                ["{}: {}".format(o["name"], o["categories"]) for o in new]
+            )
+            print(
+                f"Adding {len(new)} biosphere flows to {biosphere_name}:\n\t{new_list}"
+            )
+            append_nodes(bd.Database(biosphere_name), new)
+
+
+class _MasterDataCache:
+    """
+    Parse each distinct ``MasterData`` file only once.
+
+    The releases of different system models of the same ecoinvent version come with
+    their own copies of the master data files, which are usually identical.
+    ``cache(filepath)`` returns ``parse(filepath)``, or the earlier result for a file
+    with the same contents. Can be called from several threads; they wait for each
+    other while a file is parsed.
+    """
+
+    def __init__(self, parse):
+        self.parse = parse
+        self.parsed = []
+        self.lock = threading.Lock()
+
+    def find(self, filepath: Path) -> Optional[int]:
+        """Return the index in ``parsed`` of a file like ``filepath``, if any."""
+        for index, (other, _) in enumerate(self.parsed):
+            if filecmp.cmp(other, filepath, shallow=False):
+                return index
+
+    def __call__(self, filepath: Path) -> Any:
+        with self.lock:
+            index = self.find(filepath)
+            if index is not None:
+                return self.parsed[index][1]
+            result = self.parse(filepath)
+            self.parsed.append((filepath, result))
+            return result
+
+
+def _read_technosphere_metadata(filepath: Path) -> dict:
+    return {
+        obj["id"]: obj["product_information"]
+        for obj in Ecospold2DataExtractor.extract_technosphere_metadata(filepath.parent)
+    }
+
+
+def _extract_lci(
+    lci_path: Path,
+    db_name: str,
+    biosphere_name: str,
+    technosphere_metadata: _MasterDataCache,
+    importer_signal: Any,
+    use_mp: bool,
+    separate_products: bool,
+) -> SingleOutputEcospold2Importer:
+    return SingleOutputEcospold2Importer(
+        dirpath=lci_path / "datasets",
+        db_name=db_name,
+        biosphere_database_name=biosphere_name,
+        signal=importer_signal,
+        use_mp=use_mp,
+        separate_products=separate_products,
+        technosphere_metadata=technosphere_metadata(
+            lci_path / "MasterData" / "IntermediateExchanges.xml"
+        ),
+    )
+
+
+def read_lcia_workbook(filepath: Path, version: str, cache: bool = True) -> tuple:
+    """
+    Read the impact category units and characterization factors of an ecoinvent LCIA
+    workbook.
+
+    Only the needed columns of the units and ``CFs`` sheets are read, as lists of values
+    (see ``ExcelExtractor.extract_columns``). The units have the columns
+    ``LCIA_UNIT_COLUMNS`` and ``unit``; the CFs have the columns ``LCIA_CF_COLUMNS`` and
+    ``cf``, read from the CF column for ``version``.
+
+    If ``cache``, the columns are also written to a ``.json.gz`` file alongside the
+    workbook, and read from there next time, as long as the workbook doesn't change. A
+    cache file which can't be read is ignored, and so is a directory where it can't be
+    written.
+
+    Returns ``(units, cfs)``.
+    """
+    filepath = Path(filepath)
+    cache_file = Path(str(filepath) + ".json.gz")
+    stat = filepath.stat()
+    source = [LCIA_CACHE_FORMAT, version, stat.st_size, stat.st_mtime_ns]
+    if cache and cache_file.is_file():
+        try:
+            with gzip.open(cache_file, mode="rt") as f:
+                cached = json.load(f)
+            if cached["source"] == source:
+                return cached["units"], cached["cfs"]
+        except (OSError, EOFError, ValueError, KeyError, TypeError):
+            # Unreadable, truncated or corrupt; read the workbook instead
+            pass
+
+    sheet_names = get_excel_sheet_names(filepath)
+
+    if "units" in sheet_names:
+        units_sheetname = "units"
+    elif "Indicators" in sheet_names:
+        units_sheetname = "Indicators"
+    else:
+        raise ValueError(
+            f"Can't find worksheet for impact category units in {sheet_names}"
+        )
+
+    if "CFs" not in sheet_names:
+        raise ValueError(
+            "Can't find worksheet for characterization factors; expected `CFs`, "
+            f"found {sheet_names}"
+        )
+
+    columns = ExcelExtractor.extract_columns(filepath, units_sheetname)
+    units = {label: columns[label] for label in LCIA_UNIT_COLUMNS}
+    units["unit"] = columns[pick_a_unit_label_already(columns)]
+
+    cf_col_label = CF_COLUMN_LABELS.get(version, "cf")
+    cfs = ExcelExtractor.extract_columns(
+        filepath, "CFs", LCIA_CF_COLUMNS + (cf_col_label,)
+    )
+    cfs["cf"] = cfs.pop(cf_col_label)
+
+    if cache:
+        _write_lcia_cache(cache_file, {"source": source, "units": units, "cfs": cfs})
+    return units, cfs
+
+
+def _write_lcia_cache(cache_file: Path, data: dict) -> None:
+    """
+    Write ``data`` to ``cache_file`` as gzipped JSON.
+
+    The data is written to a temporary file which then replaces ``cache_file``, so other
+    processes never read a partial cache. Nothing is written if that fails.
+    """
+    try:
+        fd, temp_file = tempfile.mkstemp(
+            dir=cache_file.parent, prefix=cache_file.name, suffix=".tmp"
+        )
+    except OSError:
+        return
+    try:
+        with os.fdopen(fd, "wb") as raw, gzip.open(raw, "wt") as f:
+            json.dump(data, f)
+        os.replace(temp_file, cache_file)
+    except OSError:
+        Path(temp_file).unlink(missing_ok=True)
+
+
+def _link_lcia(
+    units: dict,
+    cfs: dict,
+    version: str,
+    biosphere_name: str,
+    namespace_lcia_methods: bool,
+) -> tuple:
+    """
+    Link the CFs to the flows in ``biosphere_name``.
+
+    Returns ``(cfs by impact category, units mapping)``.
+    """
+    prefix = (f"ecoinvent-{version}",) if namespace_lcia_methods else ()
+    units_mapping = {
+        prefix + (method, category, indicator): unit
+        for method, category, indicator, unit in zip(
+            *(units[label] for label in LCIA_UNIT_COLUMNS + ("unit",))
+        )
+    }
+
+    biosphere_mapping = {}
+    for name, categories, id_ in project_nodes(
+        biosphere_name, ("name", "categories", "id")
+    ):
+        categories = tuple(categories)
+        biosphere_mapping[(name,) + categories] = id_
+        if name.startswith("[Deleted]"):
+            biosphere_mapping[(name.replace("[Deleted]", ""),) + categories] = id_
+    # Flow names by context, only built if some CFs can't be matched exactly
+    by_context = None
+
+    lcia_data_as_dict = defaultdict(list)
+
+    unmatched = set()
+    substituted = set()
+
+    rows = zip(*(cfs[label] for label in LCIA_CF_COLUMNS + ("cf",)))
+    # The CFs are sorted by impact category, so most categories are one group
+    for impact_category, group in groupby(rows, key=itemgetter(0, 1, 2)):
+        linked = []
+        for _, _, _, name, compartment, subcompartment, cf in group:
+            if cf is None:
+                continue
+            key = drop_unspecified(name, compartment, subcompartment)
+            try:
+                linked.append((biosphere_mapping[key], float(cf)))
+                continue
+            except KeyError:
+                pass
+
+            # How is this possible? We are matching ecoinvent data against
+            # ecoinvent data from the same release! And yet it moves...
+            if by_context is None:
+                by_context = defaultdict(dict)
+                for (flow_name, *context), id_ in biosphere_mapping.items():
+                    by_context[tuple(context)][flow_name] = id_
+            same_context = by_context.get(key[1:], {})
+            candidates = sorted(
+                [(damerau_levenshtein(other, name), other) for other in same_context]
+            )
+            if (
+                candidates[0][0] < 3
+                and candidates[0][0] != candidates[1][0]
+                and candidates[0][1][0].lower() == name[0].lower()
+            ):
+                new_name = candidates[0][1]
+                pair = (new_name, name)
+                if pair not in substituted:
+                    print(f"Substituting {new_name} for {name}")
+                    substituted.add(pair)
+                linked.append((same_context[new_name], float(cf)))
+            else:
+                if name not in unmatched:
+                    print(
+                        "Skipping unmatched flow {}:({}, {})".format(
+                            name, compartment, subcompartment
+                        )
+                    )
+                    unmatched.add(name)
+        if linked:
+            lcia_data_as_dict[prefix + impact_category].extend(linked)
+
+    return lcia_data_as_dict, units_mapping
+
+
+def _write_lcia(
+    lcia_data_as_dict: dict,
+    units_mapping: dict,
+    lcia_file: Path,
+    version: str,
+    biosphere_name: str,
+) -> None:
+    for key in lcia_data_as_dict:
+        method = bd.Method(key)
+        if key not in bd.methods:
+            method.register(
+                unit=units_mapping.get(key, "Unknown"),
+                filepath=str(lcia_file),
+                ecoinvent_version=version,
+                database=biosphere_name,
+            )
+            method.write(lcia_data_as_dict[key])
+        else:
+            existing = bd.Method(key).load()
+            bd.Method(key).write(existing + lcia_data_as_dict[key])
+
+
 def import_ecoinvent_release(
     version: str,
     system_model: str,
@@ -62,7 +418,8 @@ def import_ecoinvent_release(
     namespace_lcia_methods: bool = True,
     use_mp: bool = True,
     separate_products: bool = False,
-) -> None:
+    concurrent: bool = True,
+) -> StageTimer:
     """
     Import an ecoinvent LCI and/or LCIA release.
 
@@ -118,6 +475,18 @@ def import_ecoinvent_release(
         allows for multiple LCIA implementation versions to be installed in parallel
     use_mp
         Use a multiprocessing pool when importing ecospold2 XML files
+    concurrent
+        Extract and link the LCI datasets, and parse the biosphere flows and the
+        LCIA workbook, in worker threads, while the LCI release is downloaded.
+        Databases are written from the calling thread. With `use_mp`, the worker
+        processes of the extraction are started with `forkserver` or `spawn`
+        instead of `fork` (see `bw2io.utils.process_pool_context`).
+
+    Returns
+    -------
+    StageTimer
+        Start and end times of each stage, also printed at the end. Stages are
+        downloading, parsing, applying strategies, linking and writing.
 
     Examples
     --------
@@ -175,6 +544,105 @@ def import_ecoinvent_release(
     0
 
     """
+    return import_ecoinvent_releases(
+        version=version,
+        system_models=[system_model],
+        username=username,
+        password=password,
+        lci=lci,
+        lcia=lcia,
+        biosphere_name=biosphere_name,
+        biosphere_write_mode=biosphere_write_mode,
+        importer_signal=importer_signal,
+        namespace_lcia_methods=namespace_lcia_methods,
+        use_mp=use_mp,
+        separate_products=separate_products,
+        concurrent=concurrent,
+    )
+
+
+def _link_lci(soup: SingleOutputEcospold2Importer) -> SingleOutputEcospold2Importer:
+    soup.apply_strategies()
+    if not soup.all_linked:
+        raise ValueError(
+            f"Can't ingest inventory database {soup.db_name} - unlinked flows."
+        )
+    return soup
+
+
+def import_ecoinvent_releases(
+    version: str,
+    system_models: Sequence[str],
+    username: Optional[str] = None,
+    password: Optional[str] = None,
+    lci: bool = True,
+    lcia: bool = True,
+    biosphere_name: Optional[str] = None,
+    biosphere_write_mode: str = "patch",
+    importer_signal: Any = None,
+    namespace_lcia_methods: bool = True,
+    use_mp: bool = True,
+    separate_products: bool = False,
+    concurrent: bool = True,
+) -> StageTimer:
+    """
+    Import several system models of an ecoinvent release, sharing their common work.
+
+    Gives the same databases as calling `import_ecoinvent_release` for each system
+    model, but the biosphere flows, the product metadata and the LCIA workbook are
+    only parsed once (per distinct file), the biosphere database is written once,
+    and the LCIA impact categories are linked and written once.
+
+    The releases are downloaded one after the other, and all databases are written
+    from the calling thread, in the order of `system_models`, after all of them
+    could be linked. With `concurrent`, the other stages run in worker threads,
+    which overlap where they wait for I/O or for worker processes: the LCIA
+    workbook and the biosphere flows are parsed, and the datasets of the system
+    models already downloaded are extracted (in process pools with `use_mp`),
+    while the next release is downloaded. The LCI strategies, which link the
+    datasets, are pure Python and hold the GIL, so those of the different system
+    models take turns rather than running in parallel; they only overlap with
+    the extraction processes and the other stages.
+
+    Parameters
+    ----------
+    version
+        The ecoinvent release version as a string, e.g. '3.9.1'
+    system_models
+        The system models as strings in short or long form, e.g.
+        `["cutoff", "apos", "consequential"]`
+    concurrent
+        Extract and link the datasets of the system models, and parse the biosphere
+        flows and the LCIA workbook, in worker threads. If `False`, the stages run
+        one after the other.
+
+    See `import_ecoinvent_release` for the other parameters.
+
+    Returns
+    -------
+    StageTimer
+        Start and end times of each stage, also printed at the end.
+
+    Examples
+    --------
+
+    >>> import bw2data as bd
+    >>> import bw2io as bi
+    >>> bd.projects.set_current("some new project")
+    >>> bi.import_ecoinvent_releases(
+    ...     version="3.9.1",
+    ...     system_models=["cutoff", "apos"],
+    ...     )
+    >>> bd.databases
+    Databases dictionary with 3 object(s):
+        ecoinvent-3.9.1-apos
+        ecoinvent-3.9.1-biosphere
+        ecoinvent-3.9.1-cutoff
+
+    """
+    if ei is None:
+        raise ImportError("Please install `ecoinvent_interface` to use this function")
+
     from . import create_core_migrations, migrations
 
     if not len(migrations):
@@ -191,10 +659,13 @@ def import_ecoinvent_release(
     if version not in release.list_versions():
         raise ValueError(f"Invalid version {version}")
 
-    if system_model in SYSTEM_MODELS:
-        system_model = SYSTEM_MODELS[system_model]
-    if system_model not in release.list_system_models(version):
-        raise ValueError(f"Invalid system model {system_model}")
+    system_models = list(
+        dict.fromkeys(SYSTEM_MODELS.get(label, label) for label in system_models)
+    )
+    available = release.list_system_models(version)
+    for system_model in system_models:
+        if system_model not in available:
+            raise ValueError(f"Invalid system model {system_model}")
 
     if biosphere_name is None:
         biosphere_name = f"ecoinvent-{version}-biosphere"
@@ -204,206 +675,124 @@ def import_ecoinvent_release(
             + f" got `{biosphere_write_mode}`"
         )
         raise ValueError(error)
-    if lci:
-        lci_path = release.get_release(
-            version=version,
-            system_model=system_model,
-            release_type=ei.ReleaseType.ecospold,
-        )
-
-        db_name = f"ecoinvent-{version}-{system_model}"
-        if db_name in bd.databases:
-            raise ValueError(f"Database {db_name} already exists")
-
-        eb = Ecospold2BiosphereImporter(
-            name=biosphere_name,
-            filepath=lci_path / "MasterData" / "ElementaryExchanges.xml",
-        )
-        eb.apply_strategies()
-        if not eb.all_linked:
-            raise ValueError(
-                f"Can't ingest biosphere database {biosphere_name} - unlinked flows."
-            )
 
-        if biosphere_name not in bd.databases or biosphere_write_mode == "replace":
-            eb.write_database(overwrite=False)
-        else:
-            existing = {flow["code"] for flow in bd.Database(biosphere_name)}
-            new = [flow for flow in eb.data if flow["code"] not in existing]
-            if new:
-                new_list = "\n\t".join(
-                    ["{}: {}".format(o["name"], o["categories"]) for o in new]
-                )
-                print(
-                    f"Adding {len(new)} biosphere flows to {biosphere_name}:\n\t{new_list}"
+    db_names = [f"ecoinvent-{version}-{system_model}" for system_model in system_models]
+    if lci:
+        for db_name in db_names:
+            if db_name in bd.databases:
+                raise ValueError(f"Database {db_name} already exists")
+
+    timer = StageTimer()
+    subversion = int(version.split(".")[1])
+    # Extraction, linking and parsing run in worker threads; the downloads and
+    # all database writes stay in this thread, so they don't overlap
+    pool = (
+        ThreadPoolExecutor(max_workers=2 * len(system_models) + 1)
+        if concurrent
+        else nullcontext()
+    )
+    with pool as executor:
+        # The LCIA workbook and the biosphere flows are parsed while the datasets
+        # are extracted
+        if lcia and subversion >= 4:
+            with timer.stage("download LCIA"):
+                lcia_file = ei.get_excel_lcia_file_for_version(
+                    release=release, version=version
                 )
-                for flow in new:
-                    if "database" in flow:
-                        del flow["database"]
-                    bd.Database(biosphere_name).new_activity(**flow).save()
-
-        bd.preferences["biosphere_database"] = biosphere_name
-
-        soup = SingleOutputEcospold2Importer(
-            dirpath=lci_path / "datasets",
-            db_name=db_name,
-            biosphere_database_name=biosphere_name,
-            signal=importer_signal,
-            use_mp=use_mp,
-            separate_products=separate_products,
-        )
-        soup.apply_strategies()
-        if not soup.all_linked:
-            raise ValueError(
-                f"Can't ingest inventory database {db_name} - unlinked flows."
-            )
-        soup.write_database()
-
-    if lcia:
-        subversion = int(version.split(".")[1])
-        if subversion < 4:
-            raise ValueError("LCIA import for versions 3.0-3.3 not supported")
-
-        if biosphere_name is None:
-            biosphere_name = bd.config.biosphere
-        if biosphere_name not in bd.databases or not len(bd.Database(biosphere_name)):
-            raise ValueError(
-                f"Can't find populated biosphere flow database {biosphere_name}"
-            )
-
-        lcia_file = ei.get_excel_lcia_file_for_version(release=release, version=version)
-        sheet_names = get_excel_sheet_names(lcia_file)
-
-        if "units" in sheet_names:
-            units_sheetname = "units"
-        elif "Indicators" in sheet_names:
-            units_sheetname = "Indicators"
-        else:
-            raise ValueError(
-                f"Can't find worksheet for impact category units in {sheet_names}"
+            workbook = _submit(
+                executor,
+                timer,
+                "read LCIA workbook",
+                read_lcia_workbook,
+                lcia_file,
+                version,
             )
 
-        if "CFs" not in sheet_names:
-            raise ValueError(
-                f"Can't find worksheet for characterization factors; expected `CFs`, found {sheet_names}"
+        if lci:
+            technosphere_metadata = _MasterDataCache(_read_technosphere_metadata)
+            biospheres = _MasterDataCache(
+                lambda filepath: _submit(
+                    executor,
+                    timer,
+                    "parse biosphere ({})".format(len(biospheres.parsed) + 1),
+                    _parse_biosphere,
+                    filepath,
+                    biosphere_name,
+                )
             )
-
-        data = dict(ExcelExtractor.extract(lcia_file))
-        units = header_dict(data[units_sheetname])
-
-        cfs = header_dict(data["CFs"])
-
-        CF_COLUMN_LABELS = {
-            "3.4": "cf 3.4",
-            "3.5": "cf 3.5",
-            "3.6": "cf 3.6",
-        }
-        cf_col_label = CF_COLUMN_LABELS.get(version, "cf")
-        units_col_label = pick_a_unit_label_already(units[0])
-        if namespace_lcia_methods:
-            units_mapping = {
-                (
-                    f"ecoinvent-{version}",
-                    row["method"],
-                    row["category"],
-                    row["indicator"],
-                ): row[units_col_label]
-                for row in units
-            }
-        else:
-            units_mapping = {
-                (row["method"], row["category"], row["indicator"]): row[units_col_label]
-                for row in units
-            }
-
-        biosphere_mapping = {}
-        for flow in bd.Database(biosphere_name):
-            biosphere_mapping[(flow["name"],) + tuple(flow["categories"])] = flow.id
-            if flow["name"].startswith("[Deleted]"):
-                biosphere_mapping[
-                    (flow["name"].replace("[Deleted]", ""),) + tuple(flow["categories"])
-                ] = flow.id
-
-        lcia_data_as_dict = defaultdict(list)
-
-        unmatched = set()
-        substituted = set()
-
-        for row in cfs:
-            if namespace_lcia_methods:
-                impact_category = (
-                    f"ecoinvent-{version}",
-                    row["method"],
-                    row["category"],
-                    row["indicator"],
+            extracted = []
+            for system_model, db_name in zip(system_models, db_names):
+                with timer.stage(f"download LCI ({system_model})"):
+                    lci_path = release.get_release(
+                        version=version,
+                        system_model=system_model,
+                        release_type=ei.ReleaseType.ecospold,
+                    )
+                biospheres(lci_path / "MasterData" / "ElementaryExchanges.xml")
+                extracted.append(
+                    _submit(
+                        executor,
+                        timer,
+                        f"extract LCI ({system_model})",
+                        _extract_lci,
+                        lci_path,
+                        db_name,
+                        biosphere_name,
+                        technosphere_metadata,
+                        importer_signal,
+                        use_mp,
+                        separate_products,
+                    )
                 )
-            else:
-                impact_category = (row["method"], row["category"], row["indicator"])
-            if row[cf_col_label] is None:
-                continue
-            try:
-                lcia_data_as_dict[impact_category].append(
-                    (
-                        biosphere_mapping[
-                            drop_unspecified(
-                                row["name"], row["compartment"], row["subcompartment"]
-                            )
-                        ],
-                        float(row[cf_col_label]),
+
+            with timer.stage("write biosphere"):
+                # Flows only found in the master data of later system models are added
+                # like in a separate import in `patch` mode
+                for index, (_, parsed) in enumerate(biospheres.parsed):
+                    _write_biosphere(
+                        parsed.result(),
+                        biosphere_name,
+                        biosphere_write_mode if not index else "patch",
                     )
+            bd.preferences["biosphere_database"] = biosphere_name
+
+            linked = [
+                _submit(
+                    executor,
+                    timer,
+                    f"LCI strategies ({system_model})",
+                    _link_lci,
+                    soup.result(),
                 )
-            except KeyError:
-                # How is this possible? We are matching ecoinvent data against
-                # ecoinvent data from the same release! And yet it moves...
-                category = (
-                    (row["compartment"], row["subcompartment"])
-                    if row["subcompartment"].lower() != "unspecified"
-                    else (row["compartment"],)
+                for system_model, soup in zip(system_models, extracted)
+            ]
+            soups = [soup.result() for soup in linked]
+            for system_model, soup in zip(system_models, soups):
+                with timer.stage(f"write LCI ({system_model})"):
+                    soup.write_database()
+
+        if lcia:
+            if subversion < 4:
+                raise ValueError("LCIA import for versions 3.0-3.3 not supported")
+
+            if biosphere_name is None:
+                biosphere_name = bd.config.biosphere
+            if biosphere_name not in bd.databases or not len(
+                bd.Database(biosphere_name)
+            ):
+                raise ValueError(
+                    f"Can't find populated biosphere flow database {biosphere_name}"
                 )
-                same_context = {
-                    k[0]: v for k, v in biosphere_mapping.items() if k[1:] == category
-                }
-                candidates = sorted(
-                    [
-                        (damerau_levenshtein(name, row["name"]), name)
-                        for name in same_context
-                    ]
+
+            units, cfs = workbook.result()
+            with timer.stage("link LCIA"):
+                lcia_data_as_dict, units_mapping = _link_lcia(
+                    units, cfs, version, biosphere_name, namespace_lcia_methods
                 )
-                if (
-                    candidates[0][0] < 3
-                    and candidates[0][0] != candidates[1][0]
-                    and candidates[0][1][0].lower() == row["name"][0].lower()
-                ):
-                    new_name = candidates[0][1]
-                    pair = (new_name, row["name"])
-                    if pair not in substituted:
-                        print(f"Substituting {new_name} for {row['name']}")
-                        substituted.add(pair)
-                    lcia_data_as_dict[impact_category].append(
-                        (
-                            same_context[new_name],
-                            float(row[cf_col_label]),
-                        )
-                    )
-                else:
-                    if row["name"] not in unmatched:
-                        print(
-                            "Skipping unmatched flow {}:({}, {})".format(
-                                row["name"], row["compartment"], row["subcompartment"]
-                            )
-                        )
-                        unmatched.add(row["name"])
-
-        for key in lcia_data_as_dict:
-            method = bd.Method(key)
-            if key not in bd.methods:
-                method.register(
-                    unit=units_mapping.get(key, "Unknown"),
-                    filepath=str(lcia_file),
-                    ecoinvent_version=version,
-                    database=biosphere_name,
+            with timer.stage("write LCIA"):
+                _write_lcia(
+                    lcia_data_as_dict, units_mapping, lcia_file, version, biosphere_name
                 )
-                method.write(lcia_data_as_dict[key])
-            else:
-                existing = bd.Method(key).load()
-                bd.Method(key).write(existing + lcia_data_as_dict[key])
+
+    print(timer.report())
+    return timer
@@ -2,3 +2,4 @@ from .csv import write_lci_csv
 from .excel import lci_matrices_to_excel, write_lci_excel
 from .gexf import DatabaseSelectionToGEXF, DatabaseToGEXF, keyword_to_gephi_graph
 from .matlab import lci_matrices_to_matlab
+from .matrices import write_lci_matrices
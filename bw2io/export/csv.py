@@ -1,10 +1,15 @@
 import csv
 import os
+from collections import defaultdict
 
 from bw2data import Database, databases, projects
+from bw2data.backends.schema import ActivityDataset
+from bw2data.errors import UnknownObject
 from bw2data.parameters import ActivityParameter, DatabaseParameter, ProjectParameter
 from bw_processing import safe_filename
 
+from ..bulk import SELECT_CHUNK_SIZE, chunked, load_nodes_and_edges
+
 
 def reformat(value):
     if isinstance(value, (list, tuple)):
@@ -51,7 +56,7 @@ class CSVFormatter(object):
         assert database_name in databases, "Database {} not found".format(database_name)
         self.db = Database(database_name)
         self.db.order_by = "name"
-        self.objs = objs or iter(self.db)
+        self.objs = objs
 
     def get_project_parameters(self):
         return self.order_dicts(
@@ -108,7 +113,7 @@ class CSVFormatter(object):
             "project parameters": self.get_project_parameters(),
         }
 
-    def get_activity_metadata(self, act):
+    def get_activity_metadata(self, act, parameters=None):
         excluded = {"database", "name"}
         return {
             "name": act.get("name"),
@@ -121,7 +126,9 @@ class CSVFormatter(object):
                     and not isinstance(v, (dict, list))
                 ]
             ),
-            "parameters": self.get_activity_parameters(act),
+            "parameters": (
+                self.get_activity_parameters(act) if parameters is None else parameters
+            ),
         }
 
     def exchange_as_dict(self, exc):
@@ -154,6 +161,117 @@ class CSVFormatter(object):
         data["exchanges"] = self.get_exchanges(act)
         return data
 
+    def iter_documents(self):
+        """
+        Yield the activities to export, as ``Activity`` objects if ``objs`` was given
+        (and not empty), or otherwise all activities of the database, as activity
+        documents in name order.
+
+        Only the codes are read at once; the documents are loaded in chunks of
+        ``SELECT_CHUNK_SIZE``.
+        """
+        if self.objs:
+            yield from self.objs
+            return
+        codes = [
+            code
+            for (code,) in self.db._get_queryset().select(ActivityDataset.code).tuples()
+        ]
+        for chunk in chunked(codes, SELECT_CHUNK_SIZE):
+            nodes, _ = load_nodes_and_edges(self.db.name, chunk)
+            for code in chunk:
+                id_, document = nodes[code]
+                document.update(code=code, database=self.db.name, id=id_)
+                yield document
+
+    def load_inputs(self, keys):
+        """Return ``{(database, code): document}`` for the exchange inputs ``keys``."""
+        codes = defaultdict(set)
+        for database, code in keys:
+            codes[database].add(code)
+        inputs = {}
+        for database, database_codes in codes.items():
+            for chunk in chunked(sorted(database_codes), SELECT_CHUNK_SIZE):
+                inputs.update(
+                    ((database, code), document)
+                    for code, document in ActivityDataset.select(
+                        ActivityDataset.code, ActivityDataset.data
+                    )
+                    .where(
+                        ActivityDataset.database == database,
+                        ActivityDataset.code << chunk,
+                    )
+                    .tuples()
+                )
+        return inputs
+
+    def load_activity_parameters(self, keys):
+        """Return ``{(database, code): (group, [parameter dicts])}`` for ``keys``."""
+        codes = defaultdict(list)
+        for database, code in keys:
+            codes[database].append(code)
+        parameters = {}
+        for database, database_codes in codes.items():
+            for chunk in chunked(database_codes, SELECT_CHUNK_SIZE):
+                for param in ActivityParameter.select().where(
+                    ActivityParameter.database == database,
+                    ActivityParameter.code << chunk,
+                ):
+                    _, params = parameters.setdefault(
+                        (database, param.code), (param.group, [])
+                    )
+                    params.append(param.dict)
+        return parameters
+
+    def iter_activity_data(self):
+        """
+        Yield the ``get_activity`` data of each exported activity.
+
+        Instead of one query per activity, exchange, and exchange input, the activities
+        are processed in chunks of ``SELECT_CHUNK_SIZE``, with bulk queries for their
+        exchanges, the inputs of these exchanges, and their parameters. Only one chunk
+        is held in memory at a time.
+        """
+        inp_fields = ("name", "unit", "location", "categories")
+        skip_fields = ("input", "output")
+
+        for chunk in chunked(self.iter_documents(), SELECT_CHUNK_SIZE):
+            keys = [(act["database"], act["code"]) for act in chunk]
+            edges = {}
+            for database in {database for database, _ in keys}:
+                _, database_edges = load_nodes_and_edges(
+                    database, [code for db, code in keys if db == database]
+                )
+                edges.update(
+                    ((database, code), value) for code, value in database_edges.items()
+                )
+            inputs = self.load_inputs(
+                tuple(exc["input"]) for value in edges.values() for exc in value
+            )
+            parameters = self.load_activity_parameters(keys)
+
+            for key, act in zip(keys, chunk):
+                activity_parameters = {}
+                if key in parameters:
+                    group, params = parameters[key]
+                    activity_parameters = self.order_dicts(params, "parameter")
+                    activity_parameters["group"] = group
+                data = self.get_activity_metadata(act, activity_parameters)
+
+                exchanges = []
+                for exc in edges.get(key, []):
+                    inp = inputs.get(tuple(exc["input"]))
+                    if inp is None:
+                        raise UnknownObject(
+                            "Exchange input {} not found".format(exc["input"])
+                        )
+                    dct = {k: v for k, v in exc.items() if k not in skip_fields}
+                    dct.update(**{k: inp[k] for k in inp_fields if inp.get(k)})
+                    exchanges.append(dct)
+                exchanges.sort(key=lambda x: (x.get("type"), x.get("name")))
+                data["exchanges"] = self.order_dicts(exchanges)
+                yield data
+
     def get_unformatted_data(self):
         """
         Return all database data as a nested dictionary:
@@ -194,10 +312,20 @@ class CSVFormatter(object):
 
         return {
             "database": self.get_database_metadata(),
-            "activities": [self.get_activity(obj) for obj in self.objs],
+            "activities": list(self.iter_activity_data()),
         }
 
     def get_formatted_data(self, sections=None):
+        return list(self.iter_formatted_data(sections))
+
+    def iter_formatted_data(self, sections=None):
+        """
+        Yield the rows of ``get_formatted_data`` one by one.
+
+        Activities are read in chunks with ``iter_activity_data``, so the rows can be
+        written while the database is read, without building the nested
+        ``get_unformatted_data`` structure first.
+        """
         if sections is None:
             sections = [
                 "project parameters",
@@ -208,48 +336,41 @@ class CSVFormatter(object):
                 "exchanges",
             ]
 
-        result = []
-        data = self.get_unformatted_data()
-        db = data["database"]
+        db = self.get_database_metadata()
         if db["project parameters"] and "project parameters" in sections:
-            result.extend([["Project parameters"], db["project parameters"]["columns"]])
-            result.extend(db["project parameters"]["data"])
-            result.append([])
+            yield from [["Project parameters"], db["project parameters"]["columns"]]
+            yield from db["project parameters"]["data"]
+            yield []
 
         if "database" in sections:
-            result.append(["Database", db["name"]])
-            result.extend(db["metadata"])
-            result.append([])
+            yield ["Database", db["name"]]
+            yield from db["metadata"]
+            yield []
 
         if db["parameters"] and "database parameters" in sections:
-            result.extend([["Database parameters"], db["parameters"]["columns"]])
-            result.extend(db["parameters"]["data"])
-            result.append([])
+            yield from [["Database parameters"], db["parameters"]["columns"]]
+            yield from db["parameters"]["data"]
+            yield []
 
         if "activities" not in sections:
-            return result
-        for act in data["activities"]:
-            result.append(["Activity", act["name"]])
-            result.extend(act["metadata"])
+            return
+        for act in self.iter_activity_data():
+            yield ["Activity", act["name"]]
+            yield from act["metadata"]
 
             if act["parameters"] and "activity parameters" in sections:
-                result.extend(
-                    [
-                        ["Parameters", act["parameters"]["group"]],
-                        act["parameters"]["columns"],
-                    ]
-                )
-                result.extend(act["parameters"]["data"])
-                result.append([])
+                yield ["Parameters", act["parameters"]["group"]]
+                yield act["parameters"]["columns"]
+                yield from act["parameters"]["data"]
+                yield []
 
             if "exchanges" in sections:
-                result.append(["Exchanges"])
+                yield ["Exchanges"]
                 if act["exchanges"]:
-                    result.append(act["exchanges"]["columns"])
-                    result.extend(act["exchanges"]["data"])
+                    yield act["exchanges"]["columns"]
+                    yield from act["exchanges"]["data"]
 
-            result.append([])
-        return result
+            yield []
 
 
 def write_lci_csv(database_name, objs=None, sections=None, dirpath=None):
@@ -284,7 +405,7 @@ def write_lci_csv(database_name, objs=None, sections=None, dirpath=None):
 
     """
 
-    data = CSVFormatter(database_name, objs).get_formatted_data(sections)
+    data = CSVFormatter(database_name, objs).iter_formatted_data(sections)
 
     if dirpath is None:
         dirpath = projects.output_dir
@@ -295,8 +416,6 @@ def write_lci_csv(database_name, objs=None, sections=None, dirpath=None):
     filepath = os.path.join(dirpath, "lci-" + safe_name + ".csv")
 
     with open(filepath, "w", newline="") as f:
-        writer = csv.writer(f)
-        for line in data:
-            writer.writerow(line)
+        csv.writer(f).writerows(data)
 
     return filepath
@@ -2,13 +2,13 @@ import collections
 import numbers
 import os
 from pathlib import Path
-from typing import List, Optional
+from typing import Iterable, List, Optional
 
 import xlsxwriter
 from bw2data import Database, projects
 from bw_processing import safe_filename
 
-from ..utils import activity_hash
+from ..utils import TRANSIENT_HASH, activity_hash
 from .csv import CSVFormatter
 
 
@@ -254,7 +254,8 @@ def write_lci_excel(database_name, objs=None, sections=None, dirpath=None):
         raise ValueError(f"Directory path {dirpath} is not a writable directory")
     filepath = os.path.join(dirpath, "lci-" + safe_name + ".xlsx")
 
-    workbook = xlsxwriter.Workbook(filepath)
+    # Rows are written in order, so they can be flushed to disk one by one
+    workbook = xlsxwriter.Workbook(filepath, {"constant_memory": True})
     bold = workbook.add_format({"bold": True})
     bold.set_font_size(12)
     highlighted = {
@@ -269,7 +270,7 @@ def write_lci_excel(database_name, objs=None, sections=None, dirpath=None):
 
     sheet = workbook.add_worksheet(create_valid_worksheet_name(database_name))
 
-    data = CSVFormatter(database_name, objs).get_formatted_data(sections)
+    data = CSVFormatter(database_name, objs).iter_formatted_data(sections)
 
     for row_index, row in enumerate(data):
         for col_index, value in enumerate(row):
@@ -294,6 +295,7 @@ def write_lci_matching(
     only_unlinked: bool = False,
     only_activity_names: bool = False,
     output_dir: Optional[Path] = None,
+    unlinked: Optional[Iterable[dict]] = None,
 ):
     """
     Write matched and unmatched exchanges to Excel file
@@ -308,6 +310,11 @@ def write_lci_matching(
         Only write unlinked exchanges. Default is ``False``.
     only_activity_names : bool, optional
         Only write activity names. Default is ``False``.
+    output_dir : Path, optional
+        Directory to write to. Default is ``projects.output_dir``.
+    unlinked : iterable of dict, optional
+        Unique unlinked exchanges, e.g. from ``importer.unlinked``, to use with
+        ``only_unlinked`` instead of searching ``db`` for them.
 
     Returns
     -------
@@ -384,11 +391,14 @@ def write_lci_matching(
     if only_unlinked:
         unique_unlinked = collections.defaultdict(set)
         hash_dict = {}
-        for ds in db:
-            for exc in (e for e in ds.get("exchanges", []) if not e.get("input")):
-                ah = activity_hash(exc)
-                unique_unlinked[exc.get("type")].add(ah)
-                hash_dict[ah] = exc
+        if unlinked is None:
+            unlinked = (
+                e for ds in db for e in ds.get("exchanges", []) if not e.get("input")
+            )
+        for exc in unlinked:
+            ah = activity_hash(exc, algorithm=TRANSIENT_HASH)
+            unique_unlinked[exc.get("type")].add(ah)
+            hash_dict[ah] = exc
 
         for key in sorted(unique_unlinked.keys()):
             sheet.write_string(row, 0, key, bold)
@@ -455,7 +465,8 @@ def write_lcia_matching(db, name):
     safe_name = safe_filename(name, False)
     filepath = os.path.join(projects.output_dir, "lcia-matching-" + safe_name + ".xlsx")
 
-    workbook = xlsxwriter.Workbook(filepath)
+    # Rows are written in order, so they can be flushed to disk one by one
+    workbook = xlsxwriter.Workbook(filepath, {"constant_memory": True})
     bold = workbook.add_format({"bold": True})
     bold.set_font_size(12)
     sheet = workbook.add_worksheet("matching")
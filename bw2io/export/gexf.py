@@ -1,18 +1,36 @@
+import csv
 import datetime
 import itertools
 import os
 
 from bw2data import Database, projects
+from bw2data.backends.schema import ActivityDataset, ExchangeDataset
 from bw2data.query import Filter
-from lxml.builder import ElementMaker
-from lxml.etree import tostring
-from tqdm import tqdm
+from lxml import etree
+
+from ..bulk import load_nodes_and_edges
+
+GEXF_NAMESPACE = "http://www.gexf.net/1.2draft"
+GRAPHML_NAMESPACE = "http://graphml.graphdrawing.org/xmlns"
+
+# Supported export formats, and their file extensions
+GRAPH_FORMATS = {"gexf": ".gexf", "graphml": ".graphml", "edgelist": ".csv"}
+
+
+def _empty_element(xf, tag, attrib, indent):
+    # Elements written with ``xf.write`` would redeclare their namespace
+    xf.write(indent)
+    with xf.element(tag, attrib):
+        pass
 
 
 class DatabaseToGEXF(object):
     """
     Export a Gephi graph for a database.
 
+    Nodes and edges are read with one query each, and written to the file one by one, so
+    memory use doesn't grow with the number of edges.
+
     Parameters
     ----------
     database : str
@@ -31,10 +49,14 @@ class DatabaseToGEXF(object):
 
     Methods
     -------
-    export()
-        Export the Gephi XML file.
+    export(format="gexf", threshold=None)
+        Export the graph file.
     get_data(E)
         Get the nodes and edges for the Gephi XML file.
+    iter_nodes()
+        Iterate over the nodes of the graph.
+    iter_edges()
+        Iterate over the edges of the graph, including edges to nodes outside the graph.
 
     Examples
     --------
@@ -54,16 +76,104 @@ class DatabaseToGEXF(object):
             raise NotImplemented
         filename = database + ("_plus" if include_descendants else "")
         self.filepath = os.path.join(projects.output_dir, filename + ".gexf")
-        self.data = Database(self.database).load()
-        self.id_mapping = dict([(key, str(i)) for i, key in enumerate(self.data)])
+        self.id_mapping = {}
+
+    def iter_nodes(self):
+        """
+        Iterate over the nodes of the graph.
+
+        Yields
+        ------
+        tuple
+            ``(key, label, category)``, with the categories joined by hyphens.
+        """
+        query = (
+            ActivityDataset.select(ActivityDataset.code, ActivityDataset.data)
+            .where(ActivityDataset.database == self.database)
+            .tuples()
+        )
+        for code, data in query.iterator():
+            yield (
+                (self.database, code),
+                data.get("name", "Unknown"),
+                "-".join(data.get("categories") or []),
+            )
+
+    def iter_edges(self):
+        """
+        Iterate over the edges of the graph, including edges to nodes outside the graph.
+
+        Yields
+        ------
+        tuple
+            ``(input key, output key, amount)``
+        """
+        query = (
+            ExchangeDataset.select(
+                ExchangeDataset.input_database,
+                ExchangeDataset.input_code,
+                ExchangeDataset.output_code,
+                ExchangeDataset.data,
+            )
+            .where(ExchangeDataset.output_database == self.database)
+            .tuples()
+        )
+        for input_database, input_code, output_code, data in query.iterator():
+            yield (
+                (input_database, input_code),
+                (self.database, output_code),
+                data["amount"],
+            )
+
+    def nodes(self):
+        """Yield ``(id, key, label, category)`` of the nodes, filling ``id_mapping``."""
+        self.id_mapping = {}
+        for key, label, category in self.iter_nodes():
+            id_ = self.id_mapping[key] = str(len(self.id_mapping))
+            yield id_, key, label, category
+
+    def edges(self, threshold=None):
+        """
+        Iterate over ``(id, source id, target id, amount)`` of the edges in the graph.
+
+        Only edges between nodes in ``id_mapping`` are included. Production exchanges,
+        and other edges from a node to itself, are skipped, as are edges whose absolute
+        amount is below ``threshold``.
+        """
+        count = itertools.count()
+        for input_key, output_key, amount in self.iter_edges():
+            input_key = tuple(input_key)
+            if input_key == output_key:
+                continue
+            elif input_key not in self.id_mapping or output_key not in self.id_mapping:
+                # Links to nodes outside the graph, or orphaned exchanges
+                continue
+            elif threshold is not None and abs(amount) < threshold:
+                continue
+            yield (
+                str(next(count)),
+                self.id_mapping[input_key],
+                self.id_mapping[output_key],
+                amount,
+            )
 
-    def export(self):
+    def export(self, format="gexf", threshold=None):
         """
-        Export the Gephi XML file.
+        Export the graph file.
+
+        The graph is written while the nodes and edges are read from the database.
 
         Parameters
         ----------
-        None
+        format : str, optional
+            One of ``GRAPH_FORMATS``:
+
+            * "gexf": Gephi XML file (default)
+            * "graphml": GraphML file, with ``label``, ``category``, and ``weight`` data
+            * "edgelist": CSV file with the columns ``source``, ``target``, and
+              ``weight``, where ``source`` and ``target`` are node codes
+        threshold : float, optional
+            Skip edges whose absolute amount is smaller than ``threshold``.
 
         Returns
         -------
@@ -76,36 +186,138 @@ class DatabaseToGEXF(object):
         >>> dtg.export()
         '/path/to/example_db.gexf'
         """
-        E = ElementMaker(
-            namespace="http://www.gexf.net/1.2draft",
-            nsmap={None: "http://www.gexf.net/1.2draft"},
-        )
-        meta = E.meta(
-            E.creator("Brightway2"),
-            E.description(self.database),
-            lastmodified=datetime.date.today().strftime("%Y-%m-%d"),
-        )
-        attributes = E.attributes(
-            E.attribute(id="0", title="category", type="string"), **{"class": "node"}
-        )
-        nodes, edges = self.get_data(E)
-        graph = E.graph(
-            attributes, nodes, edges, mode="static", defaultedgetype="directed"
-        )
-        with open(self.filepath, "w", encoding="utf-8") as f:
-            # Need XML declaration, but then ``tostring`` returns bytes
-            # so need to decode.
-            # See https://bugs.python.org/issue10942
-            # and http://makble.com/python-why-lxml-etree-tostring-method-returns-bytes
-            f.write(
-                tostring(
-                    E.gexf(meta, graph, version="1.2"),
-                    xml_declaration=True,
-                    encoding="utf-8",
-                    pretty_print=True,
-                ).decode("utf-8")
+        if format not in GRAPH_FORMATS:
+            raise ValueError(
+                f"Unknown format {format}; must be one of {tuple(GRAPH_FORMATS)}"
             )
-        return self.filepath
+        filepath = os.path.splitext(self.filepath)[0] + GRAPH_FORMATS[format]
+        if format == "edgelist":
+            with open(filepath, "w", newline="", encoding="utf-8") as f:
+                self.write_edgelist(f, threshold)
+        else:
+            with open(filepath, "wb") as f:
+                with etree.xmlfile(f, encoding="utf-8") as xf:
+                    xf.write_declaration()
+                    if format == "gexf":
+                        self.write_gexf(xf, threshold)
+                    else:
+                        self.write_graphml(xf, threshold)
+                f.write(b"\n")
+        return filepath
+
+    def write_gexf(self, xf, threshold=None):
+        """Write the graph as GEXF to ``xf``, an ``lxml.etree.xmlfile``."""
+
+        def tag(name):
+            return "{%s}%s" % (GEXF_NAMESPACE, name)
+
+        with xf.element(tag("gexf"), nsmap={None: GEXF_NAMESPACE}, version="1.2"):
+            xf.write("\n  ")
+            with xf.element(
+                tag("meta"), lastmodified=datetime.date.today().strftime("%Y-%m-%d")
+            ):
+                xf.write("\n    ")
+                with xf.element(tag("creator")):
+                    xf.write("Brightway2")
+                xf.write("\n    ")
+                with xf.element(tag("description")):
+                    xf.write(self.database)
+                xf.write("\n  ")
+            xf.write("\n  ")
+            with xf.element(tag("graph"), mode="static", defaultedgetype="directed"):
+                xf.write("\n    ")
+                with xf.element(tag("attributes"), {"class": "node"}):
+                    _empty_element(
+                        xf,
+                        tag("attribute"),
+                        {"id": "0", "title": "category", "type": "string"},
+                        "\n      ",
+                    )
+                    xf.write("\n    ")
+                xf.write("\n    ")
+                with xf.element(tag("nodes")):
+                    for id_, _, label, category in self.nodes():
+                        xf.write("\n      ")
+                        with xf.element(tag("node"), id=id_, label=label):
+                            xf.write("\n        ")
+                            with xf.element(tag("attvalues")):
+                                _empty_element(
+                                    xf,
+                                    tag("attvalue"),
+                                    {"value": category, "for": "0"},
+                                    "\n          ",
+                                )
+                                xf.write("\n        ")
+                            xf.write("\n      ")
+                    xf.write("\n    ")
+                xf.write("\n    ")
+                with xf.element(tag("edges")):
+                    for id_, source, target, amount in self.edges(threshold):
+                        _empty_element(
+                            xf,
+                            tag("edge"),
+                            {
+                                "id": id_,
+                                "source": source,
+                                "target": target,
+                                "label": "%.3g" % amount,
+                            },
+                            "\n      ",
+                        )
+                    xf.write("\n    ")
+                xf.write("\n  ")
+            xf.write("\n")
+
+    def write_graphml(self, xf, threshold=None):
+        """Write the graph as GraphML to ``xf``, an ``lxml.etree.xmlfile``."""
+
+        def tag(name):
+            return "{%s}%s" % (GRAPHML_NAMESPACE, name)
+
+        def data(key, value):
+            with xf.element(tag("data"), key=key):
+                xf.write(value)
+
+        with xf.element(tag("graphml"), nsmap={None: GRAPHML_NAMESPACE}):
+            for id_, for_, type_ in (
+                ("label", "node", "string"),
+                ("category", "node", "string"),
+                ("weight", "edge", "double"),
+            ):
+                _empty_element(
+                    xf,
+                    tag("key"),
+                    {
+                        "id": id_,
+                        "for": for_,
+                        "attr.name": id_,
+                        "attr.type": type_,
+                    },
+                    "\n  ",
+                )
+            xf.write("\n  ")
+            with xf.element(tag("graph"), id=self.database, edgedefault="directed"):
+                for id_, _, label, category in self.nodes():
+                    xf.write("\n    ")
+                    with xf.element(tag("node"), id=id_):
+                        data("label", label)
+                        data("category", category)
+                for id_, source, target, amount in self.edges(threshold):
+                    xf.write("\n    ")
+                    with xf.element(tag("edge"), id=id_, source=source, target=target):
+                        data("weight", repr(float(amount)))
+                xf.write("\n  ")
+            xf.write("\n")
+
+    def write_edgelist(self, f, threshold=None):
+        """Write the edges as CSV to the text file ``f``."""
+        codes = {id_: key[1] for id_, key, _, _ in self.nodes()}
+        writer = csv.writer(f)
+        writer.writerow(("source", "target", "weight"))
+        writer.writerows(
+            (codes[source], codes[target], amount)
+            for _, source, target, amount in self.edges(threshold)
+        )
 
     def get_data(self, E):
         """
@@ -129,39 +341,18 @@ class DatabaseToGEXF(object):
         >>> dtg.get_data(E)
         (nodes, edges)
         """
-
-        count = itertools.count()
-        nodes = []
-        edges = []
-
-        for key, value in tqdm(self.data.items()):
-            nodes.append(
-                E.node(
-                    E.attvalues(
-                        E.attvalue(
-                            value="-".join(value.get("categories", [])), **{"for": "0"}
-                        )
-                    ),
-                    id=self.id_mapping[key],
-                    label=value.get("name", "Unknown"),
-                )
+        nodes = [
+            E.node(
+                E.attvalues(E.attvalue(value=category, **{"for": "0"})),
+                id=id_,
+                label=label,
             )
-            for exc in value.get("exchanges", []):
-                if exc["input"] not in self.id_mapping:
-                    continue
-                elif exc["input"] == key:
-                    # Don't need production process in graph
-                    continue
-                else:
-                    edges.append(
-                        E.edge(
-                            id=str(next(count)),
-                            source=self.id_mapping[exc["input"]],
-                            target=self.id_mapping[key],
-                            label="%.3g" % exc["amount"],
-                        )
-                    )
-
+            for id_, _, label, category in self.nodes()
+        ]
+        edges = [
+            E.edge(id=id_, source=source, target=target, label="%.3g" % amount)
+            for id_, source, target, amount in self.edges()
+        ]
         return E.nodes(*nodes), E.edges(*edges)
 
 
@@ -187,12 +378,26 @@ class DatabaseSelectionToGEXF(DatabaseToGEXF):
     def __init__(self, database, keys):
         self.database = database
         self.filepath = os.path.join(projects.output_dir, database + ".selection.gexf")
-        unfiltered_data = Database(self.database).load()
+        nodes, edges = load_nodes_and_edges(
+            database, sorted(code for db, code in keys if db == database)
+        )
         self.data = {
-            key: value for key, value in unfiltered_data.items() if key in keys
+            (database, code): dict(document, exchanges=edges.get(code, []))
+            for code, (_, document) in nodes.items()
         }
         self.id_mapping = dict([(key, str(i)) for i, key in enumerate(self.data)])
 
+    def iter_nodes(self):
+        for key, value in self.data.items():
+            yield key, value.get("name", "Unknown"), "-".join(
+                value.get("categories") or []
+            )
+
+    def iter_edges(self):
+        for key, value in self.data.items():
+            for exc in value.get("exchanges", []):
+                yield exc["input"], key, exc["amount"]
+
 
 def keyword_to_gephi_graph(database, keyword):
     """
@@ -0,0 +1,219 @@
+import csv
+from pathlib import Path
+from typing import Optional, Union
+
+import numpy as np
+import scipy.io
+import scipy.sparse
+from bw2data import Database, databases, prepare_lca_inputs, projects
+from bw2data.backends.schema import ActivityDataset
+from bw_processing import safe_filename
+
+from .csv import reformat
+
+MATRIX_FORMATS = ("mtx", "npz", "parquet")
+
+# Columns of the label tables; ``index`` is the matrix row or column index
+LABEL_COLUMNS = (
+    "index",
+    "id",
+    "database",
+    "code",
+    "name",
+    "reference product",
+    "unit",
+    "location",
+    "categories",
+)
+
+
+def lci_matrices(database_name: str) -> dict:
+    """
+    Build the technosphere and biosphere matrices of ``database_name``.
+
+    The databases it depends on are included. Only the inventory data is loaded, with
+    ``LCA.load_lci_data``; no system is solved, so this also works for non-square
+    technosphere matrices.
+
+    Parameters
+    ----------
+    database_name : str
+        Name of the database to export.
+
+    Returns
+    -------
+    dict
+        With the keys:
+
+        * "technosphere": Technosphere matrix, as ``scipy.sparse.csr_matrix``
+        * "biosphere": Biosphere matrix, as ``scipy.sparse.csr_matrix``
+        * "products", "activities", "biosphere flows": Label tables of the technosphere
+          rows, technosphere (and biosphere) columns, and biosphere rows. Each is a list
+          of tuples with the ``LABEL_COLUMNS``, in index order.
+
+    Raises
+    ------
+    ValueError
+        If the database doesn't exist or is empty.
+    """
+    from bw2calc import LCA
+
+    if database_name not in databases:
+        raise ValueError(f"Database {database_name} not found")
+    node = Database(database_name).random()
+    if node is None:
+        raise ValueError(f"Database {database_name} is empty")
+
+    demand, data_objs, _ = prepare_lca_inputs(demand={node: 1}, remapping=False)
+    lca = LCA(demand, data_objs=data_objs)
+    lca.load_lci_data(nonsquare_ok=True)
+
+    indices = {
+        "products": lca.dicts.product,
+        "activities": lca.dicts.activity,
+        "biosphere flows": lca.dicts.biosphere,
+    }
+    metadata = load_label_metadata(
+        set(Database(database_name).find_graph_dependents()),
+        {id_ for mapping in indices.values() for id_ in mapping},
+    )
+    return {
+        "technosphere": lca.technosphere_matrix.tocsr(),
+        "biosphere": lca.biosphere_matrix.tocsr(),
+        **{
+            label: [
+                (index, id_) + metadata[id_]
+                for id_, index in sorted(mapping.items(), key=lambda x: x[1])
+            ]
+            for label, mapping in indices.items()
+        },
+    }
+
+
+def load_label_metadata(database_names: set, ids: set) -> dict:
+    """
+    Return ``{id: label values}`` of the nodes ``ids``, with one query.
+
+    The nodes are read from ``database_names``. The label values are the
+    ``LABEL_COLUMNS`` after ``index`` and ``id``; nested values like categories are
+    joined with ``::``.
+    """
+    metadata = {}
+    for id_, database, code, name, product, location, data in (
+        ActivityDataset.select(
+            ActivityDataset.id,
+            ActivityDataset.database,
+            ActivityDataset.code,
+            ActivityDataset.name,
+            ActivityDataset.product,
+            ActivityDataset.location,
+            ActivityDataset.data,
+        )
+        .where(ActivityDataset.database << sorted(database_names))
+        .tuples()
+    ):
+        if id_ in ids:
+            metadata[id_] = (
+                database,
+                code,
+                name,
+                product,
+                data.get("unit"),
+                location,
+                reformat(data.get("categories") or ()) or None,
+            )
+    return metadata
+
+
+def write_lci_matrices(
+    database_name: str,
+    format: str = "npz",
+    dirpath: Optional[Union[str, Path]] = None,
+) -> Path:
+    """
+    Export the LCI matrices of ``database_name`` without solving the LCA.
+
+    Writes the files ``technosphere`` and ``biosphere``, with the matrices, and the
+    label tables ``products``, ``activities``, and ``biosphere flows`` to a new
+    directory ``lci-matrices-<database name>`` in ``dirpath``.
+
+    The ``format`` can be:
+
+    * "mtx": Matrix Market coordinate files (``.mtx``) which can be read with
+      ``scipy.io.mmread``, and CSV label tables
+    * "npz": Compressed sparse row matrices (``.npz``) which can be read with
+      ``scipy.sparse.load_npz``, and CSV label tables
+    * "parquet": Parquet files, with the matrices as ``row``, ``col``, and ``value``
+      coordinate columns. Needs ``pyarrow``.
+
+    The label tables have the ``LABEL_COLUMNS``, one row per matrix index.
+
+    Parameters
+    ----------
+    database_name : str
+        Name of the database to export. The databases it depends on are included.
+    format : str, optional
+        One of ``MATRIX_FORMATS``. Default is "npz".
+    dirpath : str or Path, optional
+        Directory to create the export directory in. Default is ``projects.output_dir``.
+
+    Returns
+    -------
+    Path
+        The export directory.
+    """
+    if format not in MATRIX_FORMATS:
+        raise ValueError(f"Unknown format {format}; must be one of {MATRIX_FORMATS}")
+    if format == "parquet":
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise ImportError("The parquet format requires `pyarrow`")
+
+    data = lci_matrices(database_name)
+
+    dirpath = Path(projects.output_dir if dirpath is None else dirpath)
+    if not dirpath.is_dir():
+        raise ValueError(f"Directory path {dirpath} is not a directory")
+    dirpath = dirpath / ("lci-matrices-" + safe_filename(database_name, False))
+    dirpath.mkdir(exist_ok=True)
+
+    for name in ("technosphere", "biosphere"):
+        matrix = data[name]
+        if format == "mtx":
+            scipy.io.mmwrite(dirpath / f"{name}.mtx", matrix)
+        elif format == "npz":
+            scipy.sparse.save_npz(dirpath / f"{name}.npz", matrix)
+        else:
+            coo = matrix.tocoo()
+            pyarrow.parquet.write_table(
+                pyarrow.table(
+                    {
+                        "row": coo.row.astype(np.int64),
+                        "col": coo.col.astype(np.int64),
+                        "value": coo.data,
+                    }
+                ),
+                dirpath / f"{name}.parquet",
+            )
+
+    for name in ("products", "activities", "biosphere flows"):
+        filename = name.replace(" ", "-")
+        if format == "parquet":
+            pyarrow.parquet.write_table(
+                pyarrow.table(
+                    {
+                        column: [row[index] for row in data[name]]
+                        for index, column in enumerate(LABEL_COLUMNS)
+                    }
+                ),
+                dirpath / f"{filename}.parquet",
+            )
+        else:
+            with open(dirpath / f"{filename}.csv", "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(LABEL_COLUMNS)
+                writer.writerows(data[name])
+
+    return dirpath
@@ -17,6 +17,8 @@ from stats_arrays.distributions import (
 )
 from tqdm import tqdm
 
+from ..utils import intern_strings
+
 
 def robust_text(root: etree.ElementBase, attribute: str) -> Optional[str]:
     """Just because the spec says it must be there doesn't mean it will be."""
@@ -94,7 +96,7 @@ class Ecospold1DataExtractor:
                     if x:
                         data.append(x)
 
-        return data
+        return intern_strings(data)
 
     @classmethod
     def process_file(cls, filepath: Union[str, Path, StringIO], db_name: str):
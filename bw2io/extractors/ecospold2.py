@@ -16,6 +16,8 @@ from stats_arrays.distributions import (
 )
 from tqdm import tqdm
 
+from ..utils import intern_strings, process_pool_context
+
 PM_MAPPING = {
     "reliability": "reliability",
     "completeness": "completeness",
@@ -125,7 +127,8 @@ class Ecospold2DataExtractor(object):
         db_name : str
             The name of the database to create.
         use_mp : bool, optional
-            Whether to use multiprocessing to extract the data (default is True).
+            Whether to use multiprocessing to extract the data (default is True). Can
+            be used while other threads run; see `bw2io.utils.process_pool_context`.
         cache : bool, optional
             Cache extracted datasets as `.json.gz` files alongside the source `.spold`
             files for faster re-imports (default is False).
@@ -169,7 +172,8 @@ class Ecospold2DataExtractor(object):
 
         if use_mp:
             with tqdm(total=len(filelist)) as pb:
-                with multiprocessing.Pool(processes=multiprocessing.cpu_count()) as pool:
+                context = process_pool_context()
+                with context.Pool(processes=multiprocessing.cpu_count()) as pool:
                     results = [
                         pool.apply_async(
                             Ecospold2DataExtractor.extract_activity,
@@ -189,7 +193,7 @@ class Ecospold2DataExtractor(object):
                     )
                 )
 
-        return data
+        return intern_strings(data)
 
     @classmethod
     def condense_multiline_comment(cls, element):
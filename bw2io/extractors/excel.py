@@ -1,7 +1,16 @@
 import os
+import zipfile
 from pathlib import Path
+from typing import Optional, Sequence
 
+from lxml import etree
 from openpyxl import cell, load_workbook, workbook
+from openpyxl.utils import column_index_from_string
+
+SPREADSHEET_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+OFFICE_RELATIONSHIPS_NS = (
+    "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+)
 
 
 def get_cell_value_handle_error(cell: cell.cell.Cell):
@@ -138,6 +147,189 @@ class ExcelExtractor:
         wb.close()
         return data
 
+    @classmethod
+    def extract_columns(
+        cls,
+        filepath: Path,
+        sheet_name: str,
+        columns: Optional[Sequence[str]] = None,
+        strip: bool = True,
+    ) -> dict:
+        """
+        Extract whole columns of a single sheet, without loading the rest of the
+        workbook.
+
+        The XML of the sheet is streamed directly from the ``.xlsx`` file, and only the
+        cells of the selected columns are converted to values, which makes this much
+        faster than ``extract`` for large sheets of which only some columns are needed.
+        No styles are read, so dates are returned as numbers.
+
+        Parameters
+        ----------
+        filepath : str
+            The path to the Excel file.
+        sheet_name : str
+            The name of the sheet to extract data from. The first row must have the
+            column labels.
+        columns : list of str, optional
+            Labels of the columns to extract, matched case-insensitively. All labelled
+            columns are extracted if not given.
+        strip : bool, optional
+            If True, strip whitespace from cell values, by default True.
+
+        Returns
+        -------
+        dict
+            Lists of column values, keyed by their lower case labels. Rows without any
+            value in these columns are skipped, and error values are returned as None,
+            like in ``extract``.
+
+        Raises
+        ------
+        AssertionError
+            If the file at 'filepath' does not exist.
+        ValueError
+            If the sheet or one of the columns is not present in the workbook.
+
+        Examples
+        --------
+        >>> ExcelExtractor.extract_columns("lcia.xlsx", "Sheet1", ["name", "amount"])
+        {'name': ['Aluminium', 'Uranium ore, 1.11 GJ per kg'], 'amount': [42, 1000000]}
+        """
+        filepath = Path(filepath)
+        assert filepath.is_file(), "Can't file file at path {}".format(filepath)
+        with zipfile.ZipFile(filepath) as archive:
+            sheet_path, strings_path = cls._sheet_paths(archive, sheet_name)
+            strings = cls._shared_strings(archive, strings_path) if strings_path else []
+            with archive.open(sheet_path) as f:
+                wanted = set()
+                rows = cls._sheet_rows(f, strings, wanted)
+                first = next(rows, {})
+                header = [
+                    str(first[index]).strip().lower() if index in first else None
+                    for index in range(max(first, default=-1) + 1)
+                ]
+                if columns is None:
+                    labels = [label for label in header if label]
+                else:
+                    labels = [label.lower() for label in columns]
+                missing = [label for label in labels if label not in header]
+                if missing:
+                    raise ValueError(
+                        "Unknown column label(s) in sheet {}: {}".format(
+                            sheet_name, ", ".join(missing)
+                        )
+                    )
+                indices = [header.index(label) for label in labels]
+                data = [[] for _ in labels]
+
+                wanted.update(indices)
+                for row in rows:
+                    values = [row.get(index) for index in indices]
+                    if not any(values):
+                        continue
+                    for column, value in zip(data, values):
+                        if strip and isinstance(value, str):
+                            value = value.strip()
+                        column.append(value)
+        return dict(zip(labels, data))
+
+    @staticmethod
+    def _sheet_paths(archive: zipfile.ZipFile, sheet_name: str) -> tuple:
+        """Find the archive paths of the sheet ``sheet_name`` and the shared strings."""
+        workbook_xml = etree.fromstring(archive.read("xl/workbook.xml"))
+        relationships = {
+            rel.get("Id"): rel
+            for rel in etree.fromstring(archive.read("xl/_rels/workbook.xml.rels"))
+        }
+
+        def path(rel):
+            target = rel.get("Target")
+            return target.lstrip("/") if target.startswith("/") else "xl/" + target
+
+        for sheet in workbook_xml.iter(SPREADSHEET_NS + "sheet"):
+            if sheet.get("name") == sheet_name:
+                rel_id = sheet.get(OFFICE_RELATIONSHIPS_NS + "id")
+                sheet_path = path(relationships[rel_id])
+                break
+        else:
+            raise ValueError("Unknown sheet name(s): {}".format(sheet_name))
+
+        for rel in relationships.values():
+            if rel.get("Type", "").endswith("/sharedStrings"):
+                return sheet_path, path(rel)
+        return sheet_path, None
+
+    @staticmethod
+    def _shared_strings(archive: zipfile.ZipFile, path: str) -> list:
+        """Read the shared strings, joining rich text and skipping phonetic hints."""
+        strings = []
+        with archive.open(path) as f:
+            for _, si in etree.iterparse(f, tag=SPREADSHEET_NS + "si"):
+                strings.append(
+                    "".join(
+                        t.text or ""
+                        for t in si.iter(SPREADSHEET_NS + "t")
+                        if t.getparent().tag != SPREADSHEET_NS + "rPh"
+                    )
+                )
+                si.clear()
+        return strings
+
+    @staticmethod
+    def _sheet_rows(f, strings: list, wanted: set):
+        """
+        Generate the rows of a sheet XML file as ``{column index: value}``, without
+        empty cells.
+
+        Only the columns in ``wanted`` are read, or all columns while it is empty; it
+        can be filled after reading the header row.
+        """
+        v_tag, is_tag, t_tag = (SPREADSHEET_NS + tag for tag in ("v", "is", "t"))
+        positions = {}
+        for _, row in etree.iterparse(f, tag=SPREADSHEET_NS + "row"):
+            values = {}
+            position = -1
+            for c in row:
+                ref = c.get("r")
+                if ref:
+                    letters = ref.rstrip("0123456789")
+                    try:
+                        position = positions[letters]
+                    except KeyError:
+                        position = positions[letters] = (
+                            column_index_from_string(letters) - 1
+                        )
+                else:
+                    position += 1
+                if wanted and position not in wanted:
+                    continue
+
+                # Children are looked up by hand, as ``find`` is much slower
+                v = None
+                for child in c:
+                    if child.tag == v_tag:
+                        v = child.text
+                    elif child.tag == is_tag:
+                        v = "".join(t.text or "" for t in child.iter(t_tag))
+                if v is None:
+                    continue
+                kind = c.get("t", "n")
+                if kind == "s":
+                    values[position] = strings[int(v)]
+                elif kind == "n":
+                    values[position] = (
+                        float(v) if ("." in v or "E" in v or "e" in v) else int(v)
+                    )
+                elif kind == "b":
+                    values[position] = v == "1"
+                elif kind != "e":
+                    values[position] = v
+            row.clear()
+            while row.getprevious() is not None:
+                del row.getparent()[0]
+            yield values
+
     @classmethod
     def extract_sheet(cls, wb: workbook.Workbook, name: str, strip: bool = True):
         """
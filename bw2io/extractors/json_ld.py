@@ -1,6 +1,8 @@
 import json
 from pathlib import Path
 
+from ..utils import intern_strings
+
 FILES_TO_IGNORE = {
     "context.json",
     "layout.json",
@@ -109,4 +111,4 @@ class JSONLDExtractor(object):
                 if directory.is_dir() and directory.name not in DIRECTORIES_TO_IGNORE
             }
 
-        return data
+        return intern_strings(data)
@@ -5,7 +5,6 @@ import re
 import uuid
 from numbers import Number
 
-from bw2data.logs import close_log, get_io_logger
 from bw2parameters import ParameterSet
 from bw2parameters.errors import MissingName
 from stats_arrays import (
@@ -18,12 +17,7 @@ from stats_arrays import (
 
 from ..compatibility import SIMAPRO_BIOSPHERE
 from ..strategies.simapro import normalize_simapro_formulae
-
-INTRODUCTION = """Starting SimaPro import:
-\tFilepath: %s
-\tDelimiter: %s
-\tName: %s
-"""
+from ..utils import intern_strings
 
 SIMAPRO_TECHNOSPHERE = {
     "Avoided products",
@@ -187,16 +181,6 @@ class SimaProCSVExtractor(object):
                 - a dictionary containing project metadata extracted from the SimaPro export file.
         """
         assert os.path.exists(filepath), "Can't find file %s" % filepath
-        log, logfile = get_io_logger("SimaPro-extractor")
-
-        log.info(
-            INTRODUCTION
-            % (
-                filepath,
-                repr(delimiter),
-                name,
-            )
-        )
         with open(filepath, "r", encoding=encoding) as csv_file:
             reader = csv.reader(csv_file, delimiter=delimiter)
             lines = [
@@ -234,8 +218,7 @@ class SimaProCSVExtractor(object):
             except EndOfDatasets:
                 break
 
-        close_log(log)
-        return datasets, global_parameters, project_metadata
+        return intern_strings(datasets), global_parameters, project_metadata
 
     @classmethod
     def get_next_process_index(cls, data, index):
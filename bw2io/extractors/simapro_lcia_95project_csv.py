@@ -1,7 +1,6 @@
 import csv
 from pathlib import Path
 
-from bw2data.logs import close_log, get_io_logger
 from stats_arrays import *
 
 from bw2io.utils import standardize_method_to_len_3
@@ -54,14 +53,6 @@ class SimaProLCIA95ProjectCSVExtractor:
     def extract(cls, filepath: Path, delimiter: str = ";", encoding: str = "cp1252"):
         filepath = Path(filepath)
         assert filepath.is_file(), f"Can't find file {filepath}"
-        log, logfile = get_io_logger("SimaPro-LCIA-extractor")
-
-        log.info(
-            f"""Starting SimaPro import:
-    Filepath: {filepath}
-    Delimiter: {delimiter}"""
-        )
-
         strip_delete = lambda obj: (
             obj.strip().replace("\x7f", "") if isinstance(obj, str) else obj
         )
@@ -102,7 +93,6 @@ class SimaProLCIA95ProjectCSVExtractor:
             elif section[0][0] == "Weighting":
                 pass
 
-        close_log(log)
         return impact_categories
 
     @classmethod
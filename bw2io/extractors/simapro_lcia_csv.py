@@ -2,14 +2,8 @@ import csv
 import os
 from numbers import Number
 
-from bw2data.logs import close_log, get_io_logger
 from stats_arrays import *
 
-INTRODUCTION = """Starting SimaPro import:
-\tFilepath: %s
-\tDelimiter: %s
-"""
-
 SKIPPABLE_SECTIONS = {
     "Airborne emissions",
     "Economic issues",
@@ -56,16 +50,6 @@ class SimaProLCIACSVExtractor(object):
     @classmethod
     def extract(cls, filepath, delimiter=";", encoding="cp1252", **kwargs):
         assert os.path.exists(filepath), "Can't find file %s" % filepath
-        log, logfile = get_io_logger("SimaPro-LCIA-extractor")
-
-        log.info(
-            INTRODUCTION
-            % (
-                filepath,
-                repr(delimiter),
-            )
-        )
-
         with open(filepath, "r", encoding=encoding) as csv_file:
             reader = csv.reader(csv_file, delimiter=delimiter)
             lines = [
@@ -88,7 +72,6 @@ class SimaProLCIACSVExtractor(object):
             except EndOfDatasets:
                 break
 
-        close_log(log)
         return datasets
 
     @classmethod
@@ -1,13 +1,111 @@
 import functools
+import itertools
+import math
+import multiprocessing
+import pickle
 import warnings
 from datetime import datetime
 from time import time
 
+from ..diagnostics import Diagnostics, collecting
 from ..errors import StrategyError
 from ..migrations import migrations
 from ..strategies import migrate_datasets, migrate_exchanges
 from ..unlinked_data import UnlinkedData, unlinked_data
-from ..utils import activity_hash
+from ..utils import (
+    TRANSIENT_HASH,
+    activity_hash,
+    activity_hash_memo,
+    intern_strings,
+    is_dataset_local,
+)
+
+
+def _strategy_name(strategy):
+    try:
+        return strategy.__name__
+    except AttributeError:  # Curried function
+        return strategy.func.__name__
+
+
+def _apply_dataset_local_strategies(strategies, shard):
+    """Apply ``strategies`` to ``shard``; called in worker processes.
+
+    Returns the modified shard, or the ``StrategyError`` instead of raising it."""
+    try:
+        for strategy in strategies:
+            shard = strategy(shard)
+        return shard
+    except StrategyError as err:
+        return err
+
+
+def _picklable(obj) -> bool:
+    try:
+        pickle.dumps(obj)
+        return True
+    except Exception:
+        return False
+
+
+class UnlinkedIndex(object):
+    """
+    Unlinked edges of an importer's data, grouped by `activity_hash`.
+
+    Edges linked in place after the index was built are skipped and pruned when the
+    index is read, so linking doesn't require a rebuild. Other changes do; the index
+    doesn't look for them, as reading it would then need a scan of all edges. Instead,
+    the importer discards the index after each strategy, migration, and other method
+    which changes its data, and builds a new one when it is next used.
+
+    """
+
+    def __init__(self, data):
+        self.data, self.data_length = data, len(data)
+        self.groups = {}
+        for ds in data:
+            for exc in ds.get("exchanges", []):
+                if not exc.get("input"):
+                    key = activity_hash(exc, algorithm=TRANSIENT_HASH)
+                    self.groups.setdefault(key, []).append(exc)
+
+    def is_current(self, data):
+        """
+        Check that ``data`` is the (unresized) list the index was built from.
+
+        Doesn't look at the edges; changes made to them in place, other than linking,
+        must be signalled with ``ImportBase.refresh_unlinked``.
+
+        """
+        return data is self.data and len(data) == self.data_length
+
+    def prune(self):
+        """Remove edges linked since the index was built, and return their groups."""
+        linked = {}
+        for key, edges in list(self.groups.items()):
+            remaining = [exc for exc in edges if not exc.get("input")]
+            if len(remaining) < len(edges):
+                linked[key] = [exc for exc in edges if exc.get("input")]
+            if remaining:
+                self.groups[key] = remaining
+            else:
+                del self.groups[key]
+        return linked
+
+    def __iter__(self):
+        self.prune()
+        for edges in list(self.groups.values()):
+            yield edges[0]
+
+    def __len__(self):
+        self.prune()
+        return len(self.groups)
+
+    @property
+    def total(self):
+        """Total number of unlinked edges, including duplicates."""
+        self.prune()
+        return sum(len(edges) for edges in self.groups.values())
 
 
 class ImportBase(object):
@@ -76,38 +174,47 @@ class ImportBase(object):
         Notes
         -----
         Strategies should not partially modify data before raising a `StrategyError`.
+        Issues recorded by the strategy are collected in `self.diagnostics`.
 
         """
         if not hasattr(self, "applied_strategies"):
             self.applied_strategies = []
 
-        try:
-            func_name = strategy.__name__
-        except AttributeError:  # Curried function
-            func_name = strategy.func.__name__
+        func_name = _strategy_name(strategy)
 
         if verbose:
             print("Applying strategy: {}".format(func_name))
 
         try:
-            self.data = strategy(self.data)
+            with collecting(self.diagnostics, func_name):
+                self.data = strategy(self.data)
             self.applied_strategies.append(func_name)
         except StrategyError as err:
             print("Couldn't apply strategy {}:\n\t{}".format(func_name, err))
+        else:
+            self._invalidate_unlinked_index(func_name)
 
-    def apply_strategies(self, strategies=None, verbose=True):
+    def apply_strategies(self, strategies=None, verbose=True, processes=None):
         """
         Apply a list of strategies to the importer's data.
 
         This method applies a list of given strategies to the importer's data and logs the applied strategies' names to
         `self.applied_strategies`. If no list of strategies is provided, it uses `self.strategies`.
 
+        If `processes` is given, consecutive dataset-local strategies (see
+        `bw2io.utils.dataset_local`) are applied together in a pool of worker processes,
+        each worker handling a shard of the data. Other strategies, like linking, need
+        all the data, and are applied normally in between.
+
         Parameters
         ----------
         strategies : list, optional
             List of strategies to apply. Defaults to `self.strategies`.
         verbose : bool, optional
             If True, print a message indicating which strategy is being applied. Defaults to True.
+        processes : int, optional
+            Number of worker processes for dataset-local strategies. Defaults to None
+            (no worker processes).
 
         Returns
         -------
@@ -123,10 +230,27 @@ class ImportBase(object):
         start = time()
         func_list = self.strategies if strategies is None else strategies
         total = len(func_list)
-        for i, func in enumerate(func_list):
-            self.apply_strategy(func, verbose)
-            if hasattr(self, "signal") and hasattr(self.signal, "emit"):
-                self.signal.emit(i + 1, total)
+
+        parallel = processes is not None and processes > 1
+        if parallel:
+            runs = [
+                list(run)
+                for _, run in itertools.groupby(func_list, key=is_dataset_local)
+            ]
+        else:
+            runs = [[func] for func in func_list]
+
+        done = 0
+        # Strategies in a row often hash the same edges
+        with activity_hash_memo():
+            for run in runs:
+                if parallel and is_dataset_local(run[0]):
+                    self._apply_strategies_in_parallel(run, processes, verbose)
+                else:
+                    self.apply_strategy(run[0], verbose)
+                done += len(run)
+                if hasattr(self, "signal") and hasattr(self.signal, "emit"):
+                    self.signal.emit(done, total)
         if verbose:
             print(
                 "Applied {} strategies in {:.2f} seconds".format(
@@ -134,12 +258,75 @@ class ImportBase(object):
                 )
             )
 
+    def _apply_strategies_in_parallel(self, strategies, processes, verbose=True):
+        """
+        Apply dataset-local `strategies` to shards of the data in worker processes.
+
+        Falls back to `apply_strategy` if the strategies can't be sent to worker
+        processes, or if one of them raises a `StrategyError`; the workers only modify
+        copies of the data.
+
+        """
+        if (
+            not self.data
+            or not isinstance(self.data, list)
+            or not _picklable(strategies)
+        ):
+            for func in strategies:
+                self.apply_strategy(func, verbose)
+            return
+
+        names = [_strategy_name(func) for func in strategies]
+        if verbose:
+            print("Applying strategies in parallel: {}".format(", ".join(names)))
+
+        # More shards than processes to balance the load
+        size = math.ceil(len(self.data) / (processes * 4))
+        shards = [self.data[i : i + size] for i in range(0, len(self.data), size)]
+        with multiprocessing.Pool(processes=processes) as pool:
+            results = pool.starmap(
+                _apply_dataset_local_strategies,
+                [(strategies, shard) for shard in shards],
+            )
+
+        if any(isinstance(result, StrategyError) for result in results):
+            for func in strategies:
+                self.apply_strategy(func, verbose)
+            return
+
+        # Results were unpickled, so repeated labels are copies again
+        self.data = intern_strings([ds for shard in results for ds in shard])
+        if not hasattr(self, "applied_strategies"):
+            self.applied_strategies = []
+        self.applied_strategies.extend(names)
+        # The unpickled edges are new objects, so the index can't see what was linked
+        self._unlinked_index = None
+
+    @property
+    def diagnostics(self):
+        """
+        The `Diagnostics` with the issues recorded by strategies and some extractors.
+
+        Issues are only formatted when exported, e.g. with
+        `self.diagnostics.to_jsonl(filepath)`.
+
+        Returns
+        -------
+        Diagnostics
+
+        """
+        diagnostics = getattr(self, "_diagnostics", None)
+        if diagnostics is None:
+            diagnostics = self._diagnostics = Diagnostics()
+        return diagnostics
+
     @property
     def unlinked(self):
         """
         Iterate through unique unlinked exchanges.
 
-        Uniqueness is determined by `activity_hash`.
+        Uniqueness is determined by `activity_hash`. Uses `unlinked_index`, so repeated
+        iteration doesn't rescan the data.
 
         Yields
         ------
@@ -147,16 +334,63 @@ class ImportBase(object):
             The unlinked exchange that is currently being iterated over.
 
         """
-        seen = set()
-        for ds in self.data:
-            for exc in ds.get("exchanges", []):
-                if not exc.get("input"):
-                    ah = activity_hash(exc)
-                    if ah in seen:
-                        continue
-                    else:
-                        seen.add(ah)
-                        yield exc
+        yield from self.unlinked_index
+
+    @property
+    def unlinked_index(self):
+        """
+        The `UnlinkedIndex` of the importer's data.
+
+        Built on first access and reused until a strategy or migration is applied, or
+        `self.data` is replaced or resized. Edges linked in place are dropped without
+        rebuilding. Reading it doesn't scan the data, so call `self.refresh_unlinked()`
+        after other changes made directly to `self.data`, like unlinking or editing
+        edges.
+
+        Returns
+        -------
+        UnlinkedIndex
+
+        """
+        index = getattr(self, "_unlinked_index", None)
+        if index is None or not index.is_current(self.data):
+            index = self._unlinked_index = UnlinkedIndex(self.data)
+        return index
+
+    def refresh_unlinked(self):
+        """Rebuild `unlinked_index` on its next use."""
+        self._unlinked_index = None
+
+    def _invalidate_unlinked_index(self, strategy_name):
+        index = getattr(self, "_unlinked_index", None)
+        if index is None:
+            return
+        linked = index.prune()
+        if linked:
+            if not hasattr(self, "linked_by_strategy"):
+                self.linked_by_strategy = {}
+            self.linked_by_strategy.setdefault(strategy_name, {}).update(linked)
+        self._unlinked_index = None
+
+    def linking_report(self):
+        """
+        Count the unique edges linked by each strategy.
+
+        Only strategies applied while `unlinked_index` existed are tracked; access
+        `self.unlinked` or `self.unlinked_index` to start tracking. Edges which a
+        strategy replaced instead of modifying in place aren't counted. The linked edges
+        themselves are in `self.linked_by_strategy`, grouped by `activity_hash`.
+
+        Returns
+        -------
+        dict
+            Strategy names mapped to the number of unique edges they linked.
+
+        """
+        return {
+            name: len(groups)
+            for name, groups in getattr(self, "linked_by_strategy", {}).items()
+        }
 
     def write_unlinked(self, name):
         """
@@ -2,7 +2,9 @@ import collections
 import functools
 import itertools
 import warnings
+from collections.abc import Mapping
 from pathlib import Path
+from time import perf_counter
 from typing import Callable, List, Optional, Set, Tuple, Union
 
 import randonneur as rn
@@ -15,7 +17,12 @@ from bw2data.parameters import (
     ParameterizedExchange,
     ProjectParameter,
 )
+from randonneur.edges import verb_dispatch as rn_edge_verbs
+from randonneur.nodes import verb_dispatch as rn_node_verbs
+from randonneur.utils import FlexibleLookupDict, apply_mapping
+from randonneur_data import Registry
 
+from ..bulk import upsert_nodes, write_nodes_as_datapackage, write_nodes_pipelined
 from ..errors import NonuniqueCode, StrategyError, WrongDatabase
 from ..export.excel import write_lci_matching
 from ..migrations import migrations
@@ -29,7 +36,7 @@ from ..strategies import (
     normalize_units,
     strip_biosphere_exc_locations,
 )
-from ..utils import activity_hash
+from ..utils import TRANSIENT_HASH, activity_hash, is_dataset_local
 from .base import ImportBase
 
 EXCHANGE_SPECIFIC_KEYS = (
@@ -48,6 +55,12 @@ EXCHANGE_SPECIFIC_KEYS = (
 DEFAULT_TARGET_FIELDS = ("name", "location", "reference product", "unit")
 
 
+def _is_unlinked(ds: dict, exc: dict) -> bool:
+    return not exc.get("input") and not (
+        ds.get("type") == "multifunctional" and exc.get("functional")
+    )
+
+
 def _reformat_biosphere_exc_as_new_node(exc: dict, db_name: str) -> dict:
     return {k: v for k, v in exc.items() if k not in EXCHANGE_SPECIFIC_KEYS} | {
         "type": labels.biosphere_node_default,
@@ -57,6 +70,90 @@ def _reformat_biosphere_exc_as_new_node(exc: dict, db_name: str) -> dict:
     }
 
 
+class _CountingLookup(Mapping):
+    """Wrap a randonneur `FlexibleLookupDict` and count the objects it matched."""
+
+    def __init__(self, fld: FlexibleLookupDict):
+        self.fld = fld
+        self.hits = 0
+        self._last = None
+
+    def __getitem__(self, obj: dict) -> dict:
+        result = self.fld[obj]
+        # Some verbs look up the same object more than once
+        if obj is not self._last:
+            self.hits += 1
+            self._last = obj
+        return result
+
+    def __len__(self) -> int:
+        return len(self.fld)
+
+    def __iter__(self):
+        return iter(self.fld)
+
+
+class _RandonneurStep:
+    """
+    One randonneur transformation applied to edges or nodes, with its counters.
+
+    Uses the verb dispatch tables of randonneur, which are not public API; the supported
+    randonneur versions are pinned in `pyproject.toml`.
+    """
+
+    def __init__(
+        self, name: str, migrations: dict, config: rn.MigrationConfig, dispatch: dict
+    ):
+        self.name = name
+        self.config = config
+        self.verbs = [v for v in config.verbs if v in dispatch and v in migrations]
+        self.functions = [dispatch[verb] for verb in self.verbs]
+        self.lookups = [
+            (
+                migrations[verb]
+                if verb == "create"
+                else _CountingLookup(
+                    FlexibleLookupDict(
+                        input_data=migrations[verb],
+                        fields_filter=config.fields,
+                        case_sensitive=config.case_sensitive,
+                    )
+                )
+            )
+            for verb in self.verbs
+        ]
+        self.created = 0
+        self.seconds = 0.0
+
+    @property
+    def hits(self) -> int:
+        return self.created + sum(
+            lookup.hits
+            for lookup in self.lookups
+            if isinstance(lookup, _CountingLookup)
+        )
+
+    def apply_to_node(self, node: dict) -> None:
+        if self.config.node_filter and not self.config.node_filter(node):
+            return
+        start = perf_counter()
+        for verb, function, lookup in zip(self.verbs, self.functions, self.lookups):
+            if verb == "create":
+                before = len(node.get(self.config.edges_label, []))
+            function(node=node, migration_fld=lookup, config=self.config)
+            if verb == "create":
+                self.created += len(node.get(self.config.edges_label, [])) - before
+        self.seconds += perf_counter() - start
+
+    def apply_to_graph(self, graph: List[dict]) -> None:
+        start = perf_counter()
+        for verb, function, lookup in zip(self.verbs, self.functions, self.lookups):
+            if verb == "create":
+                self.created += len(lookup)
+            function(graph=graph, migration_fld=lookup, config=self.config)
+        self.seconds += perf_counter() - start
+
+
 class LCIImporter(ImportBase):
     """Base class for format-specific importers.
 
@@ -82,7 +179,14 @@ class LCIImporter(ImportBase):
 
     @property
     def all_linked(self) -> bool:
-        return self.statistics()[2] == 0
+        # Stops at the first unlinked edge; the full statistics are only computed
+        # (and printed) to explain why the data isn't linked
+        if any(
+            _is_unlinked(ds, exc) for ds in self.data for exc in ds.get("exchanges", [])
+        ):
+            self.statistics()
+            return False
+        return True
 
     @property
     def needs_multifunctional_database(self) -> bool:
@@ -90,51 +194,43 @@ class LCIImporter(ImportBase):
 
     def statistics(self, print_stats: bool = True) -> Tuple[int, int, int, int]:
         num_nodes = len(self.data)
-        num_edges = sum(1 for ds in self.data for exc in ds.get("exchanges", []))
-        num_unlinked = sum(
-            [
-                1
-                for ds in self.data
-                for exc in ds.get("exchanges", [])
-                if not exc.get("input")
-                and not (ds.get("type") == "multifunctional" and exc.get("functional"))
-            ]
-        )
-        num_multifunctional = sum(
-            1 for ds in self.data if ds.get("type") == "multifunctional"
-        )
+        num_edges = num_unlinked = num_multifunctional = 0
+        node_types = collections.Counter()
+        edge_types = collections.Counter()
+        db_edges = collections.Counter()
+        uu = collections.defaultdict(set)
+
+        # Everything is computed in a single pass over the edges
+        for ds in self.data:
+            if ds.get("type") == "multifunctional":
+                num_multifunctional += 1
+            if print_stats:
+                node_types[ds.get("type")] += 1
+            for exc in ds.get("exchanges", []):
+                num_edges += 1
+                if _is_unlinked(ds, exc):
+                    num_unlinked += 1
+                if not print_stats:
+                    continue
+                edge_types[exc.get("type")] += 1
+                input_ = exc.get("input")
+                if not input_:
+                    uu[exc.get("type")].add(
+                        activity_hash(exc, algorithm=TRANSIENT_HASH)
+                    )
+                elif isinstance(input_, tuple):
+                    db_edges[input_[0]] += 1
 
         if print_stats:
             stats_nodes = "".join(
-                f"\t{kind}: {count}\n"
-                for kind, count in collections.Counter(
-                    ds.get("type") for ds in self.data
-                ).most_common()
+                f"\t{kind}: {count}\n" for kind, count in node_types.most_common()
             )
             stats_edges = "".join(
-                f"\t{kind}: {count}\n"
-                for kind, count in collections.Counter(
-                    exc.get("type")
-                    for ds in self.data
-                    for exc in ds.get("exchanges", [])
-                ).most_common()
+                f"\t{kind}: {count}\n" for kind, count in edge_types.most_common()
             )
             stats_db_edges = "".join(
-                f"\t{db}: {count}\n"
-                for db, count in collections.Counter(
-                    exc["input"][0]
-                    for ds in self.data
-                    for exc in ds.get("exchanges", [])
-                    if "input" in exc
-                    and isinstance(exc["input"], tuple)
-                    and len(exc["input"])
-                ).most_common()
+                f"\t{db}: {count}\n" for db, count in db_edges.most_common()
             )
-
-            uu = collections.defaultdict(set)
-            for ds in self.data:
-                for exc in (e for e in ds.get("exchanges", []) if not e.get("input")):
-                    uu[exc.get("type")].add(activity_hash(exc))
             stats_unlinked = "".join(
                 f"\t{kind}: {count}\n"
                 for kind, count in sorted(
@@ -301,11 +397,21 @@ class LCIImporter(ImportBase):
 
         ``delete_existing`` effects both the existing database (it will be emptied prior to writing if True, which is the default), and, if ``activate_parameters`` is True, existing database and activity parameters. Database parameters will only be deleted if the import data specifies a new set of database parameters (i.e. ``database_parameters`` is not ``None``) - the same is true for activity parameters. If you need finer-grained control, please use the ``DatabaseParameter``, etc. objects directly.
 
+        If ``delete_existing`` is False and the database already exists in the SQLite
+        backend, the data is upserted: only new or changed activities (compared by key
+        and content) and their exchanges are written, existing activities not in
+        ``data`` are kept, and the database is only processed if something changed. See
+        ``bw2io.bulk.upsert_nodes``.
+
         Args:
             * *data* (dict, optional): The data to write to the ``Database``. Default is ``self.data``.
             * *delete_existing* (bool, default ``True``): See above.
             * *activate_parameters* (bool, default ``False``). Instead of storing parameters in ``Activity`` and other proxy objects, create ``ActivityParameter`` and other parameter objects, and evaluate all variables and formulas.
-            * *backend* (string, optional): Storage backend to use when creating ``Database``. Default is the default backend.
+            * *backend* (string, optional): Storage backend to use when creating
+              ``Database``. Default is the default backend. Use ``"iotable"`` for
+              read-only background databases: activities are stored as usual, but
+              exchanges are written directly to the processed matrix arrays, and can't
+              be edited afterwards. See ``bw2io.bulk.write_nodes_as_datapackage``.
 
         Returns:
             ``Database`` instance.
@@ -316,6 +422,8 @@ class LCIImporter(ImportBase):
         backend = backend or "sqlite"
         self.metadata.update(kwargs)
 
+        if activate_parameters and backend == "iotable":
+            raise ValueError("Can't activate parameters with `iotable` backend")
         if activate_parameters:
             # Comes before .write_database because we
             # need to remove `parameters` key
@@ -338,12 +446,37 @@ class LCIImporter(ImportBase):
             error = "The following activities have non-unique codes: {}"
             raise NonuniqueCode(error.format(duplicates))
 
+        if backend == "iotable":
+            return self._write_database_as_datapackage(
+                data, db_name, delete_existing, searchable, check_typos
+            )
+
         data = {(ds["database"], ds["code"]): ds for ds in data}
 
         if db_name in databases:
             # TODO: Raise error if unlinked exchanges?
             db = self.database_class(db_name)
-            if delete_existing:
+            if not delete_existing and db.backend == "sqlite":
+                self.write_database_parameters(activate_parameters, delete_existing)
+                counts = upsert_nodes(
+                    db,
+                    list(data.values()),
+                    searchable=searchable,
+                    check_typos=check_typos,
+                )
+                if activate_parameters:
+                    self._write_activity_parameters(activity_parameters)
+                print(
+                    "Updated database: {} ({} inserted, {} updated, "
+                    "{} unchanged)".format(
+                        db_name,
+                        counts["inserted"],
+                        counts["updated"],
+                        counts["unchanged"],
+                    )
+                )
+                return db
+            elif delete_existing:
                 existing = {}
             else:
                 existing = db.load(as_dict=True)
@@ -372,6 +505,146 @@ class LCIImporter(ImportBase):
         print("Created database: {}".format(db_name))
         return db
 
+    def _write_database_as_datapackage(
+        self,
+        data: List[dict],
+        db_name: str,
+        delete_existing: bool,
+        searchable: bool,
+        check_typos: bool,
+    ) -> ProcessedDataStore:
+        if not delete_existing:
+            raise ValueError("`iotable` backend always replaces existing data")
+        if self.needs_multifunctional_database:
+            raise ValueError("`iotable` backend not supported for multifunctional data")
+        if db_name in databases and databases[db_name].get("backend") != "iotable":
+            raise ValueError(
+                f"Existing database {db_name} doesn't use `iotable` backend; "
+                "delete it first"
+            )
+
+        if db_name not in databases:
+            if "format" not in self.metadata:
+                self.metadata["format"] = self.format
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                Database(db_name, backend="iotable").register(**self.metadata)
+        db = Database(db_name, backend="iotable")
+
+        self.write_database_parameters(activate_parameters=False)
+        write_nodes_as_datapackage(
+            db, data, searchable=searchable, check_typos=check_typos
+        )
+        print("Created database: {}".format(db_name))
+        return db
+
+    def apply_strategies_and_write_database(
+        self,
+        strategies: Optional[List[Callable]] = None,
+        db_name: Optional[str] = None,
+        searchable: bool = True,
+        check_typos: bool = False,
+        queue_size: int = 1000,
+        verbose: bool = True,
+        **kwargs,
+    ) -> ProcessedDataStore:
+        """
+        Apply strategies and write the database, overlapping the last strategies with
+        the database writes.
+
+        ``strategies`` defaults to ``self.strategies``. Strategies are applied with
+        ``apply_strategies`` until the trailing run of dataset-local strategies (see
+        ``bw2io.utils.dataset_local``). Each dataset is then passed through these
+        remaining strategies and handed over through a bounded queue to a writer thread,
+        which inserts finished datasets while the next ones are still being processed.
+
+        Existing data in the database is replaced. Parameters are stored in the activity
+        documents; use ``apply_strategies`` and
+        ``write_database(activate_parameters=True)`` to create parameter objects. Only
+        the SQLite backend is supported.
+
+        Unlike ``apply_strategy``, a ``StrategyError`` raised by a pipelined strategy is
+        not caught, and nothing is written.
+
+        Args:
+            * *strategies* (list, optional): Strategies to apply. Default is
+              ``self.strategies``.
+            * *db_name* (str, optional): Database to write. Default is ``self.db_name``.
+            * *queue_size* (int, default 1000): Maximum number of datasets waiting to be
+              written.
+
+        Returns:
+            ``Database`` instance.
+
+        """
+        func_list = self.strategies if strategies is None else strategies
+        split = len(func_list)
+        while split and is_dataset_local(func_list[split - 1]):
+            split -= 1
+        pipelined = func_list[split:]
+        self.apply_strategies(func_list[:split], verbose=verbose)
+
+        db_name = db_name or self.db_name
+        self.metadata.update(kwargs)
+        if self.needs_multifunctional_database:
+            raise ValueError("Pipelined writing not supported for multifunctional data")
+        if db_name in databases:
+            db = self.database_class(db_name)
+        else:
+            if "format" not in self.metadata:
+                self.metadata["format"] = self.format
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                db = self.database_class(db_name)
+                db.register(**self.metadata)
+        if db.backend != "sqlite":
+            raise ValueError(
+                f"Pipelined writing not supported for backend {db.backend}"
+            )
+        self.write_database_parameters(activate_parameters=False)
+
+        names = [
+            getattr(func, "__name__", None) or func.func.__name__ for func in pipelined
+        ]
+        if verbose:
+            for name in names:
+                print("Applying strategy while writing: {}".format(name))
+
+        def processed():
+            seen = set()
+            for ds in self.data:
+                batch = [ds]
+                for func in pipelined:
+                    batch = func(batch)
+                for obj in batch:
+                    if obj.get("database") != db_name:
+                        raise WrongDatabase(
+                            "Activity database must be {}, but {} was also "
+                            "found".format(db_name, obj.get("database"))
+                        )
+                    if obj["code"] in seen:
+                        raise NonuniqueCode(
+                            "The following activity has a non-unique code: {}".format(
+                                obj.get("name")
+                            )
+                        )
+                    seen.add(obj["code"])
+                    yield obj
+
+        self.data = write_nodes_pipelined(
+            db,
+            processed(),
+            searchable=searchable,
+            check_typos=check_typos,
+            queue_size=queue_size,
+        )
+        if not hasattr(self, "applied_strategies"):
+            self.applied_strategies = []
+        self.applied_strategies.extend(names)
+
+        print("Created database: {}".format(db_name))
+        return db
+
     def write_excel(
         self, only_unlinked: bool = False, only_names: bool = False
     ) -> Path:
@@ -384,7 +657,13 @@ class LCIImporter(ImportBase):
         Returns the filepath to the spreadsheet file.
 
         """
-        fp = write_lci_matching(self.data, self.db_name, only_unlinked, only_names)
+        fp = write_lci_matching(
+            self.data,
+            self.db_name,
+            only_unlinked,
+            only_names,
+            unlinked=self.unlinked if only_unlinked else None,
+        )
         print("Wrote matching file to:\n{}".format(fp))
         return fp
 
@@ -582,6 +861,9 @@ class LCIImporter(ImportBase):
                         node = placeholder.new_node(**new_data)
                         node.save()
                     exc["input"] = node.key
+        self._invalidate_unlinked_index(
+            "create_new_database_for_flows_with_missing_top_level_context"
+        )
 
     def create_new_biosphere(self, biosphere_name: str) -> None:
         """Create new biosphere database from unlinked biosphere flows in ``self.data``"""
@@ -790,6 +1072,8 @@ class LCIImporter(ImportBase):
                     )
             except rn.errors.WrongGraphContext:
                 pass
+            finally:
+                self._invalidate_unlinked_index("randonneur")
         if migrate_nodes:
             config = rn.MigrationConfig(
                 fields=fields,
@@ -817,6 +1101,135 @@ class LCIImporter(ImportBase):
                     )
             except rn.errors.WrongGraphContext:
                 pass
+            finally:
+                self._invalidate_unlinked_index("randonneur")
+
+    def randonneur_many(
+        self,
+        transformations: List[Union[str, rn.Datapackage]],
+        data_registry_path: Optional[Path] = None,
+        fields: Optional[list] = None,
+        mapping: Optional[dict] = None,
+        node_filter: Optional[Callable] = None,
+        edge_filter: Optional[Callable] = None,
+        verbose: bool = False,
+        case_sensitive: bool = False,
+        add_extra_attributes: bool = True,
+        verbs: Optional[List[str]] = rn.utils.SAFE_VERBS,
+        migrate_edges: bool = True,
+        migrate_nodes: bool = False,
+    ) -> List[dict]:
+        """
+        Apply several randonneur transformations in order, with the same result as
+        calling `.randonneur()` for each of them in turn.
+
+        `transformations` is a list of labels from the `randonneur_data` registry and/or
+        in-memory `randonneur.Datapackage` objects. All other arguments are the same as
+        in `.randonneur()`, and apply to every transformation.
+
+        Each transformation's lookup index is built once. Edge transformations change
+        nothing but the edges of the node they are applied to, so consecutive edge
+        transformations are applied together in a single pass over the graph. Node
+        transformations can create or delete nodes, and are applied one by one between
+        these passes.
+
+        Returns a list with one dict per transformation and graph context, with the
+        keys `transformation`, `context` ("edges" or "nodes"), `verbs` (the verbs
+        applied), `hits` (the number of edges or nodes matched or created) and
+        `seconds`.
+        """
+        registry = None
+        edge_config = rn.MigrationConfig(
+            fields=fields,
+            node_filter=node_filter,
+            edge_filter=edge_filter,
+            edges_label="exchanges",
+            verbose=verbose,
+            case_sensitive=case_sensitive,
+            add_extra_attributes=add_extra_attributes,
+            verbs=verbs,
+        )
+        node_config = rn.MigrationConfig(
+            fields=fields,
+            node_filter=node_filter,
+            edges_label="exchanges",
+            verbose=verbose,
+            case_sensitive=case_sensitive,
+            add_extra_attributes=add_extra_attributes,
+            verbs=verbs,
+        )
+
+        steps, pending_edge_steps = [], []
+
+        def apply_edge_steps():
+            if pending_edge_steps:
+                for node in self.data:
+                    for step in pending_edge_steps:
+                        step.apply_to_node(node)
+                pending_edge_steps.clear()
+
+        for transformation in transformations:
+            if isinstance(transformation, rn.Datapackage):
+                name = transformation.name
+                migrations = transformation.metadata() | transformation.data
+                # Like `.randonneur()`, don't check the context of in-memory
+                # datapackages
+                contexts = ("edges", "nodes")
+            else:
+                if registry is None:
+                    registry = Registry(data_registry_path)
+                try:
+                    migrations = registry.get_file(transformation)
+                except KeyError:
+                    raise KeyError(
+                        f"Transformation {transformation} not found in given "
+                        "transformation registry"
+                    )
+                name = transformation
+                contexts = migrations.get("graph_context", [])
+            if mapping:
+                # Applied only once, as edge and node steps share `migrations`
+                migrations = apply_mapping(
+                    migrations=migrations, mapping=mapping, verbs=verbs
+                )
+
+            if migrate_edges and "edges" in contexts:
+                step = _RandonneurStep(name, migrations, edge_config, rn_edge_verbs)
+                if "create" in step.verbs and not node_filter:
+                    # Same warning as `randonneur.generic_transformation`
+                    warnings.warn(
+                        f"Transformation {name} has a `create` section, but no "
+                        "`node_filter` is configured, meaning that these edges will be "
+                        "added to all nodes. This is almost never the desired "
+                        "behaviour, consider removing `create` from the `verbs` input."
+                    )
+                steps.append(("edges", step))
+                pending_edge_steps.append(step)
+            if migrate_nodes and "nodes" in contexts:
+                apply_edge_steps()
+                step = _RandonneurStep(name, migrations, node_config, rn_node_verbs)
+                steps.append(("nodes", step))
+                step.apply_to_graph(self.data)
+        apply_edge_steps()
+        self._invalidate_unlinked_index("randonneur_many")
+
+        report = [
+            {
+                "transformation": step.name,
+                "context": context,
+                "verbs": step.verbs,
+                "hits": step.hits,
+                "seconds": step.seconds,
+            }
+            for context, step in steps
+        ]
+        if verbose:
+            for row in report:
+                print(
+                    "{transformation} ({context}): {hits} hits in "
+                    "{seconds:.2f} seconds".format(**row)
+                )
+        return report
 
     def migrate(self, migration_name: str) -> None:
         if migration_name not in migrations:
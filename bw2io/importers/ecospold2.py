@@ -20,17 +20,14 @@ from ..strategies import (
     drop_unspecified_subcategories,
     es2_assign_only_product_with_amount_as_reference_product,
     fix_ecoinvent_flows_pre35,
-    fix_unreasonably_high_lognormal_uncertainties,
     link_biosphere_by_flow_uuid,
     link_internal_technosphere_by_composite_code,
+    normalize_lognormal_uncertainties,
     normalize_units,
-    remove_uncertainty_from_negative_loss_exchanges,
     remove_unnamed_parameters,
     remove_zero_amount_coproducts,
     remove_zero_amount_inputs_with_no_activity,
-    reparametrize_lognormal_to_agree_with_static_amount,
     separate_processes_from_products,
-    set_lognormal_loc_value,
     update_ecoinvent_locations,
     update_social_flows_in_older_consequential,
 )
@@ -62,6 +59,7 @@ class SingleOutputEcospold2Importer(LCIImporter):
         add_product_information: bool = True,
         separate_products: bool = False,
         cache: bool = False,
+        technosphere_metadata: Optional[dict] = None,
     ):
         """
         Initializes the SingleOutputEcospold2Importer class instance.
@@ -92,6 +90,11 @@ class SingleOutputEcospold2Importer(LCIImporter):
         cache: bool
             Cache extracted datasets as `.json.gz` files alongside the source `.spold` files
             for faster re-imports. Off by default.
+        technosphere_metadata: dict | None
+            Product information by product id, as read from
+            `MasterData/IntermediateExchanges.xml`. Read from the `MasterData` directory
+            if not provided; lets imports of several system models of the same release
+            share it.
         """
 
         self.dirpath = Path(dirpath)
@@ -120,8 +123,10 @@ class SingleOutputEcospold2Importer(LCIImporter):
             link_internal_technosphere_by_composite_code,
             delete_exchanges_missing_activity,
             delete_ghost_exchanges,
-            remove_uncertainty_from_negative_loss_exchanges,
-            fix_unreasonably_high_lognormal_uncertainties,
+            partial(
+                normalize_lognormal_uncertainties,
+                reparametrize=reparametrize_lognormals,
+            ),
             convert_activity_parameters_to_list,
             add_cpc_classification_from_single_reference_product,
             delete_none_synonyms,
@@ -131,11 +136,6 @@ class SingleOutputEcospold2Importer(LCIImporter):
             ),
         ]
 
-        if reparametrize_lognormals:
-            self.strategies.append(reparametrize_lognormal_to_agree_with_static_amount)
-        else:
-            self.strategies.append(set_lognormal_loc_value)
-
         if separate_products:
             self.strategies.append(separate_processes_from_products)
 
@@ -153,15 +153,16 @@ class SingleOutputEcospold2Importer(LCIImporter):
         )
         if add_product_information:
             tm_dirpath = self.dirpath.parent / "MasterData"
-            if not tm_dirpath.is_dir():
-                stdout_feedback_logger.warning(
-                    "Skipping product information as `MasterData` directory not found"
-                )
-            else:
+            if technosphere_metadata is None and tm_dirpath.is_dir():
                 technosphere_metadata = {
                     obj["id"]: obj["product_information"]
                     for obj in extractor.extract_technosphere_metadata(tm_dirpath)
                 }
+            if technosphere_metadata is None:
+                stdout_feedback_logger.warning(
+                    "Skipping product information as `MasterData` directory not found"
+                )
+            else:
                 for ds in self.data:
                     ds["product_information"] = technosphere_metadata[
                         ds["filename"].replace(".spold", "").split("_")[1]
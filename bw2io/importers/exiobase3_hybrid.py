@@ -3,9 +3,9 @@ import re
 from copy import deepcopy
 from pathlib import Path
 
-from bw2data import Database
 from bw2data.backends.iotable import IOTableBackend
 
+from ..bulk import project_nodes
 from ..units import UNITS_NORMALIZATION
 
 try:
@@ -104,8 +104,10 @@ class Exiobase3HybridImporter(object):
 
             """
             biosphere_mapping = {
-                (flow["name"], tuple(flow["categories"])): ("biosphere3", flow["code"])
-                for flow in Database("biosphere3")
+                (name, tuple(categories)): ("biosphere3", code)
+                for name, categories, code in project_nodes(
+                    "biosphere3", ("name", "categories", "code")
+                )
             }
             migration_data = {
                 tuple(x): y
@@ -112,6 +112,7 @@ class JSONLDImporter(LCIImporter):
                     exc["input"] = (self.db_name, exc["input"][1])
         self.data.extend(self.biosphere_database)
         self.biosphere_database = []
+        self.refresh_unlinked()
         print("Moved {} biosphere flows to `self.data`".format(num_flows))
 
     def write_separate_biosphere_database(self):
@@ -1,5 +1,6 @@
-from bw2data import Database, databases
+from bw2data import databases
 
+from ..bulk import project_nodes
 from ..extractors.json_ld import JSONLDExtractor
 from ..strategies import (
     json_ld_lcia_add_method_metadata,
@@ -85,7 +86,7 @@ class JSONLDLCIAImporter(LCIAImporter):
         """
         assert database_name in databases
 
-        codes = {o["code"] for o in Database(database_name)}
+        codes = {code for (code,) in project_nodes(database_name, ("code",))}
 
         for method in self.data:
             for cf in method["exchanges"]:
@@ -5,10 +5,11 @@ from pathlib import Path
 from typing import Optional, Union, Callable, List
 from uuid import uuid4
 
-from bw2data import Database, config, databases, get_node, labels
+from bw2data import Database, config, databases, labels
 from bw2data.errors import UnknownObject
 from bw_simapro_csv import SimaProCSV
 
+from ..bulk import append_nodes, get_id_mapping, project_nodes
 from ..strategies import (
     change_electricity_unit_mj_to_kwh,
     create_products_as_new_nodes,
@@ -17,8 +18,8 @@ from ..strategies import (
     link_iterable_by_fields,
     link_technosphere_based_on_name_unit_location,
     match_internal_simapro_simapro_with_unit_conversion,
-    migrate_datasets,
     migrate_exchanges,
+    migrate_many,
     normalize_simapro_biosphere_categories,
     normalize_simapro_biosphere_names,
     normalize_simapro_labels_to_brightway_standard,
@@ -112,6 +113,15 @@ class SimaProBlockCSVImporter(LCIImporter):
                 comment="Database for proxies for regionalized biosphere flows. Generated by `bw2io` method `create_regionalized_biosphere_proxies`",
             )
 
+        # Existing proxies by (name, unit, categories, location)
+        proxies = {}
+        for name, unit, categories, location, code in project_nodes(
+            database_name, ("name", "unit", "categories", "location", "code")
+        ):
+            label = (name, unit, tuple(categories or ()), location)
+            proxies.setdefault(label, (database_name, code))
+
+        new = []
         for ds in self.data:
             for exc in filter(
                 lambda x: (
@@ -123,33 +133,50 @@ class SimaProBlockCSVImporter(LCIImporter):
                 ),
                 ds.get("exchanges", []),
             ):
-                try:
-                    node = get_node(
-                        name=exc["name"],
-                        unit=exc["unit"],
-                        categories=exc["categories"],
-                        location=exc["location"],
-                        database=database_name,
-                    )
-                except UnknownObject:
-                    node = proxy_db.new_node(
-                        name=exc["name"],
-                        unit=exc["unit"],
-                        categories=exc["categories"],
-                        location=exc["location"],
-                        code=uuid4().hex,
-                        comment="Proxy node created by `create_regionalized_biosphere_proxies`",
+                label = (
+                    exc["name"],
+                    exc["unit"],
+                    tuple(exc["categories"]),
+                    exc["location"],
+                )
+                if label not in proxies:
+                    key = (database_name, uuid4().hex)
+                    new.append(
+                        {
+                            "name": exc["name"],
+                            "unit": exc["unit"],
+                            "categories": exc["categories"],
+                            "location": exc["location"],
+                            "database": key[0],
+                            "code": key[1],
+                            "comment": (
+                                "Proxy node created by "
+                                "`create_regionalized_biosphere_proxies`"
+                            ),
+                            "exchanges": [
+                                {
+                                    "type": labels.production_edge_default,
+                                    "amount": 1,
+                                    "input": key,
+                                },
+                                {
+                                    "type": labels.process_node_default,
+                                    "amount": 1,
+                                    "input": tuple(exc["input"]),
+                                },
+                            ],
+                        }
                     )
-                    node.save()
-                    node.new_edge(
-                        type=labels.production_edge_default, amount=1, input=node
-                    ).save()
-                    node.new_edge(
-                        type=labels.process_node_default,
-                        amount=1,
-                        input=get_node(database=exc["input"][0], code=exc["input"][1]),
-                    ).save()
-                exc["input"] = node.key
+                    proxies[label] = key
+                exc["input"] = proxies[label]
+
+        if new:
+            flows = {ds["exchanges"][1]["input"] for ds in new}
+            ids = get_id_mapping({database for database, _ in flows})
+            for flow in flows:
+                if flow not in ids:
+                    raise UnknownObject(f"Can't find biosphere flow {flow}")
+            append_nodes(proxy_db, new)
 
     def create_technosphere_placeholders(self, database_name: str):
         """Create new placeholder database from unlinked technosphere flows in ``self.data``"""
@@ -219,8 +246,9 @@ class SimaProBlockCSVImporter(LCIImporter):
             update_ecoinvent_locations,
             split_simapro_name_geo,
             strip_biosphere_exc_locations,
-            functools.partial(migrate_datasets, migration="default-units"),
-            functools.partial(migrate_exchanges, migration="default-units"),
+            functools.partial(
+                migrate_many, names=["default-units"], datasets=True, exchanges=True
+            ),
             functools.partial(set_code_by_activity_hash, overwrite=True),
             change_electricity_unit_mj_to_kwh,
             link_technosphere_based_on_name_unit_location,
@@ -13,8 +13,8 @@ from ..strategies import (
     fix_zero_allocation_products,
     link_iterable_by_fields,
     link_technosphere_based_on_name_unit_location,
-    migrate_datasets,
     migrate_exchanges,
+    migrate_many,
     normalize_simapro_biosphere_categories,
     normalize_simapro_biosphere_names,
     normalize_units,
@@ -67,8 +67,9 @@ class SimaProCSVImporter(LCIImporter):
             fix_zero_allocation_products,
             split_simapro_name_geo,
             strip_biosphere_exc_locations,
-            functools.partial(migrate_datasets, migration="default-units"),
-            functools.partial(migrate_exchanges, migration="default-units"),
+            functools.partial(
+                migrate_many, names=["default-units"], datasets=True, exchanges=True
+            ),
             functools.partial(set_code_by_activity_hash, overwrite=True),
             change_electricity_unit_mj_to_kwh,
             link_technosphere_based_on_name_unit_location,
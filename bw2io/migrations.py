@@ -1,8 +1,11 @@
 import os
+import threading
+from collections import OrderedDict
 
-from bw2data import projects
+from bw2data import config, projects
 from bw2data.data_store import DataStore
 from bw2data.serialization import JsonWrapper, SerializedDict
+from bw2data.signals import project_changed
 
 from .data import (
     get_biosphere_2_3_category_migration_data,
@@ -14,6 +17,7 @@ from .data import (
     get_us_lci_migration_data,
 )
 from .units import get_default_units_migration_data, get_unusual_units_migration_data
+from .utils import TRANSIENT_HASH, activity_hash
 
 
 class _Migrations(SerializedDict):
@@ -21,6 +25,52 @@ class _Migrations(SerializedDict):
 
 
 migrations = _Migrations()
+# Reload on project change
+config.metadata.append(migrations)
+
+# Least recently used compiled migrations by filepath; values are
+# ``((mtime, size), CompiledMigration)``
+COMPILED_MIGRATION_CACHE_SIZE = 8
+_compiled_migrations = OrderedDict()
+_compiled_migrations_lock = threading.Lock()
+
+
+def clear_compiled_migrations(*args, **kwargs) -> None:
+    """Remove all cached compiled migrations.
+
+    Connected to the ``bw2data`` signal sent when the project is changed."""
+    with _compiled_migrations_lock:
+        _compiled_migrations.clear()
+
+
+project_changed.connect(clear_compiled_migrations)
+
+
+class CompiledMigration(object):
+    """
+    Migration data as a lookup table from the ``activity_hash`` of ``fields`` to values.
+
+    Use ``Migration.compiled()`` to get a cached instance.
+    """
+
+    def __init__(self, data):
+        self.fields = data["fields"]
+        # There shouldn't be duplicates for the lookup fields, as they will be
+        # overwritten during mapping creation.
+        self.mapping = {
+            activity_hash(
+                dict(zip(self.fields, obj[0])),
+                fields=self.fields,
+                algorithm=TRANSIENT_HASH,
+            ): obj[1]
+            for obj in data["data"]
+        }
+
+    def get(self, obj):
+        """Return the new values for ``obj``, or ``None`` if it isn't migrated."""
+        return self.mapping.get(
+            activity_hash(obj, fields=self.fields, algorithm=TRANSIENT_HASH)
+        )
 
 
 class Migration(DataStore):
@@ -71,12 +121,46 @@ class Migration(DataStore):
             self.register(description=description)
         filepath = os.path.join(self._intermediate_dir, self.filename + ".json")
         JsonWrapper.dump(data, filepath)
+        with _compiled_migrations_lock:
+            _compiled_migrations.pop(filepath, None)
 
     def load(self):
         self.register()
         filepath = os.path.join(self._intermediate_dir, self.filename + ".json")
         return JsonWrapper.load(filepath)
 
+    def compiled(self):
+        """
+        Load migration data as a ``CompiledMigration``.
+
+        The compiled migration is cached until the migration file is rewritten. Only
+        the ``COMPILED_MIGRATION_CACHE_SIZE`` most recently used migrations are kept.
+        Don't modify the returned object.
+
+        Returns
+        -------
+        CompiledMigration
+        """
+        filepath = os.path.join(self._intermediate_dir, self.filename + ".json")
+        try:
+            stat = os.stat(filepath)
+            stamp = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            stamp = None
+        with _compiled_migrations_lock:
+            cached = _compiled_migrations.get(filepath)
+            if stamp is not None and cached is not None and cached[0] == stamp:
+                _compiled_migrations.move_to_end(filepath)
+                return cached[1]
+
+        compiled = CompiledMigration(self.load())
+        with _compiled_migrations_lock:
+            _compiled_migrations[filepath] = (stamp, compiled)
+            _compiled_migrations.move_to_end(filepath)
+            while len(_compiled_migrations) > COMPILED_MIGRATION_CACHE_SIZE:
+                _compiled_migrations.popitem(last=False)
+        return compiled
+
 
 def create_core_migrations():
     """
@@ -1,9 +1,9 @@
 import collections
-import copy
 
 from bw2data import Database, databases
+from bw2data.backends.schema import ActivityDataset, ExchangeDataset
 
-from . import activity_hash
+from .utils import TRANSIENT_HASH, activity_hash, activity_hash_memo
 
 
 class ModifiedDatabase(object):
@@ -12,6 +12,11 @@ class ModifiedDatabase(object):
 
     Each activity and exchange is summarized in a *hash*, a small set of letters that summarizes all relevant attributes.
 
+    The background database is read with two queries, one for its activities and one
+    for all their exchanges, and each input activity is hashed only once. Exchanges are
+    compared by hash, so finding the added, removed, and changed exchanges of all
+    activities takes linear time.
+
     Attributes
     ----------
     foreground_activities_mapping : dict
@@ -21,11 +26,13 @@ class ModifiedDatabase(object):
     foreground_activities : dict
         activity hash: set of (exchange hash, amount) exchange tuples.
     background_activities_mapping : dict
-        hash: Activity
+        hash: activity document
     background_exchanges_mapping : dict
-        hash: Exchange
+        hash: exchange document
     background_activities : dict
-        activity hash: set of (Exchange hash, amount) exchange tuples
+        activity hash: set of (exchange hash, amount) exchange tuples
+    background_activity_exchanges : dict
+        activity hash: {(exchange hash, amount): exchange document}
 
     Methods
     -------
@@ -46,7 +53,8 @@ class ModifiedDatabase(object):
     hash_foreground_exchanges(activity)
         Hash exchanges in ``activity`` and add to ``foreground_exchanges_mapping``.
     prune()
-        Remove activities from ``data`` that are not in ``ref_database_name``.
+        Remove activities from ``data`` which are the same in ``ref_database_name``,
+        including their supply chains.
 
 
     """
@@ -56,6 +64,7 @@ class ModifiedDatabase(object):
         self.assert_data_fully_linked()
         self.fields = ("name", "location", "unit") if from_simapro else None
         assert ref_database_name in databases, "Invalid reference database name"
+        self.ref_database_name = ref_database_name
         self.ref_database = Database(ref_database_name)
 
     def assert_data_fully_linked(self):
@@ -64,6 +73,10 @@ class ModifiedDatabase(object):
                 if "input" not in exc:
                     raise AssertionError("Database not full linked")
 
+    def hash(self, obj):
+        # Hashes are only compared in memory, so the faster algorithm can be used
+        return activity_hash(obj, fields=self.fields, algorithm=TRANSIENT_HASH)
+
     def iterate_unmatched(self):
         """
         Return data on activities in ``data`` which can't be found in ``ref_database_name``.
@@ -77,6 +90,23 @@ class ModifiedDatabase(object):
             if key not in self.background_activities:
                 yield (key, value)
 
+    @staticmethod
+    def index_amounts(data):
+        """Index (exchange hash, amount) tuples as ``{exchange hash: [amounts]}``."""
+        index = collections.defaultdict(list)
+        for exc_hash, amount in data:
+            index[exc_hash].append(amount)
+        return index
+
+    @staticmethod
+    def reason(exc_tuple, amounts):
+        """Like ``get_reason``, but with ``data`` indexed by ``index_amounts``."""
+        if exc_tuple[0] not in amounts:
+            return "Missing"
+        return "New amount: {} to {}".format(
+            exc_tuple[1], ", ".join(sorted(amounts[exc_tuple[0]]))
+        )
+
     def get_reason(self, exc_tuple, data):
         """
         Get reason why exc_tuple not in data. Reasons are:
@@ -95,13 +125,7 @@ class ModifiedDatabase(object):
         str
             Reason why exc_tuple not in data
         """
-        if exc_tuple[0] not in [obj[0] for obj in data]:
-            return "Missing"
-        else:
-            matched_amounts = ", ".join(
-                ["{}".format(obj[1]) for obj in data if obj[0] == exc_tuple[0]]
-            )
-            return "New amount: {} to {}".format(exc_tuple[1], matched_amounts)
+        return self.reason(exc_tuple, self.index_amounts(data))
 
     def iterate_modified(self):
         """
@@ -112,34 +136,40 @@ class ModifiedDatabase(object):
         tuple
             (key, value)
         """
-        for key, activity in self.foreground_activities.items():
-            if key not in self.background_activities:
+        for key, fg in self.foreground_activities.items():
+            bg = self.background_activities.get(key)
+            if bg is None or fg == bg:
                 continue
-            bg = self.background_activities[key]
-            fg = self.foreground_activities[key]
-            if fg != bg:
-                yield (
-                    key,
+            fg_amounts, bg_amounts = self.index_amounts(fg), self.index_amounts(bg)
+            # Exchanges of this activity, as the mappings by hash are shared by all
+            # activities
+            fg_exchanges = {
+                (self.hash(exc), "{:.6G}".format(exc["amount"])): exc
+                for exc in self.foreground_activities_mapping[key].get("exchanges", [])
+            }
+            bg_exchanges = self.background_activity_exchanges[key]
+            yield (
+                key,
+                {
+                    k: v
+                    for k, v in self.foreground_activities_mapping[key].items()
+                    if k != "exchanges"
+                },
+                [
                     {
-                        k: v
-                        for k, v in self.foreground_activities_mapping[key].items()
-                        if k != "exchanges"
-                    },
-                    [
-                        {
-                            "reason": self.get_reason(obj, bg),
-                            "exchange": self.foreground_exchanges_mapping[obj[0]],
-                        }
-                        for obj in fg.difference(bg)
-                    ],
-                    [
-                        {
-                            "reason": self.get_reason(obj, fg),
-                            "exchange": self.background_exchanges_mapping[obj[0]],
-                        }
-                        for obj in bg.difference(fg)
-                    ],
-                )
+                        "reason": self.reason(obj, bg_amounts),
+                        "exchange": fg_exchanges[obj],
+                    }
+                    for obj in fg.difference(bg)
+                ],
+                [
+                    {
+                        "reason": self.reason(obj, fg_amounts),
+                        "exchange": bg_exchanges[obj],
+                    }
+                    for obj in bg.difference(fg)
+                ],
+            )
 
     def load_datasets(self):
         """
@@ -149,33 +179,83 @@ class ModifiedDatabase(object):
 
         If the name or other important attributes changed, then there won't be a correspondence at all, so the dataset is treated as modified in any case.
         """
-        print("Loading foreground data")
-        self.foreground_activities_mapping = {
-            activity_hash(obj, fields=self.fields): obj for obj in self.data
-        }
-        self.foreground_exchanges_mapping = {
-            activity_hash(exc, fields=self.fields): exc
-            for obj in self.data
-            for exc in obj.get("exchanges", [])
-        }
-        self.foreground_activities = {
-            key: self.hash_foreground_exchanges(value)
-            for key, value in self.foreground_activities_mapping.items()
-        }
+        with activity_hash_memo():
+            print("Loading foreground data")
+            self.foreground_activities_mapping = {
+                self.hash(obj): obj for obj in self.data
+            }
+            self.foreground_exchanges_mapping = {
+                self.hash(exc): exc
+                for obj in self.data
+                for exc in obj.get("exchanges", [])
+            }
+            self.foreground_activities = {
+                key: self.hash_foreground_exchanges(value)
+                for key, value in self.foreground_activities_mapping.items()
+            }
 
-        print("Loading background activities")
-        self.background_activities_mapping = {
-            activity_hash(obj, fields=self.fields): obj for obj in self.ref_database
-        }
-        self.background_exchanges_mapping = {}
-        print("Loading background exchanges")
-        self.background_activities = {
-            key: self.hash_background_exchanges(value)
-            for key, value in self.background_activities_mapping.items()
-        }
+            print("Loading background activities")
+            nodes = dict(
+                ActivityDataset.select(ActivityDataset.code, ActivityDataset.data)
+                .where(ActivityDataset.database == self.ref_database_name)
+                .tuples()
+            )
+            self.background_activities_mapping = {
+                self.hash(obj): obj for obj in nodes.values()
+            }
+
+            print("Loading background exchanges")
+            edges = list(
+                ExchangeDataset.select(
+                    ExchangeDataset.output_code,
+                    ExchangeDataset.input_database,
+                    ExchangeDataset.input_code,
+                    ExchangeDataset.data,
+                )
+                .where(ExchangeDataset.output_database == self.ref_database_name)
+                .tuples()
+            )
+            input_hashes = {
+                (self.ref_database_name, code): self.hash(obj)
+                for code, obj in nodes.items()
+            }
+            other_databases = {
+                input_database
+                for _, input_database, _, _ in edges
+                if input_database != self.ref_database_name
+            }
+            if other_databases:
+                input_hashes.update(
+                    ((database, code), self.hash(obj))
+                    for database, code, obj in ActivityDataset.select(
+                        ActivityDataset.database,
+                        ActivityDataset.code,
+                        ActivityDataset.data,
+                    )
+                    .where(ActivityDataset.database << sorted(other_databases))
+                    .tuples()
+                )
+
+            self.background_exchanges_mapping = {}
+            by_activity = collections.defaultdict(dict)
+            for output_code, input_database, input_code, exc in edges:
+                hashed = input_hashes.get((input_database, input_code))
+                if hashed is None:
+                    # Broken link to a missing activity
+                    continue
+                self.background_exchanges_mapping[hashed] = exc
+                by_activity[output_code][(hashed, "{:.6G}".format(exc["amount"]))] = exc
+            self.background_activity_exchanges = {
+                input_hashes[(self.ref_database_name, code)]: by_activity[code]
+                for code in nodes
+            }
+            self.background_activities = {
+                key: set(value)
+                for key, value in self.background_activity_exchanges.items()
+            }
 
     def add_to_background_exchanges_mapping(self, exc):
-        hashed = activity_hash(exc.input, fields=self.fields)
+        hashed = self.hash(exc.input)
         self.background_exchanges_mapping[hashed] = exc
         return hashed
 
@@ -187,36 +267,66 @@ class ModifiedDatabase(object):
 
     def hash_foreground_exchanges(self, activity):
         return {
-            (activity_hash(exc, fields=self.fields), "{:.6G}".format(exc["amount"]))
+            (self.hash(exc), "{:.6G}".format(exc["amount"]))
             for exc in activity.get("exchanges", [])
         }
 
     def prune(self):
-        self.modified = self.find_modified_datasets()
-        self.keep = copy.deepcopy(self.modified)
-        self.ref_product_consumers = collections.defaultdict(list)
+        """
+        Remove activities from ``data`` which are the same in ``ref_database_name``,
+        including their supply chains.
+
+        Activities are kept if they are modified or can't be found in
+        ``ref_database_name``, or if they consume a kept activity, directly or through
+        other activities. These are found with a breadth-first search from the modified
+        and unmatched activities along the reverse dependencies, i.e. from each activity
+        to its consumers. Exchanges of the kept activities which link to a removed
+        activity are relinked to its equivalent in ``ref_database_name``.
+
+        The hashes of the kept activities are stored in ``keep``.
+
+        Returns
+        -------
+        list
+            The kept activities, also stored in ``data``.
+        """
+        if not hasattr(self, "foreground_activities"):
+            self.load_datasets()
+
+        hashes = {
+            (ds.get("database"), ds.get("code")): self.hash(ds) for ds in self.data
+        }
+        consumers = collections.defaultdict(set)
         for ds in self.data:
-            for exc in (
-                obj
-                for obj in ds.get("exchanges", [])
-                if obj.get("type") == "technosphere"
-            ):
-                self.ref_product_consumers[
-                    activity_hash(exc, fields=self.fields)
-                ].append(activity_hash(ds, fields=self.fields))
-        # Iteratively add processes that refer to changed reference products.
-        # Stop when no new processes are added
-        # This assumes that the hash of the reference product is the same as the hash of the activity, i.e.
-        # it will break on ecoinvent >= 3.
-        raise ValueError
-        while True:
-            print("Iteration")
-            to_add = set()
-            for flow in self.keep:
-                for consumer in self.ref_product_consumers[flow]:
-                    if consumer not in self.keep:
-                        to_add.add(consumer)
-            if not to_add:
-                break
-            self.keep = self.keep.union(to_add)
-        raise ValueError
+            ds_hash = hashes[(ds.get("database"), ds.get("code"))]
+            for exc in ds.get("exchanges", []):
+                input_hash = hashes.get(tuple(exc["input"]))
+                if input_hash is not None and input_hash != ds_hash:
+                    consumers[input_hash].add(ds_hash)
+
+        self.modified = {key for key, *_ in self.iterate_modified()}
+        self.keep = self.modified.union(key for key, _ in self.iterate_unmatched())
+        queue = collections.deque(self.keep)
+        while queue:
+            for consumer in consumers[queue.popleft()]:
+                if consumer not in self.keep:
+                    self.keep.add(consumer)
+                    queue.append(consumer)
+
+        replacements = {}
+        for key, hashed in hashes.items():
+            if hashed not in self.keep:
+                obj = self.background_activities_mapping[hashed]
+                replacements[key] = (obj["database"], obj["code"])
+
+        self.data = [
+            ds
+            for ds in self.data
+            if hashes[(ds.get("database"), ds.get("code"))] in self.keep
+        ]
+        for ds in self.data:
+            for exc in ds.get("exchanges", []):
+                replacement = replacements.get(tuple(exc["input"]))
+                if replacement is not None:
+                    exc["input"] = replacement
+        return self.data
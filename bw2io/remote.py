@@ -23,8 +23,9 @@ PROJECTS_BW25 = {
 
 BASE_URL = "https://files.brightway.dev/"
 
+# Created when first needed
 cache_dir = Path(bd.projects._base_data_dir) / "bw2io_cache_dir"
-cache_dir.mkdir(exist_ok=True)
+
 
 def _projects_config_filename(version) -> str:
     """Return the config filename given a bd.__version__ (str or tuple)."""
@@ -102,6 +103,7 @@ def install_project(
     except KeyError:
         raise KeyError(f"Project key {project_key} not in `projects_config`")
 
+    cache_dir.mkdir(exist_ok=True)
     fp = cache_dir / filename
     if not fp.exists():
         download_with_progressbar(
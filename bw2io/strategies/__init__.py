@@ -60,8 +60,10 @@ __all__ = [
     "match_subcategories",
     "migrate_datasets",
     "migrate_exchanges",
+    "migrate_many",
     "normalize_biosphere_categories",
     "normalize_biosphere_names",
+    "normalize_lognormal_uncertainties",
     "normalize_simapro_biosphere_categories",
     "normalize_simapro_biosphere_names",
     "normalize_simapro_labels_to_brightway_standard",
@@ -127,6 +129,7 @@ from .ecospold2 import (
     fix_unreasonably_high_lognormal_uncertainties,
     link_biosphere_by_flow_uuid,
     link_internal_technosphere_by_composite_code,
+    normalize_lognormal_uncertainties,
     remove_uncertainty_from_negative_loss_exchanges,
     remove_unnamed_parameters,
     remove_zero_amount_coproducts,
@@ -180,7 +183,7 @@ from .lcia import (
     set_biosphere_type,
 )
 from .locations import update_ecoinvent_locations
-from .migrations import migrate_datasets, migrate_exchanges
+from .migrations import migrate_datasets, migrate_exchanges, migrate_many
 from .products import create_products_as_new_nodes, separate_processes_from_products
 from .sentier import match_internal_simapro_simapro_with_unit_conversion
 from .simapro import (
@@ -1,6 +1,8 @@
+from ..utils import dataset_local
 from .migrations import migrate_datasets, migrate_exchanges
 
 
+@dataset_local
 def drop_unspecified_subcategories(db):
     """Drop subcategories if they are in the following:
     * ``unspecified``
@@ -98,6 +100,7 @@ def normalize_biosphere_categories(db, lcia=False):
     return db
 
 
+@dataset_local
 def strip_biosphere_exc_locations(db):
     """
     Remove locations from biosphere exchanges in the given database, as biosphere exchanges are not geographically specific.
@@ -126,6 +129,7 @@ def strip_biosphere_exc_locations(db):
     return db
 
 
+@dataset_local
 def ensure_categories_are_tuples(db):
     """
     Convert dataset categories to tuples in the given database, if they are not already tuples.
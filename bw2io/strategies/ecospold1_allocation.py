@@ -1,6 +1,4 @@
-import copy
-
-from ..utils import rescale_exchange
+from ..utils import allocated_copy, allocated_exchange
 
 
 def delete_integer_codes(data):
@@ -167,12 +165,11 @@ def allocate_exchanges(ds):
         exc["code"]: exc for exc in ds["exchanges"] if exc["type"] != "production"
     }
     for coproduct in coproducts:
-        new_ds = copy.deepcopy(ds)
-        new_ds["exchanges"] = [
-            rescale_exchange(copy.deepcopy(exchange_dict[exc_id]), scale)
-            for exc_id, scale in list(multipliers[coproduct["code"]].items())
+        exchanges = [
+            allocated_exchange(exchange_dict[exc_id], scale)
+            for exc_id, scale in multipliers[coproduct["code"]].items()
             # Exclude self-allocation; assume 100%
             if exc_id != coproduct["code"]
         ] + [coproduct]
-        new_datasets.append(new_ds)
+        new_datasets.append(allocated_copy(ds, exchanges))
     return new_datasets
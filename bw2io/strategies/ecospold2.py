@@ -1,11 +1,13 @@
 import math
 import warnings
 
-from bw2data import Database
-from bw2data.logs import close_log, get_io_logger
+import numpy as np
+from bw2data import databases
 from stats_arrays import LognormalUncertainty, UndefinedUncertainty
 
-from ..utils import es2_activity_hash, format_for_logging
+from ..bulk import project_nodes
+from ..diagnostics import active_diagnostics, diagnostics_or_log
+from ..utils import dataset_local, es2_activity_hash
 from .migrations import migrate_exchanges, migrations
 
 
@@ -64,7 +66,7 @@ def link_biosphere_by_flow_uuid(db: list[dict], biosphere: str = "biosphere3"):
       'id': '6f10b95c02be63e925a6f2ef6b937a6d',
       'type': 'process'}]
     """
-    biosphere_codes = {x["code"] for x in Database(biosphere)}
+    biosphere_codes = {code for (code,) in project_nodes(biosphere, ("code",))}
 
     for ds in db:
         for exc in ds.get("exchanges", []):
@@ -77,6 +79,7 @@ def link_biosphere_by_flow_uuid(db: list[dict], biosphere: str = "biosphere3"):
     return db
 
 
+@dataset_local
 def remove_zero_amount_coproducts(db):
     """
     Iterate through datasets in the given database. Filter out coproducts with
@@ -136,6 +139,7 @@ def remove_zero_amount_coproducts(db):
     return db
 
 
+@dataset_local
 def remove_zero_amount_inputs_with_no_activity(db):
     """
     Filter out technosphere exchanges with zero amounts and no uncertainty from
@@ -200,6 +204,7 @@ def remove_zero_amount_inputs_with_no_activity(db):
     return db
 
 
+@dataset_local
 def remove_unnamed_parameters(db):
     """
     Iterate through datasets in the given database and remove unnamed parameters
@@ -255,6 +260,7 @@ def remove_unnamed_parameters(db):
     return db
 
 
+@dataset_local
 def es2_assign_only_product_with_amount_as_reference_product(db):
     """
     If a multioutput process has one product with a non-zero amount, this
@@ -329,6 +335,7 @@ def es2_assign_only_product_with_amount_as_reference_product(db):
     return db
 
 
+@dataset_local
 def assign_single_product_as_activity(db):
     """
     Assign the activity of a dataset to the 'activity' field of the production
@@ -387,6 +394,7 @@ def assign_single_product_as_activity(db):
     return db
 
 
+@dataset_local
 def create_composite_code(db):
     """
     Generate a composite code for each dataset in the given database using the
@@ -508,6 +516,18 @@ def link_internal_technosphere_by_composite_code(db):
     return db
 
 
+def _report_purged(count, diagnostics):
+    if not count:
+        return
+    if diagnostics is active_diagnostics():
+        where = "the importer's `diagnostics` for details."
+    else:
+        where = "the logfile for details:\n\t{}".format(diagnostics.logfile)
+    print(
+        "{} exchanges couldn't be linked and were deleted. See {}".format(count, where)
+    )
+
+
 def delete_exchanges_missing_activity(db):
     """
     Remove exchanges that are missing the "activityLinkId" attribute and have
@@ -568,37 +588,32 @@ def delete_exchanges_missing_activity(db):
         }
     ]
     """
-    log, logfile = get_io_logger("Ecospold2-import-error")
     count = 0
-    for ds in db:
-        exchanges = ds.get("exchanges", [])
-        if not exchanges:
-            continue
-        skip = []
-        for exc in exchanges:
-            if exc.get("input"):
+    with diagnostics_or_log("Ecospold2-import-error") as diagnostics:
+        for ds in db:
+            exchanges = ds.get("exchanges", [])
+            if not exchanges:
                 continue
-            if not exc.get("activity") and exc["type"] in {
-                "technosphere",
-                "production",
-                "substitution",
-            }:
-                log.critical(
-                    "Purging unlinked exchange:\nFilename: {}\n{}".format(
-                        ds["filename"], format_for_logging(exc)
+            skip = set()
+            for exc in exchanges:
+                if exc.get("input"):
+                    continue
+                if not exc.get("activity") and exc["type"] in {
+                    "technosphere",
+                    "production",
+                    "substitution",
+                }:
+                    diagnostics.record(
+                        "purged-unlinked-exchange",
+                        "Purging unlinked exchange",
+                        exc,
+                        ds["filename"],
                     )
-                )
-                count += 1
-                skip.append(exc)
-        ds["exchanges"] = [exc for exc in exchanges if exc not in skip]
-    close_log(log)
-    if count:
-        print(
-            (
-                "{} exchanges couldn't be linked and were deleted. See the "
-                "logfile for details:\n\t{}"
-            ).format(count, logfile)
-        )
+                    count += 1
+                    skip.add(id(exc))
+            if skip:
+                ds["exchanges"] = [exc for exc in exchanges if id(exc) not in skip]
+    _report_purged(count, diagnostics)
     return db
 
 
@@ -662,35 +677,31 @@ def delete_ghost_exchanges(db):
         }
     ]
     """
-    log, logfile = get_io_logger("Ecospold2-import-error")
     count = 0
-    for ds in db:
-        exchanges = ds.get("exchanges", [])
-        if not exchanges:
-            continue
-        skip = []
-        for exc in exchanges:
-            if exc.get("input") or exc.get("type") != "technosphere":
+    with diagnostics_or_log("Ecospold2-import-error") as diagnostics:
+        for ds in db:
+            exchanges = ds.get("exchanges", [])
+            if not exchanges:
                 continue
-            log.critical(
-                "Purging unlinked exchange:\nFilename: {}\n{}".format(
-                    ds["filename"], format_for_logging(exc)
+            skip = set()
+            for exc in exchanges:
+                if exc.get("input") or exc.get("type") != "technosphere":
+                    continue
+                diagnostics.record(
+                    "purged-unlinked-exchange",
+                    "Purging unlinked exchange",
+                    exc,
+                    ds["filename"],
                 )
-            )
-            count += 1
-            skip.append(exc)
-        ds["exchanges"] = [exc for exc in exchanges if exc not in skip]
-    close_log(log)
-    if count:
-        print(
-            (
-                "{} exchanges couldn't be linked and were deleted. See the "
-                "logfile for details:\n\t{}"
-            ).format(count, logfile)
-        )
+                count += 1
+                skip.add(id(exc))
+            if skip:
+                ds["exchanges"] = [exc for exc in exchanges if id(exc) not in skip]
+    _report_purged(count, diagnostics)
     return db
 
 
+@dataset_local
 def remove_uncertainty_from_negative_loss_exchanges(db):
     """
     Address cases where basic uncertainty and pedigree matrix are applied blindly,
@@ -786,6 +797,7 @@ def remove_uncertainty_from_negative_loss_exchanges(db):
     return db
 
 
+@dataset_local
 def set_lognormal_loc_value(db):
     """
     Ensure loc value is correct for lognormal uncertainty distributions.
@@ -857,6 +869,7 @@ def set_lognormal_loc_value(db):
     return db
 
 
+@dataset_local
 def reparametrize_lognormal_to_agree_with_static_amount(db):
     """
     For lognormal distributions, choose the mean of the underlying normal distribution
@@ -930,6 +943,7 @@ def reparametrize_lognormal_to_agree_with_static_amount(db):
     return db
 
 
+@dataset_local
 def fix_unreasonably_high_lognormal_uncertainties(db, cutoff=2.5, replacement=0.25):
     """
     Replace unreasonably high lognormal uncertainties in the given database
@@ -1006,6 +1020,84 @@ def fix_unreasonably_high_lognormal_uncertainties(db, cutoff=2.5, replacement=0.
     return db
 
 
+@dataset_local
+def normalize_lognormal_uncertainties(
+    db, remove_negative_losses=True, cutoff=2.5, replacement=0.25, reparametrize=False
+):
+    """
+    Apply the lognormal uncertainty strategies in a single pass over the exchanges.
+
+    Gives the same numbers as applying, in order:
+
+    * ``remove_uncertainty_from_negative_loss_exchanges`` (if
+      ``remove_negative_losses``)
+    * ``fix_unreasonably_high_lognormal_uncertainties`` (unless ``cutoff`` is None)
+    * ``reparametrize_lognormal_to_agree_with_static_amount`` (if ``reparametrize``), or
+      ``set_lognormal_loc_value``
+
+    Lognormal exchanges are gathered into arrays, and the scale and loc rules are
+    applied with NumPy masks. Logarithms and powers are computed with the ``math``
+    module functions, as ``numpy.log`` can differ from ``math.log`` in the last digit.
+
+    Parameters
+    ----------
+    db : list
+        A list of datasets, where each dataset is a dictionary containing an
+        'exchanges' key with a list of exchange dictionaries.
+    remove_negative_losses : bool, optional
+        Remove uncertainty from negative loss exchanges (default is True).
+    cutoff : float, optional
+        The cutoff value above which an uncertainty value is considered
+        unreasonably high (default is 2.5). Use None to keep all scales.
+    replacement : float, optional
+        The replacement value for unreasonably high uncertainties (default is 0.25).
+    reparametrize : bool, optional
+        Choose loc such that the mean of the distribution is the static amount
+        (default is False).
+
+    Returns
+    -------
+    list
+        The updated list of datasets.
+    """
+    lognormal = []
+    for ds in db:
+        exchanges = ds.get("exchanges", [])
+        if remove_negative_losses:
+            production_names = {
+                exc["name"] for exc in exchanges if exc["type"] == "production"
+            }
+        for exc in exchanges:
+            if exc["uncertainty type"] != LognormalUncertainty.id:
+                continue
+            if (
+                remove_negative_losses
+                and exc["amount"] < 0
+                and exc["name"] in production_names
+            ):
+                exc["uncertainty type"] = UndefinedUncertainty.id
+                exc["loc"] = exc["amount"]
+                del exc["scale"]
+            else:
+                lognormal.append(exc)
+    if not lognormal:
+        return db
+
+    if cutoff is not None or reparametrize:
+        scales = [exc["scale"] for exc in lognormal]
+    if cutoff is not None:
+        for index in np.flatnonzero(np.array(scales, dtype=float) > cutoff):
+            lognormal[index]["scale"] = scales[index] = replacement
+
+    locs = list(map(math.log, map(abs, (exc["amount"] for exc in lognormal))))
+    if reparametrize:
+        half_squares = [scale**2 / 2 for scale in scales]
+        locs = (np.array(locs) - np.array(half_squares, dtype=float)).tolist()
+    for exc, loc in zip(lognormal, locs):
+        exc["loc"] = loc
+    return db
+
+
 def fix_ecoinvent_flows_pre35(db):
     """
     Apply the 'fix-ecoinvent-flows-pre-35' migration to the given database if
@@ -1072,6 +1164,7 @@ def fix_ecoinvent_flows_pre35(db):
         return db
 
 
+@dataset_local
 def drop_temporary_outdated_biosphere_flows(db):
     """
     Removes exchanges with specific temporary biosphere flow names from the
@@ -1154,6 +1247,7 @@ def drop_temporary_outdated_biosphere_flows(db):
     return db
 
 
+@dataset_local
 def add_cpc_classification_from_single_reference_product(db):
     """
     Add CPC classification to a dataset's classifications if it has only one
@@ -1231,6 +1325,7 @@ def add_cpc_classification_from_single_reference_product(db):
     return db
 
 
+@dataset_local
 def delete_none_synonyms(db):
     """
     Remove `None` values from the 'synonyms' list of each dataset.
@@ -1339,6 +1434,13 @@ def update_social_flows_in_older_consequential(db, biosphere_db):
     cache = {}
 
     def get_cache(cache, biosphere_db):
+        name = getattr(biosphere_db, "name", None)
+        if isinstance(name, str) and name in databases:
+            # Stored database; only read names and codes
+            for flow_name, code in project_nodes(name, ("name", "code")):
+                if flow_name in FLOWS:
+                    cache[flow_name] = (name, code)
+            return
         for flow in biosphere_db:
             if flow["name"] in FLOWS:
                 cache[flow["name"]] = flow.key
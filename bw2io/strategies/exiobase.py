@@ -2,8 +2,9 @@ import csv
 import json
 import re
 
-from bw2data import Database, config
+from bw2data import config
 
+from ..bulk import project_nodes
 from ..data import dirpath as data_directory
 
 
@@ -270,8 +271,14 @@ def add_biosphere_ids(correspondence, biospheres=None):
         biospheres = [config.biosphere]
 
     for biosphere in biospheres:
-        db = Database(biosphere)
-        mapping.update({(o["name"], o["categories"]): o.id for o in db})
+        mapping.update(
+            {
+                (name, categories): id_
+                for name, categories, id_ in project_nodes(
+                    biosphere, ("name", "categories", "id")
+                )
+            }
+        )
 
     for obj in correspondence:
         if (obj["ecoinvent name"], get_categories(obj)) in mapping:
@@ -313,7 +320,10 @@ def add_product_ids(products, db_name):
     >>> add_product_ids(products_data, 'ecoinvent 3.7.1')
     [{'name': 'Electricity', 'location': 'CH', 'id': some_id}]
     """
-    mapping = {(o["name"], o["location"]): o.id for o in Database(db_name)}
+    mapping = {
+        (name, location): id_
+        for name, location, id_ in project_nodes(db_name, ("name", "location", "id"))
+    }
 
     for product in products:
         product["id"] = mapping[(product["name"], product["location"])]
@@ -10,7 +10,13 @@ from bw2data import Database, databases, labels
 
 from ..errors import StrategyError
 from ..units import normalize_units as normalize_units_function
-from ..utils import DEFAULT_FIELDS, activity_hash
+from ..utils import (
+    DEFAULT_FIELDS,
+    TRANSIENT_HASH,
+    activity_hash,
+    copy_containers,
+    dataset_local,
+)
 
 
 def format_nonunique_key_error(obj: dict, fields: List[str], others: List[dict]) -> str:
@@ -198,7 +204,7 @@ def link_iterable_by_fields(
     try:
         # Other can be a generator, so a bit convoluted
         for ds in filter(other_filter_func, other):
-            key = activity_hash(ds, fields)
+            key = activity_hash(ds, fields, algorithm=TRANSIENT_HASH)
             if key in candidates:
                 duplicates.setdefault(key, []).append(ds)
             else:
@@ -211,7 +217,7 @@ def link_iterable_by_fields(
 
     for container in filter(this_filter_func, unlinked):
         for obj in filter(edge_filter_func, container.get("exchanges", [])):
-            key = activity_hash(obj, fields)
+            key = activity_hash(obj, fields, algorithm=TRANSIENT_HASH)
             if key in duplicates:
                 raise StrategyError(
                     format_nonunique_key_error(obj, fields, duplicates[key])
@@ -221,6 +227,7 @@ def link_iterable_by_fields(
     return unlinked
 
 
+@dataset_local
 def assign_only_product_as_production(db: Iterable[dict]) -> List[dict]:
     """
     Assign only product as reference product.
@@ -340,6 +347,7 @@ def link_technosphere_by_activity_hash(
     )
 
 
+@dataset_local
 def set_code_by_activity_hash(db: List[dict], overwrite: bool = False) -> List[dict]:
     """
     Set the dataset code for each dataset in the given database using `activity_hash`.
@@ -371,6 +379,7 @@ def set_code_by_activity_hash(db: List[dict], overwrite: bool = False) -> List[d
     return db
 
 
+@dataset_local
 def tupleize_categories(db: List[dict]) -> List[dict]:
     """
     Convert the "categories" fields in a given database and its exchanges to tuples.
@@ -400,6 +409,7 @@ def tupleize_categories(db: List[dict]) -> List[dict]:
     return db
 
 
+@dataset_local
 def drop_unlinked(db: List[dict]) -> List[dict]:
     """
     Remove all exchanges in a given database that don't have inputs.
@@ -443,6 +453,7 @@ def drop_unlinked(db: List[dict]) -> List[dict]:
     return db
 
 
+@dataset_local
 def normalize_units(db: List[dict]) -> List[dict]:
     """
     Normalize units in datasets and their exchanges.
@@ -497,6 +508,7 @@ def normalize_units(db: List[dict]) -> List[dict]:
     return db
 
 
+@dataset_local
 def add_database_name(db: List[dict], name: str) -> List[dict]:
     """
     Adds a database name to each dataset in a list of datasets.
@@ -528,6 +540,7 @@ def add_database_name(db: List[dict], name: str) -> List[dict]:
     return db
 
 
+@dataset_local
 def convert_uncertainty_types_to_integers(db: List[dict]) -> List[dict]:
     """
     Convert uncertainty types in a list of datasets to integers.
@@ -562,6 +575,7 @@ def convert_uncertainty_types_to_integers(db: List[dict]) -> List[dict]:
     return db
 
 
+@dataset_local
 def drop_falsey_uncertainty_fields_but_keep_zeros(db: List[dict]) -> List[dict]:
     """
     Drop uncertainty fields that are falsey (e.g. '', None, False) but keep zero and NaN.
@@ -612,6 +626,7 @@ def drop_falsey_uncertainty_fields_but_keep_zeros(db: List[dict]) -> List[dict]:
     return db
 
 
+@dataset_local
 def convert_activity_parameters_to_list(data: List[dict]) -> List[dict]:
     """ "
     Convert activity parameters from a dictionary to a list of dictionaries.
@@ -710,7 +725,7 @@ def split_exchanges(
             if all(exchange.get(key) == value for key, value in filter_params.items()):
                 to_delete.append(index)
                 for factor, obj in zip(allocation_factors, changed_attributes):
-                    exc = deepcopy(exchange)
+                    exc = copy_containers(exchange)
                     exc["amount"] = exc["amount"] * factor / total
                     exc["uncertainty_type"] = 0
                     for key, value in obj.items():
@@ -1,8 +1,12 @@
 from collections import defaultdict
-from copy import deepcopy
 
 from ..errors import UnallocatableDataset
-from ..utils import rescale_exchange
+from ..utils import (
+    allocated_copy,
+    allocated_exchange,
+    copy_containers,
+    rescale_exchange,
+)
 
 VALID_METHODS = {
     "PHYSICAL_ALLOCATION",
@@ -374,26 +378,25 @@ def json_ld_allocate_datasets(db, preferred_allocation=None):
                 # Would cause singular matrix
                 continue
 
-            new_ds = deepcopy(ds)
-            new_ds["code"] = "{}.{}".format(
-                new_ds.pop("@id"), prod_exchange["flow"]["@id"]
-            )
+            flow_id = prod_exchange["flow"]["@id"]
             prod_exchange["quantitativeReference"] = True
             if allocation_method == "CAUSAL_ALLOCATION":
-                new_ds["exchanges"] = [prod_exchange] + causal_allocation(
-                    allocatable_exchanges(new_ds["exchanges"]),
-                    allocation_dict[allocation_method][prod_exchange["flow"]["@id"]],
+                exchanges = causal_allocation(
+                    [
+                        copy_containers(exc)
+                        for exc in allocatable_exchanges(ds["exchanges"])
+                    ],
+                    allocation_dict[allocation_method][flow_id],
                 )
             else:
-                new_ds["exchanges"] = [prod_exchange] + [
-                    rescale_exchange(
-                        exc,
-                        allocation_dict[allocation_method][
-                            prod_exchange["flow"]["@id"]
-                        ],
-                    )
-                    for exc in allocatable_exchanges(new_ds["exchanges"])
+                exchanges = [
+                    allocated_exchange(exc, allocation_dict[allocation_method][flow_id])
+                    for exc in allocatable_exchanges(ds["exchanges"])
                 ]
+            new_ds = allocated_copy(
+                ds, [prod_exchange] + exchanges, drop=("@id", "allocationFactors")
+            )
+            new_ds["code"] = "{}.{}".format(ds["@id"], flow_id)
             new_ds["allocationFactors"] = []
             new_datasets[new_ds["code"]] = new_ds
 
@@ -1,10 +1,34 @@
 import collections
-import copy
+import threading
+import types
 
-from bw2data import Database
+from bw2data import projects
+from bw2data.signals import on_database_delete, on_database_reset, project_changed
 
+from ..bulk import project_nodes
 from ..utils import activity_hash
 
+# Least recently used ``{(project directory, biosphere name): (rows, table)}``, where
+# ``rows`` are the ``project_nodes`` rows the expansion table was built from
+SUBCATEGORY_CACHE_SIZE = 4
+_subcategory_tables = collections.OrderedDict()
+_subcategory_tables_lock = threading.Lock()
+
+
+def clear_subcategory_tables(*args, name: str = None, **kwargs) -> None:
+    """Remove the cached expansion tables of biosphere database ``name``, or all.
+
+    Connected to the same ``bw2data`` signals as ``bw2io.bulk.clear_projections``."""
+    with _subcategory_tables_lock:
+        for key in list(_subcategory_tables):
+            if name is None or key[1] == name:
+                del _subcategory_tables[key]
+
+
+on_database_delete.connect(clear_subcategory_tables)
+on_database_reset.connect(clear_subcategory_tables)
+project_changed.connect(clear_subcategory_tables)
+
 
 def add_activity_hash_code(data):
     """
@@ -220,6 +244,73 @@ def rationalize_method_names(data):
     return data
 
 
+def subcategory_expansion_table(biosphere_db_name):
+    """
+    Map top-level categories, names and units to the biosphere flows in subcategories.
+
+    Only emissions and natural resources with more than one category level are included.
+    Keys are ``(top-level category, name, unit)``; values are sorted tuples of read-only
+    CF templates with the ``categories``, ``database``, ``input``, ``name`` and ``unit``
+    of each flow.
+
+    The table is cached until the biosphere database changes. Only the
+    ``SUBCATEGORY_CACHE_SIZE`` most recently used tables are kept.
+
+    Parameters
+    ----------
+    biosphere_db_name : str
+        The name of the biosphere database.
+
+    Returns
+    -------
+    dict
+        The expansion table. Don't modify it.
+    """
+    rows = project_nodes(
+        biosphere_db_name, ("type", "categories", "name", "unit", "database", "code")
+    )
+    cache_key = (str(projects.dir), biosphere_db_name)
+    with _subcategory_tables_lock:
+        cached = _subcategory_tables.get(cache_key)
+        # ``project_nodes`` returns the same object until the database changes
+        if cached is not None and cached[0] is rows:
+            _subcategory_tables.move_to_end(cache_key)
+            return cached[1]
+
+    mapping = collections.defaultdict(list)
+    for type_, categories, name, unit, database, code in rows:
+        # Try to filter our industrial activities and their flows
+        if type_ not in ("emission", "natural resource"):
+            continue
+        if len(categories or []) > 1:
+            mapping[(categories[0], name, unit)].append(
+                {
+                    "categories": categories,
+                    "database": database,
+                    "input": (database, code),
+                    "name": name,
+                    "unit": unit,
+                }
+            )
+    # Sorting needed for tests
+    table = {
+        key: tuple(
+            types.MappingProxyType(template)
+            for template in sorted(
+                templates,
+                key=lambda x: tuple([x[key] for key in sorted(x.keys())]),
+            )
+        )
+        for key, templates in mapping.items()
+    }
+    with _subcategory_tables_lock:
+        _subcategory_tables[cache_key] = (rows, table)
+        _subcategory_tables.move_to_end(cache_key)
+        while len(_subcategory_tables) > SUBCATEGORY_CACHE_SIZE:
+            _subcategory_tables.popitem(last=False)
+    return table
+
+
 def match_subcategories(data, biosphere_db_name, remove=True):
     """
     Add CFs for biosphere flows with the same top-level categories as a given characterization.
@@ -267,41 +358,21 @@ def match_subcategories(data, biosphere_db_name, remove=True):
     ]
     """
 
-    def add_amount(obj, amount):
-        obj["amount"] = amount
-        return obj
-
-    def add_subcategories(obj, mapping):
-        # Sorting needed for tests
-        new_objs = sorted(
-            mapping[
-                (
-                    obj["categories"][0],
-                    obj["name"],
-                    obj["unit"],
-                )
-            ],
-            key=lambda x: tuple([x[key] for key in sorted(x.keys())]),
-        )
-        # Need to create copies so data from later methods doesn't
-        # clobber amount values
-        return [add_amount(copy.deepcopy(elem), obj["amount"]) for elem in new_objs]
-
-    mapping = collections.defaultdict(list)
-    for flow in Database(biosphere_db_name):
-        # Try to filter our industrial activities and their flows
-        if not flow.get("type") in ("emission", "natural resource"):
-            continue
-        if len(flow.get("categories", [])) > 1:
-            mapping[(flow["categories"][0], flow["name"], flow["unit"])].append(
-                {
-                    "categories": flow["categories"],
-                    "database": flow["database"],
-                    "input": flow.key,
-                    "name": flow["name"],
-                    "unit": flow["unit"],
-                }
-            )
+    mapping = subcategory_expansion_table(biosphere_db_name)
+
+    def add_subcategories(obj):
+        # Templates are shared; new CFs are shallow copies, so that data from
+        # later methods doesn't clobber amount values
+        new_objs = []
+        for template in mapping.get(
+            (obj["categories"][0], obj["name"], obj["unit"]), ()
+        ):
+            new_obj = dict(template)
+            if isinstance(new_obj["categories"], list):
+                new_obj["categories"] = list(new_obj["categories"])
+            new_obj["amount"] = obj["amount"]
+            new_objs.append(new_obj)
+        return new_objs
 
     for method in data:
         already_have = {
@@ -315,7 +386,7 @@ def match_subcategories(data, biosphere_db_name, remove=True):
             # Don't add subcategory flows which already have CFs
             subcat_cfs = [
                 x
-                for x in add_subcategories(obj, mapping)
+                for x in add_subcategories(obj)
                 if (x["name"], tuple(x["categories"])) not in already_have
             ]
             if subcat_cfs and remove and not obj.get("input"):
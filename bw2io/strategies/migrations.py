@@ -1,68 +1,104 @@
+import copy
+
 from ..errors import MissingMigration
 from ..migrations import Migration, migrations
-from ..utils import activity_hash, rescale_exchange
+from ..utils import rescale_exchange
 
 
-def migrate_datasets(db, migration):
+def _compiled(migration):
     if migration not in migrations:
         raise MissingMigration(
             "Migration `{}` is missing; did you run `bw2setup()` in this project? You can also (re-)install core migrations  with `create_core_migrations()`".format(
                 migration
             )
         )
-    migration_data = Migration(migration).load()
+    return Migration(migration).compiled()
 
-    to_dict = lambda x: dict(zip(migration_data["fields"], x))
 
-    mapping = {
-        activity_hash(to_dict(obj[0]), fields=migration_data["fields"]): obj[1]
-        for obj in migration_data["data"]
-    }
+def _value(value):
+    # Compiled migrations are shared between calls, so don't hand out their
+    # mutable values
+    if isinstance(value, (list, dict, set)):
+        return copy.deepcopy(value)
+    return value
 
-    for ds in db:
-        try:
-            new_data = mapping[activity_hash(ds, fields=migration_data["fields"])]
-        except KeyError:
-            # This dataset is not in the list to be migrated
+
+def _migrate_dataset(ds, compiled):
+    new_data = compiled.get(ds)
+    if new_data is None:
+        # This dataset is not in the list to be migrated
+        return
+    for field, value in new_data.items():
+        if field == "multiplier":
+            # This change should only be done by `migrate_exchanges`
             continue
-        for field, value in new_data.items():
-            if field == "multiplier":
-                # This change should only be done by `migrate_exchanges`
-                continue
-            else:
-                ds[field] = value
+        else:
+            ds[field] = _value(value)
+
+
+def _migrate_exchange(exc, compiled):
+    new_data = compiled.get(exc)
+    if new_data is None:
+        # This exchange is not in the list to be migrated
+        return
+    for field, value in new_data.items():
+        if field == "multiplier":
+            rescale_exchange(exc, value)
+        else:
+            exc[field] = _value(value)
+
+
+def migrate_datasets(db, migration):
+    compiled = _compiled(migration)
+    for ds in db:
+        _migrate_dataset(ds, compiled)
     return db
 
 
 def migrate_exchanges(db, migration):
-    if migration not in migrations:
-        raise MissingMigration(
-            "Migration `{}` is missing; did you run `bw2setup()` in this project? You can also (re-)install core migrations  with `create_core_migrations()`".format(
-                migration
-            )
-        )
-    migration_data = Migration(migration).load()
+    compiled = _compiled(migration)
+    for ds in db:
+        for exc in ds.get("exchanges", []):
+            _migrate_exchange(exc, compiled)
+    return db
+
+
+def migrate_many(db, names, datasets=False, exchanges=True):
+    """
+    Apply several migrations in a single pass over the data.
 
-    to_dict = lambda x: dict(zip(migration_data["fields"], x))
+    Gives the same result as applying ``migrate_datasets`` (if ``datasets``) and then
+    ``migrate_exchanges`` (if ``exchanges``) for each migration in ``names`` in turn, as
+    every dataset and exchange is migrated on its own.
 
-    # Create dict of lookup fields to new data. There shouldn't be
-    # duplicates for the lookup fields, as they will be overwritten
-    # during mapping creation.
-    mapping = {
-        activity_hash(to_dict(obj[0]), fields=migration_data["fields"]): obj[1]
-        for obj in migration_data["data"]
-    }
+    Parameters
+    ----------
+    db : list
+        Datasets to migrate.
+    names : list of str
+        Names of the migrations, in the order in which they are applied.
+    datasets : bool, optional
+        Migrate the datasets themselves. Defaults to False.
+    exchanges : bool, optional
+        Migrate the exchanges of each dataset. Defaults to True.
 
+    Returns
+    -------
+    list
+        The migrated datasets.
+
+    Raises
+    ------
+    MissingMigration
+        If one of the migrations isn't installed; raised before any data is changed.
+    """
+    compiled = [_compiled(name) for name in names]
     for ds in db:
-        for exc in ds.get("exchanges", []):
-            try:
-                new_data = mapping[activity_hash(exc, fields=migration_data["fields"])]
-            except KeyError:
-                # This exchange is not in the list to be migrated
-                continue
-            for field, value in new_data.items():
-                if field == "multiplier":
-                    rescale_exchange(exc, value)
-                else:
-                    exc[field] = value
+        if datasets:
+            for migration in compiled:
+                _migrate_dataset(ds, migration)
+        if exchanges:
+            for exc in ds.get("exchanges", []):
+                for migration in compiled:
+                    _migrate_exchange(exc, migration)
     return db
@@ -4,7 +4,7 @@ from typing import List, Optional
 from bw2data.logs import get_logger
 from SPARQLWrapper import JSON, SPARQLWrapper
 
-from ...utils import activity_hash, rescale_exchange
+from ...utils import TRANSIENT_HASH, activity_hash, rescale_exchange
 
 logger = get_logger("io-vocab.sentier.dev.log")
 
@@ -170,7 +170,13 @@ def match_internal_simapro_simapro_with_unit_conversion(
     if not fields:
         fields = ["name", "location", "unit"]
 
-    lookup = {activity_hash(ds, fields): (ds["database"], ds["code"]) for ds in data}
+    lookup = {
+        activity_hash(ds, fields, algorithm=TRANSIENT_HASH): (
+            ds["database"],
+            ds["code"],
+        )
+        for ds in data
+    }
 
     for ds in data:
         for exc in filter(lambda x: not x.get("input"), ds.get("exchanges", [])):
@@ -181,6 +187,7 @@ def match_internal_simapro_simapro_with_unit_conversion(
                             {key: value for key, value in exc.items() if key in fields}
                             | {"unit": conversion["unit"]},
                             fields,
+                            algorithm=TRANSIENT_HASH,
                         )
                     ]
                     exc["unit"] = conversion["unit"]
@@ -1,4 +1,3 @@
-import copy
 import re
 from numbers import Number
 from typing import List, Optional
@@ -10,7 +9,13 @@ from stats_arrays import LognormalUncertainty
 
 from ..compatibility import SIMAPRO_BIO_SUBCATEGORIES, SIMAPRO_BIOSPHERE
 from ..data import get_valid_geonames
-from ..utils import load_json_data_file, rescale_exchange
+from ..utils import (
+    allocated_copy,
+    allocated_exchange,
+    copy_containers,
+    load_json_data_file,
+    rescale_exchange,
+)
 from .generic import link_technosphere_by_activity_hash
 from .locations import GEO_UPDATE
 
@@ -114,14 +119,17 @@ def sp_allocate_functional_products(data: List[dict]) -> List[dict]:
                 # Skip zero-allocation products
                 continue
 
-            new = copy.deepcopy(ds)
-            production_exc = copy.deepcopy(product)
+            production_exc = copy_containers(product)
             del production_exc["allocation"]
-            new["exchanges"] = [production_exc] + [
-                rescale_exchange(exc, allocation)
-                for exc in new["exchanges"]
-                if not functional(exc)
-            ]
+            new = allocated_copy(
+                ds,
+                [production_exc]
+                + [
+                    allocated_exchange(exc, allocation)
+                    for exc in ds["exchanges"]
+                    if not functional(exc)
+                ],
+            )
             # Just how SimaPro rolls...
             new["name"] = new["reference product"] = product["name"]
             new["unit"] = product["unit"]
@@ -208,7 +216,7 @@ def sp_allocate_products(data: List[dict]) -> List[dict]:
                 exc for exc in ds["exchanges"] if exc["type"] != "production"
             ]
             for product in products:
-                product = copy.deepcopy(product)
+                product = copy_containers(product)
                 if allocation := product.get("allocation"):
                     if isinstance(product["allocation"], str) and "parameters" in ds:
                         ds["parameters"] = {
@@ -235,8 +243,9 @@ def sp_allocate_products(data: List[dict]) -> List[dict]:
                         product["amount"] = 0  # Infinity as zero? :-/
                 else:
                     product["amount"] = 0
-                copied = copy.deepcopy(ds)
-                copied["exchanges"].append(product)
+                copied = allocated_copy(
+                    ds, [copy_containers(exc) for exc in ds["exchanges"]] + [product]
+                )
                 copied["name"] = copied["reference product"] = product["name"]
                 copied["unit"] = product["unit"]
                 copied["production amount"] = product["amount"]
@@ -855,10 +864,18 @@ def set_lognormal_loc_value_uncertainty_safe(data: List[dict]) -> List[dict]:
     >>> set_lognormal_loc_value_uncertainty_safe(db)
     [{'exchanges': [{'amount': 10, 'uncertainty type': 2, 'loc': 2.302585092994046}]}]
     """
-    for ds in data:
-        for exc in ds.get("exchanges", []):
-            if exc.get("uncertainty type") == LognormalUncertainty.id:
-                exc["loc"] = np.log(abs(exc["amount"]))
+    lognormal = [
+        exc
+        for ds in data
+        for exc in ds.get("exchanges", [])
+        if exc.get("uncertainty type") == LognormalUncertainty.id
+    ]
+    if not lognormal:
+        return data
+    # Same results as ``np.log`` on each amount
+    locs = np.log(np.abs(np.array([exc["amount"] for exc in lognormal], dtype=float)))
+    for exc, loc in zip(lognormal, locs):
+        exc["loc"] = loc
     return data
 
 
@@ -1,4 +1,4 @@
-from bw2data import projects
+from bw2data import config, projects
 from bw2data.data_store import DataStore
 from bw2data.serialization import SerializedDict
 
@@ -10,6 +10,8 @@ class _UnlinkedData(SerializedDict):
 
 
 unlinked_data = _UnlinkedData()
+# Reload on project change
+config.metadata.append(unlinked_data)
 
 
 class UnlinkedData(DataStore):
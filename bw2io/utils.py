@@ -1,9 +1,15 @@
+import contextlib
+import copy
+import functools
 import hashlib
 import json
 import math
+import multiprocessing
 import os
 import pprint
+import threading
 from numbers import Number
+from typing import Any, Optional
 
 from stats_arrays import (
     LognormalUncertainty,
@@ -18,8 +24,19 @@ from .errors import UnsupportedExchange
 
 DEFAULT_FIELDS = ("name", "categories", "unit", "reference product", "location")
 
+# Hash functions for ``activity_hash``; each takes bytes and returns a ``hashlib``
+# hash object. Persisted codes use MD5, so its output must never change.
+HASH_ALGORITHMS = {
+    "md5": hashlib.md5,
+    "blake2b": functools.partial(hashlib.blake2b, digest_size=16),
+}
+# Faster hash for keys which only live in memory, like lookup tables
+TRANSIENT_HASH = "blake2b"
 
-def activity_hash(data, fields=None, case_insensitive=True):
+_memo = threading.local()
+
+
+def activity_hash(data, fields=None, case_insensitive=True, algorithm="md5"):
     """
     Hash an activity dataset.
 
@@ -49,23 +66,107 @@ def activity_hash(data, fields=None, case_insensitive=True):
     case_insensitive : bool, optional
         Cast everything to lowercase before computing hash. Default is ``True``.
 
+    algorithm : str, optional
+        Key of the hash function in ``HASH_ALGORITHMS``. Default is ``"md5"``, which
+        must be used for anything stored, like codes. Use ``TRANSIENT_HASH`` for keys
+        which only live in memory.
+
     Returns
     -------
     str
-        A MD5 hash string, hex-encoded.
+        A hash string, hex-encoded.
 
     """
-    lower = lambda x: x.lower() if case_insensitive else x
+    fields = fields or DEFAULT_FIELDS
+    memo = getattr(_memo, "digests", None)
+    if memo is not None:
+        # The hashed string only depends on the field values, so they can be the key
+        key = (
+            algorithm,
+            case_insensitive,
+            tuple([data.get(field) for field in fields]),
+        )
+        try:
+            return memo[key]
+        except KeyError:
+            pass
+        except TypeError:
+            # Unhashable values like lists
+            memo = None
+
+    parts = []
+    for field in fields:
+        value = data.get(field)
+        if isinstance(value, (list, tuple)):
+            value = "".join(value)
+        elif not value:
+            value = ""
+        parts.append(value.lower() if case_insensitive else value)
+    digest = HASH_ALGORITHMS[algorithm]("".join(parts).encode("utf-8")).hexdigest()
+
+    if memo is not None:
+        memo[key] = digest
+    return digest
+
+
+@contextlib.contextmanager
+def activity_hash_memo():
+    """
+    Memoize ``activity_hash`` digests in the current thread until the block exits.
 
-    def get_value(obj, field):
-        if isinstance(data.get(field), (list, tuple)):
-            return lower("".join(data.get(field) or []))
-        else:
-            return lower(data.get(field) or "")
+    The same edges are often hashed by several strategies in a row; the memo skips
+    building and hashing the field string for field values that were already seen.
+    Nested blocks share the outermost memo.
+
+    """
+    if getattr(_memo, "digests", None) is not None:
+        yield
+        return
+    _memo.digests = {}
+    try:
+        yield
+    finally:
+        _memo.digests = None
+
+
+def dataset_local(func):
+    """
+    Mark a strategy as dataset-local.
+
+    A dataset-local strategy only reads and modifies one dataset at a time, and its
+    result doesn't depend on the other datasets. Calling it on ``[ds]`` for each
+    dataset gives the same result as calling it on all datasets at once. Importers
+    can therefore apply such strategies to datasets as they flow through a pipeline.
+
+    The function is returned unchanged, with a ``dataset_local`` attribute.
+
+    """
+    func.dataset_local = True
+    return func
+
+
+def is_dataset_local(strategy) -> bool:
+    """Check if ``strategy`` (a function or ``functools.partial``) is dataset-local."""
+    return getattr(getattr(strategy, "func", strategy), "dataset_local", False)
 
-    fields = fields or DEFAULT_FIELDS
-    string = "".join([get_value(data, field) for field in fields])
-    return str(hashlib.md5(string.encode("utf-8")).hexdigest())
+
+def process_pool_context():
+    """
+    Return the ``multiprocessing`` context to create a process pool with.
+
+    Forking a process while other threads run can deadlock the child, if one of these
+    threads holds a lock at that moment. In that case, the ``forkserver`` start method
+    (or ``spawn``, where it isn't available) is used instead of ``fork``; the workers
+    then import the functions they run instead of inheriting them. Otherwise this is
+    the default context.
+
+    """
+    context = multiprocessing.get_context()
+    if context.get_start_method() != "fork" or threading.active_count() == 1:
+        return context
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+    return multiprocessing.get_context("spawn")
 
 
 def es2_activity_hash(activity, flow):
@@ -195,6 +296,157 @@ def rescale_exchange(exc: dict, factor: float) -> dict:
     return exc
 
 
+# Values which ``copy_containers`` shares instead of copying
+_ATOMIC = frozenset({str, int, float, bool, type(None), bytes, complex})
+
+
+def copy_containers(obj: Any) -> Any:
+    """
+    Copy the dicts, lists, and tuples in ``obj``, sharing the immutable values in them.
+
+    Gives the same result as ``copy.deepcopy`` for the nested dicts, lists, and scalars
+    of imported data, but is much faster, as strings and numbers aren't dispatched
+    and memoized one by one. Other types fall back to ``copy.deepcopy``.
+
+    Parameters
+    ----------
+    obj : Any
+        The object to copy, e.g. an exchange.
+
+    Returns
+    -------
+    Any
+        The copy. Changing it in place doesn't change ``obj``.
+
+    """
+    cls = type(obj)
+    if cls in _ATOMIC:
+        return obj
+    elif cls is dict:
+        return {
+            key: value if type(value) in _ATOMIC else copy_containers(value)
+            for key, value in obj.items()
+        }
+    elif cls is list:
+        return [
+            value if type(value) in _ATOMIC else copy_containers(value) for value in obj
+        ]
+    elif cls is tuple:
+        copied = tuple(copy_containers(value) for value in obj)
+        # Tuples of immutable values, like ``categories``, can be shared as is
+        return obj if all(a is b for a, b in zip(obj, copied)) else copied
+    return copy.deepcopy(obj)
+
+
+def allocated_copy(ds: dict, exchanges: list, drop: tuple = ()) -> dict:
+    """
+    Copy the dataset ``ds`` for one product of an allocation, with ``exchanges``.
+
+    Allocation creates a dataset for each product of a multifunctional dataset, and only
+    the exchanges differ between them. Instead of deep copying ``ds`` with all its
+    exchanges for each product, this copies the other values with ``copy_containers``
+    and uses ``exchanges`` as is; build these with ``allocated_exchange``.
+
+    Parameters
+    ----------
+    ds : dict
+        The multifunctional dataset.
+    exchanges : list
+        The exchanges of the new dataset.
+    drop : tuple, optional
+        Keys of ``ds`` which aren't copied, because the caller replaces them.
+
+    Returns
+    -------
+    dict
+        The new dataset, which doesn't share mutable values with ``ds``.
+
+    """
+    new = {
+        key: copy_containers(value)
+        for key, value in ds.items()
+        if key != "exchanges" and key not in drop
+    }
+    new["exchanges"] = exchanges
+    return new
+
+
+def allocated_exchange(exc: dict, factor: float) -> dict:
+    """
+    Return a copy of ``exc`` rescaled by the allocation ``factor``.
+
+    ``exc`` itself isn't changed, so it can be allocated to each product in turn.
+
+    Parameters
+    ----------
+    exc : dict
+        The exchange to allocate.
+    factor : float
+        The allocation factor.
+
+    Returns
+    -------
+    dict
+        The rescaled copy, see ``rescale_exchange``.
+
+    """
+    return rescale_exchange(copy_containers(exc), factor)
+
+
+def intern_strings(obj: Any, pool: Optional[dict] = None, max_length: int = 256) -> Any:
+    """
+    Canonicalize repeated strings and tuples of strings in extracted data.
+
+    Data created in worker processes is unpickled in the parent process as fresh
+    objects, so every exchange carries its own copy of the same unit names,
+    locations, categories, and UUIDs. This function walks nested dicts, lists, and
+    tuples, and replaces each equal string (dict keys included) or tuple with a
+    single shared instance. The data model is not changed.
+
+    Parameters
+    ----------
+    obj : Any
+        The data to canonicalize, normally a list of datasets.
+    pool : dict, optional
+        Mapping of value to its canonical instance. Pass the same pool to share
+        canonical values across several calls.
+    max_length : int, optional
+        Strings longer than this (e.g. comments) are left as is, as they are
+        seldom repeated. Default is 256.
+
+    Returns
+    -------
+    Any
+        The canonicalized data. Dicts and lists are modified in place.
+
+    """
+    if pool is None:
+        pool = {}
+
+    def canonical(value):
+        if isinstance(value, str):
+            if len(value) > max_length:
+                return value
+            return pool.setdefault(value, value)
+        elif isinstance(value, dict):
+            items = [(canonical(k), canonical(v)) for k, v in value.items()]
+            value.clear()
+            value.update(items)
+            return value
+        elif isinstance(value, list):
+            value[:] = [canonical(v) for v in value]
+            return value
+        elif isinstance(value, tuple):
+            value = tuple(canonical(v) for v in value)
+            # Only pool tuples of strings, as e.g. ``(1, 2) == (1.0, 2.0)``
+            if all(isinstance(v, str) for v in value):
+                return pool.setdefault(value, value)
+            return value
+        return value
+
+    return canonical(obj)
+
+
 def standardize_method_to_len_3(name, padding="--", joiner=","):
     """
     Standardize an LCIA method name to a length 3 tuple.
@@ -0,0 +1,71 @@
+"""Micro-benchmarks for ``activity_hash``.
+
+Compares the persistent (MD5) and transient (``TRANSIENT_HASH``) hash functions, with
+and without ``activity_hash_memo``, on synthetic exchanges where each key is repeated
+like edges to the same flow in a real database.
+
+Usage: ``python dev/benchmarks/activity_hash.py [number of exchanges]``
+
+"""
+
+import sys
+import timeit
+
+from bw2io.utils import (
+    HASH_ALGORITHMS,
+    TRANSIENT_HASH,
+    activity_hash,
+    activity_hash_memo,
+)
+
+UNITS = ["kilogram", "megajoule", "cubic meter", "kilowatt hour", "unit"]
+LOCATIONS = ["GLO", "RER", "CH", "DE", "RoW", "US", "CN"]
+CATEGORIES = [("air", "urban air close to ground"), ("water", "ground-"), ("soil",)]
+
+
+def fake_exchanges(num):
+    return [
+        {
+            "name": f"Market for product {i % 5000}",
+            "reference product": f"product {i % 5000}",
+            "categories": CATEGORIES[i % len(CATEGORIES)],
+            "unit": UNITS[i % len(UNITS)],
+            "location": LOCATIONS[i % len(LOCATIONS)],
+            "amount": float(i),
+        }
+        for i in range(num)
+    ]
+
+
+def best(func, number=3):
+    return min(timeit.repeat(func, number=1, repeat=number))
+
+
+def hash_all(exchanges, algorithm):
+    for exc in exchanges:
+        activity_hash(exc, algorithm=algorithm)
+
+
+if __name__ == "__main__":
+    num = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    exchanges = fake_exchanges(num)
+    encoded = [str(i).encode("utf-8") * 20 for i in range(num)]
+
+    print(f"{num} exchanges, seconds (best of 3)")
+    for name, func in HASH_ALGORITHMS.items():
+        seconds = best(lambda: [func(b).hexdigest() for b in encoded])
+        print(f"  digest only, {name}: {seconds:.3f}")
+    for algorithm in ("md5", TRANSIENT_HASH):
+        seconds = best(lambda: hash_all(exchanges, algorithm))
+        print(f"  activity_hash, {algorithm}: {seconds:.3f}")
+
+        def three_passes():
+            # Like three strategies in a row inside one `apply_strategies` run
+            with activity_hash_memo():
+                for _ in range(3):
+                    hash_all(exchanges, algorithm)
+
+        seconds = best(lambda: [hash_all(exchanges, algorithm) for _ in range(3)])
+        print(f"  activity_hash, {algorithm}, 3 passes without memo: {seconds:.3f}")
+        seconds = best(three_passes)
+        print(f"  activity_hash, {algorithm}, 3 passes with memo: {seconds:.3f}")
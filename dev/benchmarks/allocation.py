@@ -0,0 +1,74 @@
+"""Micro-benchmarks for allocation strategies.
+
+Allocates synthetic multifunctional SimaPro datasets with
+``sp_allocate_functional_products``, and compares ``copy_containers`` with
+``copy.deepcopy`` on their exchanges.
+
+Usage: ``python dev/benchmarks/allocation.py [number of datasets]``
+
+"""
+
+import copy
+import sys
+import timeit
+
+from bw2io.strategies import sp_allocate_functional_products
+from bw2io.utils import copy_containers
+
+
+def fake_datasets(num, products=5, exchanges=200):
+    return [
+        {
+            "name": f"Dataset {i}",
+            "type": "multifunctional",
+            "comment": "Some long comment " * 20,
+            "categories": ("Materials", "Metals"),
+            "parameters": {"p1": {"amount": 1.0}},
+            "exchanges": [
+                {
+                    "type": "production",
+                    "name": f"Product {i}-{j}",
+                    "unit": "kg",
+                    "amount": 1.0,
+                    "allocation": 100 / products,
+                }
+                for j in range(products)
+            ]
+            + [
+                {
+                    "type": "technosphere" if j % 2 else "biosphere",
+                    "name": f"Input {j}",
+                    "categories": ("air",),
+                    "unit": "kg",
+                    "amount": float(j + 1),
+                    "uncertainty type": 2,
+                    "loc": 0.0,
+                    "scale": 0.1,
+                    "comment": "Estimated",
+                }
+                for j in range(exchanges)
+            ],
+        }
+        for i in range(num)
+    ]
+
+
+def best(func, number=3):
+    return min(timeit.repeat(func, number=1, repeat=number))
+
+
+if __name__ == "__main__":
+    num = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    data = fake_datasets(num)
+    exchanges = [exc for ds in data for exc in ds["exchanges"]]
+
+    print(f"{num} datasets, {len(exchanges)} exchanges, seconds (best of 3)")
+    for name, func in (
+        ("copy.deepcopy", lambda: [copy.deepcopy(e) for e in exchanges]),
+        ("copy_containers", lambda: [copy_containers(e) for e in exchanges]),
+        (
+            "sp_allocate_functional_products",
+            lambda: sp_allocate_functional_products(data),
+        ),
+    ):
+        print(f"  {name}: {best(func):.3f}")
@@ -0,0 +1,62 @@
+"""Startup time of ``import bw2io``.
+
+Runs ``python -X importtime -c "import bw2io"`` in fresh interpreters and reports the
+cumulative import time of ``bw2io``, and of first using an importer. ``import bw2io``
+should stay well below the time of importing ``bw2data``; exits with status 1 if it
+takes longer than the limit.
+
+Usage: ``python dev/benchmarks/import_time.py [limit in milliseconds, default 100]``
+
+"""
+
+import subprocess
+import sys
+
+
+def cumulative_import_time(statement, module="bw2io"):
+    """Cumulative import time of ``module`` during ``statement``, in microseconds."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    for line in result.stderr.splitlines():
+        # Lines look like ``import time:   self [us] | cumulative | imported package``
+        parts = line.split("|")
+        if len(parts) == 3 and parts[2].strip() == module:
+            return int(parts[1])
+    raise ValueError(f"Can't find {module} in import times")
+
+
+def best(statement, module="bw2io", number=5):
+    return min(cumulative_import_time(statement, module) for _ in range(number))
+
+
+def first_use_time(statement):
+    """Seconds to run ``statement`` after ``import bw2io``, in a fresh interpreter."""
+    code = (
+        "import time; import bw2io; start = time.perf_counter(); "
+        + statement
+        + "; print(time.perf_counter() - start)"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    return float(result.stdout.split()[-1])
+
+
+if __name__ == "__main__":
+    limit = float(sys.argv[1]) if len(sys.argv) > 1 else 100
+
+    lazy = best("import bw2io") / 1000
+    print(f"import bw2io: {lazy:.1f} ms (best of 5)")
+    bw2data = best("import bw2data", "bw2data") / 1000
+    print(f"import bw2data: {bw2data:.1f} ms")
+    # The importers, and with them ``bw2data``, are loaded on first use
+    importer = first_use_time("bw2io.SingleOutputEcospold2Importer") * 1000
+    print(f"first use of bw2io.SingleOutputEcospold2Importer: {importer:.1f} ms")
+
+    if lazy > limit:
+        print(f"`import bw2io` is slower than {limit} ms")
+        sys.exit(1)
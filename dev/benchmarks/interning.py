@@ -0,0 +1,62 @@
+"""Memory used by extracted data before and after ``intern_strings``.
+
+Simulates data unpickled from worker processes, where every exchange has its own
+copy of repeated labels.
+
+Usage: ``python dev/benchmarks/interning.py [number of datasets]``
+
+"""
+
+import pickle
+import sys
+import tracemalloc
+import uuid
+
+from bw2io.utils import intern_strings
+
+UNITS = ["kilogram", "megajoule", "cubic meter", "kilowatt hour", "unit"]
+LOCATIONS = ["GLO", "RER", "CH", "DE", "RoW", "US", "CN"]
+CATEGORIES = [("air", "urban air close to ground"), ("water", "ground-"), ("soil",)]
+FLOWS = [str(uuid.uuid4()) for _ in range(2000)]
+
+
+def fake_dataset(i):
+    return {
+        "name": f"activity {i}",
+        "location": LOCATIONS[i % len(LOCATIONS)],
+        "unit": UNITS[i % len(UNITS)],
+        "exchanges": [
+            {
+                "flow": FLOWS[(i * j) % len(FLOWS)],
+                "name": f"flow {(i * j) % 500}",
+                "unit": UNITS[j % len(UNITS)],
+                "categories": CATEGORIES[j % len(CATEGORIES)],
+                "type": "biosphere",
+                "amount": float(j),
+            }
+            for j in range(100)
+        ],
+    }
+
+
+def unpickled(num):
+    # Pickle datasets one by one, like results from `multiprocessing.Pool`
+    return [pickle.loads(pickle.dumps(fake_dataset(i))) for i in range(num)]
+
+
+def measure(num, intern):
+    tracemalloc.start()
+    data = unpickled(num)
+    if intern:
+        data = intern_strings(data)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current
+
+
+if __name__ == "__main__":
+    num = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    before, after = measure(num, False), measure(num, True)
+    print(f"{num} datasets")
+    print(f"Without interning: {before / 1e6:.1f} MB")
+    print(f"With interning: {after / 1e6:.1f} MB ({after / before:.0%})")
@@ -0,0 +1,83 @@
+"""Micro-benchmarks for reading the CFs sheet of an ecoinvent-like LCIA workbook.
+
+Writes a synthetic workbook with a ``units`` and a ``CFs`` sheet, and compares
+reading all of it with ``ExcelExtractor.extract`` with reading only the needed
+columns with ``ExcelExtractor.extract_columns``.
+
+Usage: ``python dev/benchmarks/lcia_workbook.py [number of CFs]``
+
+"""
+
+import sys
+import tempfile
+import timeit
+from pathlib import Path
+
+from openpyxl import Workbook
+
+from bw2io.extractors import ExcelExtractor
+
+COLUMNS = [
+    "method",
+    "category",
+    "indicator",
+    "name",
+    "compartment",
+    "subcompartment",
+    "cf",
+]
+
+
+def fake_workbook(filepath, num, per_category=500):
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "units"
+    ws.append(["Method", "Category", "Indicator", "Indicator Unit"])
+    for i in range(num // per_category + 1):
+        ws.append(["Method", f"Category {i}", "Indicator", "kg"])
+    ws = wb.create_sheet("CFs")
+    ws.append(
+        [
+            "Method",
+            "Category",
+            "Indicator",
+            "Name",
+            "Compartment",
+            "Subcompartment",
+            "CF",
+            "CAS",
+        ]
+    )
+    for i in range(num):
+        ws.append(
+            [
+                "Method",
+                f"Category {i // per_category}",
+                "Indicator",
+                f"Flow {i % per_category}",
+                "air",
+                "unspecified",
+                i / num,
+                "000124-38-9",
+            ]
+        )
+    wb.save(filepath)
+
+
+def best(func, number=3):
+    return min(timeit.repeat(func, number=1, repeat=number))
+
+
+if __name__ == "__main__":
+    num = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    with tempfile.TemporaryDirectory() as dirpath:
+        filepath = Path(dirpath) / "lcia.xlsx"
+        fake_workbook(filepath, num)
+
+        extract = best(lambda: ExcelExtractor.extract(filepath))
+        extract_columns = best(
+            lambda: ExcelExtractor.extract_columns(filepath, "CFs", COLUMNS)
+        )
+        print(f"{num} CFs, seconds (best of 3)")
+        print(f"  ExcelExtractor.extract: {extract:.3f}")
+        print(f"  ExcelExtractor.extract_columns: {extract_columns:.3f}")
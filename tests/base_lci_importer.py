@@ -1,8 +1,10 @@
+import functools
+import json
 from copy import deepcopy
 
 import numpy as np
 import pytest
-from bw2data import Database, databases
+from bw2data import Database, calculation_setups, databases
 from bw2data.parameters import *
 from bw2data.tests import bw2test
 
@@ -436,6 +438,272 @@ def test_database_update_existing_data(lci):
     assert {act["location"] for act in Database("PCB")} == {"CH"}
 
 
+@bw2test
+def test_write_database_upsert_only_changes_given_nodes():
+    obj = LCIImporter("PCB")
+    obj.data = deepcopy(DATA_NO_PARAMS)
+    obj.write_database()
+    unchanged_id = Database("PCB").get("45cb34db4147e510a2561cceec541f6b").id
+    changed_id = Database("PCB").get("32aa5ab78beda5b8c8efbc89587de7a5").id
+
+    new = deepcopy(DATA_NO_PARAMS)
+    new[0]["location"] = "DE"
+    new[0]["exchanges"][0]["amount"] = 50.0
+    new.append(
+        {
+            "code": "C",
+            "database": "PCB",
+            "exchanges": [
+                {"amount": 1.0, "input": ("PCB", "C"), "type": "production"},
+            ],
+            "location": "FR",
+            "name": "something new",
+            "type": "process",
+            "unit": "kilogram",
+        }
+    )
+    obj = LCIImporter("PCB")
+    obj.data = new
+    obj.write_database(delete_existing=False)
+
+    db = Database("PCB")
+    assert len(db) == 3
+    assert databases["PCB"]["number"] == 3
+    assert db.get("45cb34db4147e510a2561cceec541f6b").id == unchanged_id
+    act = db.get("32aa5ab78beda5b8c8efbc89587de7a5")
+    assert act.id == changed_id
+    assert act["location"] == "DE"
+    assert sorted(exc["amount"] for exc in act.exchanges()) == [0.0, 50.0]
+    assert len(list(db.get("C").exchanges())) == 1
+    assert db.search("something new")
+    assert sum(exc["amount"] for act in db for exc in act.exchanges()) == 61
+
+
+@bw2test
+def test_write_database_upsert_keeps_other_nodes():
+    obj = LCIImporter("PCB")
+    obj.data = deepcopy(DATA_NO_PARAMS)
+    obj.write_database()
+
+    obj = LCIImporter("PCB")
+    obj.data = deepcopy(DATA_NO_PARAMS[1:])
+    obj.data[0]["name"] = "changed"
+    obj.write_database(delete_existing=False)
+
+    assert {act["name"] for act in Database("PCB")} == {
+        "mounted printed circuit board",
+        "changed",
+    }
+
+
+@bw2test
+def test_apply_strategies_and_write_database():
+    from bw2io.strategies import add_database_name, normalize_units
+    from bw2io.utils import dataset_local
+
+    applied = []
+
+    def global_strategy(db):
+        applied.append(len(db))
+        return db
+
+    @dataset_local
+    def local_strategy(db):
+        applied.append(len(db))
+        for ds in db:
+            ds["comment"] = "local"
+        return db
+
+    obj = LCIImporter("PCB")
+    obj.data = deepcopy(DATA_NO_PARAMS)
+    for ds in obj.data:
+        ds["unit"] = "kg"
+    db = obj.apply_strategies_and_write_database(
+        [global_strategy, normalize_units, local_strategy]
+    )
+
+    assert applied == [2, 1, 1]
+    assert obj.applied_strategies == [
+        "global_strategy",
+        "normalize_units",
+        "local_strategy",
+    ]
+    assert len(db) == 2
+    assert databases["PCB"]["number"] == 2
+    assert {act["unit"] for act in db} == {"kilogram"}
+    assert {act["comment"] for act in db} == {"local"}
+    assert sum(exc["amount"] for act in db for exc in act.exchanges()) == 110
+    assert db.search("unmounted")
+
+
+@bw2test
+def test_apply_strategies_and_write_database_error_keeps_existing_data():
+    from bw2io.utils import dataset_local
+
+    obj = LCIImporter("PCB")
+    obj.data = deepcopy(DATA_NO_PARAMS)
+    obj.write_database()
+    setup = {"inv": [{("PCB", "32aa5ab78beda5b8c8efbc89587de7a5"): 1}], "ia": []}
+    calculation_setups["pcb"] = setup
+
+    @dataset_local
+    def duplicate_code(db):
+        for ds in db:
+            ds["code"] = "same"
+        return db
+
+    obj = LCIImporter("PCB")
+    obj.data = deepcopy(DATA_NO_PARAMS)
+    with pytest.raises(NonuniqueCode):
+        obj.apply_strategies_and_write_database([duplicate_code])
+    assert len(Database("PCB")) == 2
+    assert {act["code"] for act in Database("PCB")} == {
+        "32aa5ab78beda5b8c8efbc89587de7a5",
+        "45cb34db4147e510a2561cceec541f6b",
+    }
+    assert Database("PCB").search("unmounted")
+    assert calculation_setups["pcb"] == setup
+
+
+@bw2test
+def test_write_database_iotable_backend():
+    import bw2calc as bc
+    from bw2data import get_node, prepare_lca_inputs
+    from bw2data.backends import ExchangeDataset
+
+    def matrix():
+        fu, data_objs, _ = prepare_lca_inputs(
+            {get_node(code="32aa5ab78beda5b8c8efbc89587de7a5"): 1}
+        )
+        lca = bc.LCA(fu, data_objs=data_objs)
+        lca.load_lci_data()
+        return sorted(
+            (
+                get_node(id=lca.dicts.product.reversed[row])["code"],
+                get_node(id=lca.dicts.activity.reversed[col])["code"],
+                value,
+            )
+            for (row, col), value in lca.technosphere_matrix.todok().items()
+        )
+
+    data = deepcopy(DATA_NO_PARAMS)
+    data[0]["exchanges"].pop(1)
+
+    obj = LCIImporter("PCB")
+    obj.data = deepcopy(data)
+    obj.write_database()
+    expected = matrix()
+    del databases["PCB"]
+
+    obj = LCIImporter("PCB")
+    obj.data = deepcopy(data)
+    db = obj.write_database(backend="iotable")
+    assert databases["PCB"]["backend"] == "iotable"
+    assert len(db) == 2
+    assert (
+        not ExchangeDataset.select()
+        .where(ExchangeDataset.output_database == "PCB")
+        .count()
+    )
+    assert matrix() == expected
+
+
+@bw2test
+def test_write_database_iotable_backend_errors():
+    obj = LCIImporter("PCB")
+    obj.data = deepcopy(DATA_NO_PARAMS)
+    with pytest.raises(ValueError):
+        obj.write_database(backend="iotable", delete_existing=False)
+    with pytest.raises(ValueError):
+        obj.write_database(backend="iotable", activate_parameters=True)
+    obj.write_database()
+    with pytest.raises(ValueError):
+        obj.write_database(backend="iotable")
+
+
+def _parallel_test_data():
+    return [
+        {
+            "name": f"activity {i}",
+            "unit": "kg",
+            "location": "GLO",
+            "database": "PCB",
+            "code": str(i),
+            "synonyms": ["a", None],
+            "exchanges": [
+                {
+                    "name": f"activity {(i + 1) % 20}",
+                    "unit": "kg",
+                    "location": "GLO",
+                    "type": "technosphere",
+                    "amount": -2.0,
+                    "uncertainty type": 2,
+                    "loc": 0,
+                    "scale": 0.5,
+                },
+                {
+                    "name": "Carbon dioxide",
+                    "unit": "kg",
+                    "location": "GLO",
+                    "type": "biosphere",
+                    "amount": 1.0,
+                    "uncertainty type": 0,
+                },
+            ],
+        }
+        for i in range(20)
+    ]
+
+
+def test_apply_strategies_in_parallel():
+    from functools import partial
+
+    from bw2io.strategies import (
+        delete_none_synonyms,
+        link_iterable_by_fields,
+        normalize_units,
+        set_lognormal_loc_value,
+        strip_biosphere_exc_locations,
+    )
+
+    strategies = [
+        normalize_units,
+        strip_biosphere_exc_locations,
+        partial(link_iterable_by_fields, internal=True, edge_kinds=["technosphere"]),
+        set_lognormal_loc_value,
+        delete_none_synonyms,
+    ]
+
+    serial = LCIImporter("PCB")
+    serial.data = _parallel_test_data()
+    serial.apply_strategies(strategies)
+
+    parallel = LCIImporter("PCB")
+    parallel.data = _parallel_test_data()
+    parallel.apply_strategies(strategies, processes=2)
+
+    assert parallel.data == serial.data
+    assert parallel.applied_strategies == serial.applied_strategies
+    assert parallel.data[0]["exchanges"][0]["input"] == ("PCB", "1")
+    assert parallel.data[0]["unit"] == "kilogram"
+
+
+def test_apply_strategies_in_parallel_unpicklable_strategy():
+    from bw2io.utils import dataset_local
+
+    @dataset_local
+    def local_function(db):
+        for ds in db:
+            ds["comment"] = "here"
+        return db
+
+    obj = LCIImporter("PCB")
+    obj.data = _parallel_test_data()
+    obj.apply_strategies([local_function], processes=2)
+    assert obj.applied_strategies == ["local_function"]
+    assert all(ds["comment"] == "here" for ds in obj.data)
+
+
 def test_update_activity_parameters(lci):
     lci.write_project_parameters()
     lci.write_database(activate_parameters=True)
@@ -772,3 +1040,143 @@ def test_create_new_database_for_flows_with_missing_top_level_context_new_databa
     assert importer.data[0]["exchanges"][0]["input"] == placeholder_node.key
     assert importer.data[0]["exchanges"][1]["input"] == placeholder_node.key
     assert not any("input" in exc for exc in importer.data[0]["exchanges"][2:])
+
+
+def test_statistics_and_all_linked(capsys):
+    obj = LCIImporter("foo")
+    obj.data = [
+        {
+            "type": "process",
+            "exchanges": [
+                {"type": "production", "input": ("foo", "a")},
+                {"type": "biosphere", "input": ("bio", "b")},
+                {"type": "technosphere", "name": "c"},
+            ],
+        },
+        {
+            "type": "multifunctional",
+            "exchanges": [{"type": "production", "functional": True}],
+        },
+    ]
+    assert obj.statistics(print_stats=False) == (2, 4, 1, 1)
+    assert obj.statistics() == (2, 4, 1, 1)
+    output = capsys.readouterr().out
+    assert "\tfoo: 1\n\tbio: 1\n" in output
+    assert "(1 total)" in output
+    assert not obj.all_linked
+    # The statistics explain why the data isn't linked
+    assert "(1 total)" in capsys.readouterr().out
+
+    obj.data[0]["exchanges"][2]["input"] = ("foo", "c")
+    assert obj.all_linked
+    assert capsys.readouterr().out == ""
+
+
+def test_unlinked_index(monkeypatch):
+    from bw2io.importers import base
+    from bw2io.strategies import link_iterable_by_fields
+
+    obj = LCIImporter("foo")
+    obj.data = [
+        {
+            "name": "a",
+            "database": "foo",
+            "code": "a",
+            "exchanges": [
+                {"name": "b", "type": "technosphere"},
+                {"name": "b", "type": "technosphere"},
+                {"name": "c", "type": "technosphere"},
+            ],
+        }
+    ]
+    assert sorted(exc["name"] for exc in obj.unlinked) == ["b", "c"]
+    index = obj.unlinked_index
+    assert len(index) == 2 and index.total == 3
+    assert obj.unlinked_index is index
+
+    # Linking in place doesn't need a rebuild
+    obj.data[0]["exchanges"][2]["input"] = ("foo", "c")
+    assert [exc["name"] for exc in obj.unlinked] == ["b"]
+    assert obj.unlinked_index is index
+
+    # Reading the index doesn't scan or hash the edges
+    hashed = []
+    monkeypatch.setattr(
+        base, "activity_hash", lambda *args, **kwargs: hashed.append(args)
+    )
+    for _ in range(3):
+        assert len(obj.unlinked_index) == 1
+        assert [exc["name"] for exc in obj.unlinked] == ["b"]
+    assert not hashed
+    monkeypatch.undo()
+
+    # Changing an unlinked edge in place must be signalled
+    obj.data[0]["exchanges"][0]["name"] = "d"
+    obj.refresh_unlinked()
+    assert sorted(exc["name"] for exc in obj.unlinked) == ["b", "d"]
+    assert obj.unlinked_index is not index
+    obj.data[0]["exchanges"][0]["name"] = "b"
+    obj.refresh_unlinked()
+    index = obj.unlinked_index
+
+    # Replacing the data rebuilds the index
+    obj.data = list(obj.data)
+    assert obj.unlinked_index is not index
+    index = obj.unlinked_index
+
+    # New data does
+    obj.data.append(
+        {"name": "b", "database": "foo", "code": "b", "exchanges": []},
+    )
+    assert obj.unlinked_index is not index
+    obj.apply_strategy(
+        functools.partial(link_iterable_by_fields, other=obj.data, fields=["name"]),
+        verbose=False,
+    )
+    assert list(obj.unlinked) == []
+    assert obj.linking_report() == {"link_iterable_by_fields": 1}
+    (edges,) = obj.linked_by_strategy["link_iterable_by_fields"].values()
+    assert [exc["input"] for exc in edges] == [("foo", "b"), ("foo", "b")]
+
+
+def test_diagnostics(tmp_path, capsys):
+    from bw2io.strategies import delete_ghost_exchanges
+
+    obj = LCIImporter("foo")
+    obj.data = [
+        {
+            "filename": "a",
+            "exchanges": [
+                {"type": "technosphere", "name": "b", "input": ("foo", "b")},
+                {"type": "technosphere", "name": "c", "location": ("x", "y")},
+            ],
+        }
+    ]
+    obj.apply_strategy(delete_ghost_exchanges, verbose=False)
+    assert obj.data[0]["exchanges"] == [
+        {"type": "technosphere", "name": "b", "input": ("foo", "b")}
+    ]
+    assert "importer's `diagnostics`" in capsys.readouterr().out
+    assert len(obj.diagnostics) == 1
+    assert obj.diagnostics.counts() == {
+        ("delete_ghost_exchanges", "purged-unlinked-exchange"): 1
+    }
+    assert obj.diagnostics.filter(kind="other") == []
+    (record,) = obj.diagnostics.filter(source="delete_ghost_exchanges")
+    assert record[3:] == (
+        "a",
+        {"type": "technosphere", "name": "c", "location": ("x", "y")},
+    )
+
+    filepath = obj.diagnostics.to_jsonl(tmp_path / "diagnostics.jsonl")
+    with open(filepath, encoding="utf-8") as f:
+        lines = [json.loads(line) for line in f]
+    assert lines == [
+        {
+            "source": "delete_ghost_exchanges",
+            "kind": "purged-unlinked-exchange",
+            "message": "Purging unlinked exchange",
+            "dataset": "a",
+            "obj": {"type": "technosphere", "name": "c", "location": ["x", "y"]},
+        }
+    ]
@@ -0,0 +1,144 @@
+import json
+
+from bw2data import Database, databases, get_node, projects
+from bw2data.tests import bw2test
+
+from bw2io import bulk
+from bw2io.bulk import append_nodes, project_nodes, upsert_nodes
+
+
+@bw2test
+def test_append_nodes():
+    bio = Database("bio")
+    bio.write(
+        {
+            ("bio", "a"): {
+                "name": "a",
+                "categories": ("air",),
+                "type": "emission",
+                "unit": "kg",
+            }
+        }
+    )
+    assert project_nodes("bio") == (("a",),)
+
+    data = [
+        {"code": "a", "name": "changed", "type": "emission", "database": "other"},
+        {
+            "code": "b",
+            "name": "b",
+            "categories": ("water",),
+            "type": "emission",
+            "location": "CH",
+        },
+        {"code": "b", "name": "duplicate", "type": "emission"},
+        {
+            "code": "c",
+            "name": "c",
+            "unit": "kg",
+            "type": "process",
+            "exchanges": [
+                {"input": ("bio", "c"), "amount": 1, "type": "production"},
+                {"input": ("bio", "b"), "amount": 2, "type": "biosphere"},
+            ],
+        },
+    ]
+    added = append_nodes(bio, data)
+    assert [ds["code"] for ds in added] == ["b", "c"]
+    assert sorted(project_nodes("bio", ("code", "name"))) == [
+        ("a", "a"),
+        ("b", "b"),
+        ("c", "c"),
+    ]
+    assert databases["bio"]["number"] == 3
+    assert not databases["bio"]["dirty"]
+    node = get_node(database="bio", code="c")
+    assert node["type"] == "processwithreferenceproduct"
+    assert sorted(exc["amount"] for exc in node.exchanges()) == [1, 2]
+    assert get_node(database="bio", code="b")["categories"] == ("water",)
+    assert [node["code"] for node in bio.search("b")] == ["b"]
+    assert append_nodes(bio, data) == []
+
+
+@bw2test
+def test_project_nodes_cache_is_bounded():
+    for index in range(bulk.PROJECTION_CACHE_SIZE + 2):
+        name = "db{}".format(index)
+        Database(name).write({(name, "a"): {"name": "a", "type": "emission"}})
+        assert project_nodes(name) == (("a",),)
+    assert len(bulk._projections) == bulk.PROJECTION_CACHE_SIZE
+    assert not any(key[1] == "db0" for key in bulk._projections)
+
+    Database("db5").delete(warn=False)
+    assert not any(key[1] == "db5" for key in bulk._projections)
+    del databases["db6"]
+    assert not any(key[1] == "db6" for key in bulk._projections)
+    assert any(key[1] == "db7" for key in bulk._projections)
+
+    projects.set_current("another project")
+    assert not bulk._projections
+
+
+@bw2test
+def test_upsert_nodes_ignores_edge_order():
+    db = Database("db")
+    exchanges = [
+        {"input": ("db", "a"), "amount": 1, "type": "production"},
+        {"input": ("db", "b"), "amount": 2, "type": "technosphere"},
+        {"input": ("db", "b"), "amount": 3, "type": "technosphere"},
+    ]
+    db.write(
+        {
+            ("db", "a"): {"name": "a", "exchanges": exchanges},
+            ("db", "b"): {"name": "b", "exchanges": []},
+        }
+    )
+    data = [
+        {
+            "database": "db",
+            "code": "a",
+            "name": "a",
+            "exchanges": [dict(exc, output=("db", "a")) for exc in exchanges[::-1]],
+        }
+    ]
+    assert upsert_nodes(db, data) == {"inserted": 0, "updated": 0, "unchanged": 1}
+
+    data[0]["exchanges"][0]["amount"] = 4
+    assert upsert_nodes(db, data) == {"inserted": 0, "updated": 1, "unchanged": 0}
+
+
+@bw2test
+def test_bulk_writes_record_revisions_in_sourced_project():
+    projects.dataset.set_sourced()
+    revisions = projects.dataset.dir / "revisions"
+
+    def count():
+        # Revisions with nodes; metadata changes are recorded too
+        return sum(
+            any(
+                delta["type"] == "lci_node"
+                for delta in json.loads(path.read_text())["data"]
+            )
+            for path in revisions.glob("*.rev")
+        )
+
+    bio = Database("bio")
+    bio.register()
+    node = {"name": "a", "type": "emission", "unit": "kg", "database": "bio"}
+    append_nodes(bio, [dict(node, code="a")])
+    assert count() == 1
+    assert append_nodes(bio, [dict(node, code="a")]) == []
+    assert count() == 1
+
+    counts = upsert_nodes(bio, [dict(node, code="a", name="changed")])
+    assert counts["updated"] == 1
+    assert count() == 2
+    upsert_nodes(bio, [dict(node, code="a", name="changed")])
+    assert count() == 2
+
+    bulk.write_nodes_pipelined(bio, iter([dict(node, code="b")]))
+    assert count() == 3
+    assert projects.dataset.revision is not None
+
+    upsert_nodes(bio, [dict(node, code="c")], signal=False)
+    assert count() == 3
@@ -0,0 +1,455 @@
+import gzip
+import json
+import shutil
+import threading
+from pathlib import Path
+
+import bw2data as bd
+import openpyxl
+import pytest
+from bw2data.tests import bw2test
+
+import bw2io
+import bw2io.extractors.ecospold2 as ecospold2_extractor
+from bw2io import ecoinvent
+
+# For the download shim and the matching of misspelled flow names
+needs_ecoinvent_interface = pytest.mark.skipif(
+    ecoinvent.ei is None, reason="`ecoinvent_interface` isn't installed"
+)
+
+FIXTURES = Path(__file__).parent / "fixtures"
+SPOLD = "00000_11111111-2222-3333-4444-555555555555_66666666-7777-8888-9999-000000000000.spold"
+
+ELEMENTARY_EXCHANGES = """<?xml version="1.0" encoding="utf-8"?>
+<validElementaryExchanges xmlns="http://www.EcoInvent.org/EcoSpold02">{}
+</validElementaryExchanges>
+"""
+FLOWS = {
+    "water": """
+  <elementaryExchange id="075e433b-4be4-448e-9510-9a5029c1ce94" unitId="de5b3c87-0e35-4fb0-9765-4f3ba34c99e5">
+    <name xml:lang="en">Water</name>
+    <unitName xml:lang="en">m3</unitName>
+    <compartment subcompartmentId="7011f0aa-f5f9-4901-8c10-884ad8296812">
+      <compartment xml:lang="en">air</compartment>
+      <subcompartment xml:lang="en">unspecified</subcompartment>
+    </compartment>
+  </elementaryExchange>""",
+    "carbon dioxide": """
+  <elementaryExchange id="11111111-4be4-448e-9510-9a5029c1ce94" unitId="de5b3c87-0e35-4fb0-9765-4f3ba34c99e5">
+    <name xml:lang="en">Carbon dioxide</name>
+    <unitName xml:lang="en">kg</unitName>
+    <compartment subcompartmentId="7011f0aa-f5f9-4901-8c10-884ad8296813">
+      <compartment xml:lang="en">air</compartment>
+      <subcompartment xml:lang="en">urban air close to ground</subcompartment>
+    </compartment>
+  </elementaryExchange>""",
+}
+
+INTERMEDIATE_EXCHANGES = """<?xml version="1.0" encoding="utf-8"?>
+<validIntermediateExchanges xmlns="http://www.EcoInvent.org/EcoSpold02">
+  <intermediateExchange id="11111111-2222-3333-4444-555555555555"><name xml:lang="en">a</name><unitName xml:lang="en">kg</unitName></intermediateExchange>
+  <intermediateExchange id="66666666-7777-8888-9999-000000000000"><name xml:lang="en">b</name><unitName xml:lang="en">kg</unitName></intermediateExchange>
+  <intermediateExchange id="d4ee8f39-342b-4443-bbb9-c49b6801b5d6"><name xml:lang="en">concrete block</name><unitName xml:lang="en">kg</unitName></intermediateExchange>
+</validIntermediateExchanges>
+"""
+
+
+def make_release(dirpath: Path, flows=("water", "carbon dioxide")) -> Path:
+    """Create a minimal ecospold2 release with one dataset, which emits water."""
+    (dirpath / "datasets").mkdir(parents=True)
+    (dirpath / "MasterData").mkdir()
+    shutil.copy(FIXTURES / "ecospold2" / SPOLD, dirpath / "datasets" / SPOLD)
+    (dirpath / "MasterData" / "ElementaryExchanges.xml").write_text(
+        ELEMENTARY_EXCHANGES.format("".join(FLOWS[flow] for flow in flows)),
+        encoding="utf-8",
+    )
+    (dirpath / "MasterData" / "IntermediateExchanges.xml").write_text(
+        INTERMEDIATE_EXCHANGES, encoding="utf-8"
+    )
+    return dirpath
+
+
+def make_lcia_workbook(filepath: Path) -> Path:
+    """Create an LCIA workbook with one impact category."""
+    workbook = openpyxl.Workbook()
+    units = workbook.active
+    units.title = "units"
+    units.append(("Method", "Category", "Indicator", "Indicator Unit"))
+    units.append(("IPCC", "climate change", "GWP100", "kg CO2-Eq"))
+    cfs = workbook.create_sheet("CFs")
+    cfs.append(
+        (
+            "Method",
+            "Category",
+            "Indicator",
+            "Name",
+            "Compartment",
+            "Subcompartment",
+            "CF",
+        )
+    )
+    for row in (
+        ("Carbon dioxide", "air", "urban air close to ground", 1),
+        ("Water", "air", "unspecified", 0.5),
+        ("Methane", "air", "unspecified", None),
+    ):
+        cfs.append(("IPCC", "climate change", "GWP100") + row)
+    workbook.save(filepath)
+    return filepath
+
+
+@pytest.fixture
+def releases(tmp_path, monkeypatch):
+    """Serve two local system model releases instead of downloading them."""
+    # Only the master data of the later system model has all biosphere flows
+    paths = {
+        "cutoff": make_release(tmp_path / "cutoff", flows=("water",)),
+        "apos": make_release(tmp_path / "apos"),
+    }
+    lcia_file = make_lcia_workbook(tmp_path / "lcia.xlsx")
+
+    class Release:
+        def __init__(self, settings):
+            pass
+
+        def list_versions(self):
+            return ["3.9"]
+
+        def list_system_models(self, version):
+            return list(paths)
+
+        def get_release(self, version, system_model, release_type):
+            return paths[system_model]
+
+    monkeypatch.setattr(ecoinvent.ei, "EcoinventRelease", Release)
+    monkeypatch.setattr(
+        ecoinvent.ei,
+        "get_excel_lcia_file_for_version",
+        lambda release, version: lcia_file,
+    )
+    # The fixture flows need no migrations, and writing them takes long
+    monkeypatch.setattr(bw2io, "create_core_migrations", lambda: None)
+    return paths
+
+
+def import_releases(system_models, **kwargs):
+    return ecoinvent.import_ecoinvent_releases(
+        "3.9", system_models, username="user", password="pass", **kwargs
+    )
+
+
+def snapshot() -> tuple:
+    """Return the nodes and edges of all databases, and the CFs of all methods."""
+    nodes = {
+        node.key: (
+            node["name"],
+            node.get("product_information"),
+            sorted(
+                (exc.input.key, exc["amount"], exc["type"]) for exc in node.exchanges()
+            ),
+        )
+        for name in bd.databases
+        for node in bd.Database(name)
+    }
+    methods = {
+        method: sorted(
+            (bd.get_node(id=id_).key, cf) for id_, cf in bd.Method(method).load()
+        )
+        for method in bd.methods
+    }
+    return nodes, methods
+
+
+@bw2test
+@needs_ecoinvent_interface
+def test_import_releases_use_mp_overlaps_stages(releases, monkeypatch):
+    started = {
+        name: threading.Event() for name in ("read_lcia_workbook", "_parse_biosphere")
+    }
+
+    def recorded(name):
+        func = getattr(ecoinvent, name)
+
+        def wrapper(*args):
+            started[name].set()
+            return func(*args)
+
+        return wrapper
+
+    for name in started:
+        monkeypatch.setattr(ecoinvent, name, recorded(name))
+
+    extract_lci = ecoinvent._extract_lci
+
+    def extract(*args):
+        # The workbook and the biosphere flows are parsed during the extraction
+        assert all(event.wait(timeout=30) for event in started.values())
+        return extract_lci(*args)
+
+    monkeypatch.setattr(ecoinvent, "_extract_lci", extract)
+
+    contexts = []
+    process_pool_context = ecospold2_extractor.process_pool_context
+
+    def context():
+        contexts.append(process_pool_context())
+        return contexts[-1]
+
+    monkeypatch.setattr(ecospold2_extractor, "process_pool_context", context)
+    import_releases(["cutoff", "apos"], use_mp=True, concurrent=True)
+    # Forking while the worker threads run can deadlock
+    assert len(contexts) == 2
+    assert all(context.get_start_method() != "fork" for context in contexts)
+    assert len(bd.Database("ecoinvent-3.9-apos")) == 1
+    assert len(bd.methods) == 1
+
+
+def test_master_data_cache(tmp_path):
+    for name, text in (("a", "same"), ("b", "same"), ("c", "different")):
+        (tmp_path / name).write_text(text)
+    calls = []
+
+    def parse(filepath):
+        calls.append(filepath.name)
+        return object()
+
+    cache = ecoinvent._MasterDataCache(parse)
+    first = cache(tmp_path / "a")
+    # Same contents
+    assert cache(tmp_path / "b") is first
+    assert cache(tmp_path / "a") is first
+    # Different contents
+    assert cache(tmp_path / "c") is not first
+    assert calls == ["a", "c"]
+    assert [filepath.name for filepath, _ in cache.parsed] == ["a", "c"]
+
+
+@bw2test
+def test_extract_and_link_lci(tmp_path):
+    release = make_release(tmp_path / "cutoff")
+    biosphere = ecoinvent._parse_biosphere(
+        release / "MasterData" / "ElementaryExchanges.xml", "bio"
+    )
+    assert sorted(flow["name"] for flow in biosphere.data) == [
+        "Carbon dioxide",
+        "Water",
+    ]
+    ecoinvent._write_biosphere(biosphere, "bio", "patch")
+
+    metadata = ecoinvent._MasterDataCache(ecoinvent._read_technosphere_metadata)
+    soup = ecoinvent._extract_lci(release, "lci", "bio", metadata, None, False, False)
+    assert len(metadata.parsed) == 1
+    ((ds,),) = [soup.data]
+    assert ds["name"] == "concrete block production"
+    assert not soup.all_linked
+
+    assert ecoinvent._link_lci(soup) is soup
+    assert soup.all_linked
+    assert {exc["input"][0] for exc in ds["exchanges"]} == {"bio", "lci"}
+
+
+@bw2test
+def test_link_lci_unlinked(tmp_path):
+    release = make_release(tmp_path / "cutoff", flows=("carbon dioxide",))
+    ecoinvent._write_biosphere(
+        ecoinvent._parse_biosphere(
+            release / "MasterData" / "ElementaryExchanges.xml", "bio"
+        ),
+        "bio",
+        "patch",
+    )
+    soup = ecoinvent._extract_lci(
+        release,
+        "lci",
+        "bio",
+        ecoinvent._MasterDataCache(ecoinvent._read_technosphere_metadata),
+        None,
+        False,
+        False,
+    )
+    with pytest.raises(ValueError, match="unlinked flows"):
+        ecoinvent._link_lci(soup)
+
+
+@bw2test
+@needs_ecoinvent_interface
+@pytest.mark.parametrize("concurrent", [True, False])
+def test_import_releases_matches_single_imports(releases, monkeypatch, concurrent):
+    parsed = []
+
+    def recorded(func):
+        def wrapper(filepath, *args):
+            parsed.append((func.__name__, filepath.parent.parent.name))
+            return func(filepath, *args)
+
+        return wrapper
+
+    for name in ("_parse_biosphere", "_read_technosphere_metadata"):
+        monkeypatch.setattr(ecoinvent, name, recorded(getattr(ecoinvent, name)))
+
+    bd.projects.set_current("single")
+    for system_model, lcia in (("cutoff", False), ("apos", True)):
+        ecoinvent.import_ecoinvent_release(
+            "3.9",
+            system_model,
+            username="user",
+            password="pass",
+            lcia=lcia,
+            use_mp=False,
+        )
+    expected = snapshot()
+    parsed.clear()
+
+    bd.projects.set_current("several")
+    timer = import_releases(["cutoff", "apos"], use_mp=False, concurrent=concurrent)
+    assert snapshot() == expected
+    assert sorted(bd.databases) == [
+        "ecoinvent-3.9-apos",
+        "ecoinvent-3.9-biosphere",
+        "ecoinvent-3.9-cutoff",
+    ]
+    assert len(bd.Database("ecoinvent-3.9-biosphere")) == 2
+    ((method, cfs),) = expected[1].items()
+    assert method == ("ecoinvent-3.9", "IPCC", "climate change", "GWP100")
+    assert len(cfs) == 2
+
+    # The technosphere master data are the same for both system models, the
+    # biosphere master data differ
+    assert sorted(parsed) == [
+        ("_parse_biosphere", "apos"),
+        ("_parse_biosphere", "cutoff"),
+        ("_read_technosphere_metadata", "cutoff"),
+    ]
+    assert "parse biosphere (2)" in timer.timings
+
+
+def test_read_lcia_workbook_cache(tmp_path, monkeypatch):
+    filepath = make_lcia_workbook(tmp_path / "lcia.xlsx")
+    cache_file = tmp_path / "lcia.xlsx.json.gz"
+    units, cfs = ecoinvent.read_lcia_workbook(filepath, "3.9")
+    assert units["unit"] == ["kg CO2-Eq"]
+    assert cfs["cf"] == [1, 0.5, None]
+    assert cache_file.is_file()
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "lcia.xlsx",
+        "lcia.xlsx.json.gz",
+    ]
+
+    def extract_columns(*args, **kwargs):
+        raise AssertionError("Workbook read again")
+
+    with monkeypatch.context() as m:
+        m.setattr(ecoinvent.ExcelExtractor, "extract_columns", extract_columns)
+        assert ecoinvent.read_lcia_workbook(filepath, "3.9") == (units, cfs)
+
+    # The workbook changes
+    workbook = openpyxl.load_workbook(filepath)
+    workbook["CFs"]["G2"] = 2
+    workbook.save(filepath)
+    units, cfs = ecoinvent.read_lcia_workbook(filepath, "3.9")
+    assert cfs["cf"] == [2, 0.5, None]
+    with monkeypatch.context() as m:
+        m.setattr(ecoinvent.ExcelExtractor, "extract_columns", extract_columns)
+        assert ecoinvent.read_lcia_workbook(filepath, "3.9") == (units, cfs)
+
+
+@pytest.mark.parametrize(
+    "content",
+    [b"", b"not gzip", gzip.compress(b"[1, 2")],
+    ids=["empty", "not-gzip", "truncated"],
+)
+def test_read_lcia_workbook_corrupt_cache(tmp_path, content):
+    filepath = make_lcia_workbook(tmp_path / "lcia.xlsx")
+    cache_file = tmp_path / "lcia.xlsx.json.gz"
+    cache_file.write_bytes(content)
+    units, cfs = ecoinvent.read_lcia_workbook(filepath, "3.9")
+    assert cfs["cf"] == [1, 0.5, None]
+    # Replaced with a valid cache
+    with gzip.open(cache_file, "rt") as f:
+        assert json.load(f)["cfs"] == cfs
+
+
+def test_read_lcia_workbook_unwritable_cache(tmp_path, monkeypatch):
+    filepath = make_lcia_workbook(tmp_path / "lcia.xlsx")
+
+    def mkstemp(*args, **kwargs):
+        raise PermissionError("Read-only directory")
+
+    monkeypatch.setattr(ecoinvent.tempfile, "mkstemp", mkstemp)
+    units, cfs = ecoinvent.read_lcia_workbook(filepath, "3.9")
+    assert cfs["cf"] == [1, 0.5, None]
+    assert [path.name for path in tmp_path.iterdir()] == ["lcia.xlsx"]
+
+
+@bw2test
+@needs_ecoinvent_interface
+def test_link_lcia(capsys):
+    bd.Database("bio").write(
+        {
+            ("bio", "co2"): {
+                "name": "Carbon dioxide",
+                "categories": ("air", "urban air close to ground"),
+            },
+            ("bio", "water"): {"name": "Water", "categories": ("air",)},
+            ("bio", "ch4"): {"name": "Methane, fossil", "categories": ("air",)},
+            ("bio", "so2"): {"name": "[Deleted]Sulfur dioxide", "categories": ("air",)},
+        }
+    )
+    ids = {code: bd.get_node(code=code).id for code in ("co2", "water", "ch4", "so2")}
+    units = {
+        "method": ["IPCC", "CML"],
+        "category": ["climate change", "acidification"],
+        "indicator": ["GWP100", "AP"],
+        "unit": ["kg CO2-Eq", "kg SO2-Eq"],
+    }
+    gwp, ap = ("IPCC", "climate change", "GWP100"), ("CML", "acidification", "AP")
+    rows = [
+        gwp + ("Carbon dioxide", "air", "urban air close to ground", 1),
+        gwp + ("Water", "air", "unspecified", 0.5),
+        # Misspelled
+        gwp + ("Methane, fosil", "air", "unspecified", 30),
+        gwp + ("Unobtainium", "air", "unspecified", 1),
+        gwp + ("Methane, fossil", "air", "unspecified", None),
+        ap + ("Sulfur dioxide", "air", "unspecified", 1.2),
+    ]
+    cfs = dict(zip(ecoinvent.LCIA_CF_COLUMNS + ("cf",), map(list, zip(*rows))))
+
+    cfs_by_category, units_mapping = ecoinvent._link_lcia(
+        units, cfs, "3.9", "bio", True
+    )
+    assert units_mapping == {
+        ("ecoinvent-3.9", "IPCC", "climate change", "GWP100"): "kg CO2-Eq",
+        ("ecoinvent-3.9", "CML", "acidification", "AP"): "kg SO2-Eq",
+    }
+    assert dict(cfs_by_category) == {
+        ("ecoinvent-3.9", "IPCC", "climate change", "GWP100"): [
+            (ids["co2"], 1.0),
+            (ids["water"], 0.5),
+            (ids["ch4"], 30.0),
+        ],
+        ("ecoinvent-3.9", "CML", "acidification", "AP"): [(ids["so2"], 1.2)],
+    }
+    out = capsys.readouterr().out
+    assert "Substituting Methane, fossil for Methane, fosil" in out
+    assert "Skipping unmatched flow Unobtainium" in out
+
+    cfs_by_category, units_mapping = ecoinvent._link_lcia(
+        units, cfs, "3.9", "bio", False
+    )
+    assert sorted(units_mapping) == [
+        ("CML", "acidification", "AP"),
+        ("IPCC", "climate change", "GWP100"),
+    ]
+    assert sorted(cfs_by_category) == sorted(units_mapping)
+
+
+def test_import_release_without_ecoinvent_interface(monkeypatch):
+    monkeypatch.setattr(ecoinvent, "ei", None)
+    # Load the function lazily again, and drop it from the package afterwards
+    monkeypatch.setitem(vars(bw2io), "import_ecoinvent_release", None)
+    monkeypatch.delitem(vars(bw2io), "import_ecoinvent_release")
+    with pytest.warns(UserWarning, match="install `ecoinvent_interface`"):
+        bw2io.import_ecoinvent_release("3.9", "cutoff")
+    with pytest.raises(ImportError, match="install `ecoinvent_interface`"):
+        ecoinvent.import_ecoinvent_releases("3.9", ["cutoff"])
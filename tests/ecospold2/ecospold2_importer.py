@@ -59,4 +59,15 @@ def test_importer_signals():
     imp = SingleOutputEcospold2Importer(FIXTURES, "ei", signal=catcher)
     imp.apply_strategies()
 
-    assert catcher.messages == [(i, 22) for i in range(1, 23)]
+    assert catcher.messages == [(i, 20) for i in range(1, 21)]
+
+
+@bw2test
+def test_importer_technosphere_metadata():
+    imp = SingleOutputEcospold2Importer(
+        FIXTURES,
+        "ei",
+        use_mp=False,
+        technosphere_metadata={"11111111-2222-3333-4444-555555555555": "Some info"},
+    )
+    assert {ds["product_information"] for ds in imp.data} == {"Some info"}
@@ -1,5 +1,6 @@
 import os
 
+import pytest
 from bw2data import Database, Method, config, get_node, methods
 from bw2data.tests import bw2test
 
@@ -24,6 +25,22 @@ def test_excel_lcia_extraction():
     assert ExcelExtractor.extract(fp) == expected
 
 
+def test_excel_lcia_extract_columns():
+    fp = os.path.join(EXCEL_FIXTURES_DIR, "lcia.xlsx")
+    expected = {
+        "name": ["Aluminium", "Uranium ore, 1.11 GJ per kg"],
+        "amount": [42, 1000000],
+    }
+    assert ExcelExtractor.extract_columns(fp, "Sheet1", ["Name", "amount"]) == expected
+    assert ExcelExtractor.extract_columns(fp, "Sheet1") == dict(
+        expected, categories=["Resource::in ground", "Resource"]
+    )
+    with pytest.raises(ValueError):
+        ExcelExtractor.extract_columns(fp, "Sheet1", ["name", "unit"])
+    with pytest.raises(ValueError):
+        ExcelExtractor.extract_columns(fp, "Sheet2")
+
+
 @bw2test
 def test_import_initial_data():
     fp = os.path.join(EXCEL_FIXTURES_DIR, "lcia.xlsx")
@@ -234,3 +234,29 @@ def test_excel_export_no_params(setup):
     ProjectParameter.delete().execute()
     assert not ProjectParameter.select().count()
     write_lci_csv("example")
+
+
+def test_write_lci_csv_objs(setup):
+    objs = [Database("example").get("B")]
+    given = CSVExtractor.extract(
+        write_lci_csv("example", objs=objs, sections=["activities", "exchanges"])
+    )[1]
+    expected = [
+        ["Activity", "Another activity"],
+        ["code", "B"],
+        ["location", "here"],
+        ["this", "that"],
+        ["Exchanges"],
+        ["name", "amount", "location", "type"],
+        ["Another activity", "10", "here", "production"],
+        [],
+    ]
+    assert given == expected
+
+
+def test_write_lci_csv_empty_objs(setup):
+    given = CSVExtractor.extract(write_lci_csv("example", objs=[]))[1]
+    expected = CSVExtractor.extract(os.path.join(CSV_FIXTURES_DIR, "complicated.csv"))[
+        1
+    ]
+    assert given == expected
@@ -0,0 +1,69 @@
+from pathlib import Path
+
+from lxml import etree
+
+from bw2io.export import ecospold1
+from bw2io.export.ecospold1 import (
+    Ecospold1Exporter,
+    StreamingEcospold1Exporter,
+    write_datasets_to_files,
+)
+from bw2io.extractors.ecospold1 import Ecospold1DataExtractor
+
+FIXTURE = (
+    Path(__file__).parent.parent
+    / "fixtures"
+    / "ecospold1"
+    / "Acrylonitrile-butadiene-styrene copolymer (ABS), resin, at plant CTR.xml"
+)
+
+
+def datasets():
+    data = Ecospold1DataExtractor.extract(FIXTURE, "db", use_mp=False)
+    for ds in data:
+        ds.setdefault("tags", []).append(("ecoSpold01timestamp", "2020-01-01T00:00:00"))
+        for exc in ds["exchanges"]:
+            exc.setdefault(
+                "type", "biosphere" if exc.get("categories") else "technosphere"
+            )
+            exc.setdefault("categories", ("",))
+    return data * 3
+
+
+def test_streaming_export_same_as_in_memory(tmp_path):
+    data = datasets()
+    exporter = Ecospold1Exporter()
+    for ds in data:
+        exporter.add_dataset(ds)
+    exporter.write_to_file(tmp_path / "memory.xml")
+
+    with StreamingEcospold1Exporter(tmp_path / "streaming.xml") as streaming:
+        for ds in data:
+            streaming.add_dataset(ds)
+
+    assert streaming.count == 3
+    assert (tmp_path / "memory.xml").read_bytes() == (
+        tmp_path / "streaming.xml"
+    ).read_bytes()
+
+
+def test_write_datasets_to_files(tmp_path):
+    filepaths = write_datasets_to_files(datasets(), tmp_path, use_mp=False)
+    assert [fp.name.split("_")[0] for fp in filepaths] == ["1", "2", "3"]
+    for number, fp in enumerate(filepaths, start=1):
+        (dataset,) = etree.parse(str(fp)).getroot()
+        assert dataset.get("number") == str(number)
+
+
+def test_write_datasets_to_files_in_batches(tmp_path, monkeypatch):
+    monkeypatch.setattr(ecospold1, "WRITE_BATCH_SIZE", 2)
+
+    def nodes():
+        for index, ds in enumerate(datasets() * 4):
+            # At most two batches are read before their files are written
+            assert len(list(tmp_path.iterdir())) >= (index // 2 - 1) * 2
+            yield ds
+
+    filepaths = write_datasets_to_files(nodes(), tmp_path, use_mp=True)
+    assert [int(fp.name.split("_")[0]) for fp in filepaths] == list(range(1, 13))
+    assert sorted(tmp_path.iterdir()) == sorted(filepaths)
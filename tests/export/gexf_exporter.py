@@ -0,0 +1,136 @@
+import csv
+
+import pytest
+from bw2data import Database
+from bw2data.backends.schema import ExchangeDataset
+from bw2data.tests import bw2test
+from lxml import etree
+from lxml.builder import ElementMaker
+
+from bw2io.export.gexf import (
+    GEXF_NAMESPACE,
+    GRAPHML_NAMESPACE,
+    DatabaseSelectionToGEXF,
+    DatabaseToGEXF,
+)
+
+
+@pytest.fixture
+@bw2test
+def setup():
+    Database("bio").write({("bio", "f"): {"name": "flow", "type": "emission"}})
+    Database("db").write(
+        {
+            ("db", "a"): {
+                "name": "A & co",
+                "categories": ["x", "y"],
+                "exchanges": [
+                    {"input": ("db", "a"), "amount": 1, "type": "production"},
+                    {"input": ("db", "b"), "amount": 0.5, "type": "technosphere"},
+                    {"input": ("db", "c"), "amount": 2, "type": "technosphere"},
+                    {"input": ("bio", "f"), "amount": 3, "type": "biosphere"},
+                ],
+            },
+            ("db", "b"): {
+                "name": "B",
+                "exchanges": [
+                    {"input": ("db", "b"), "amount": 1, "type": "production"},
+                    {"input": ("db", "c"), "amount": -4, "type": "technosphere"},
+                ],
+            },
+            ("db", "c"): {"name": "C", "exchanges": []},
+        }
+    )
+
+
+def graph(filepath, namespace, node_label):
+    root = etree.parse(filepath).getroot()
+    ns = {"g": namespace}
+    labels = {
+        node.get("id"): node_label(node, ns) for node in root.iterfind(".//g:node", ns)
+    }
+    edges = {
+        (labels[edge.get("source")], labels[edge.get("target")])
+        for edge in root.iterfind(".//g:edge", ns)
+    }
+    return sorted(labels.values()), edges
+
+
+def gexf_label(node, ns):
+    return node.get("label"), node.find("g:attvalues/g:attvalue", ns).get("value")
+
+
+def graphml_label(node, ns):
+    return tuple(data.text or "" for data in node.iterfind("g:data", ns))
+
+
+def test_gexf_export(setup):
+    filepath = DatabaseToGEXF("db").export()
+    assert filepath.endswith("db.gexf")
+    nodes, edges = graph(filepath, GEXF_NAMESPACE, gexf_label)
+    assert nodes == [("A & co", "x-y"), ("B", ""), ("C", "")]
+    assert edges == {
+        (("B", ""), ("A & co", "x-y")),
+        (("C", ""), ("A & co", "x-y")),
+        (("C", ""), ("B", "")),
+    }
+
+
+def test_gexf_export_threshold(setup):
+    filepath = DatabaseToGEXF("db").export(threshold=1)
+    _, edges = graph(filepath, GEXF_NAMESPACE, gexf_label)
+    assert edges == {(("C", ""), ("A & co", "x-y")), (("C", ""), ("B", ""))}
+
+
+def test_graphml_export(setup):
+    filepath = DatabaseToGEXF("db").export("graphml", threshold=3)
+    assert filepath.endswith("db.graphml")
+    nodes, edges = graph(filepath, GRAPHML_NAMESPACE, graphml_label)
+    assert nodes == [("A & co", "x-y"), ("B", ""), ("C", "")]
+    assert edges == {(("C", ""), ("B", ""))}
+
+
+def test_edgelist_export(setup):
+    filepath = DatabaseToGEXF("db").export("edgelist")
+    with open(filepath) as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == ["source", "target", "weight"]
+    assert sorted(rows[1:]) == [["b", "a", "0.5"], ["c", "a", "2"], ["c", "b", "-4"]]
+
+
+def test_export_unknown_format(setup):
+    with pytest.raises(ValueError):
+        DatabaseToGEXF("db").export("dot")
+
+
+def test_selection_export(setup):
+    filepath = DatabaseSelectionToGEXF("db", {("db", "a"), ("db", "c")}).export()
+    assert filepath.endswith("db.selection.gexf")
+    nodes, edges = graph(filepath, GEXF_NAMESPACE, gexf_label)
+    assert nodes == [("A & co", "x-y"), ("C", "")]
+    assert edges == {(("C", ""), ("A & co", "x-y"))}
+
+
+def test_get_data(setup):
+    E = ElementMaker(namespace=GEXF_NAMESPACE, nsmap={None: GEXF_NAMESPACE})
+    nodes, edges = DatabaseToGEXF("db").get_data(E)
+    assert len(nodes) == 3
+    assert len(edges) == 3
+
+
+def test_gexf_export_skips_orphan_edges(setup):
+    ExchangeDataset.create(
+        data={
+            "input": ("db", "c"),
+            "output": ("db", "gone"),
+            "amount": 1,
+            "type": "technosphere",
+        },
+        input_database="db",
+        input_code="c",
+        output_database="db",
+        output_code="gone",
+        type="technosphere",
+    )
+    _, edges = graph(DatabaseToGEXF("db").export(), GEXF_NAMESPACE, gexf_label)
+    assert len(edges) == 3
@@ -0,0 +1,99 @@
+import csv
+
+import numpy as np
+import pytest
+import scipy.io
+import scipy.sparse
+from bw2data import Database, get_id
+from bw2data.tests import bw2test
+
+from bw2io.export.matrices import LABEL_COLUMNS, lci_matrices, write_lci_matrices
+
+
+@pytest.fixture
+@bw2test
+def setup():
+    Database("bio").write(
+        {
+            ("bio", "co2"): {
+                "name": "CO2",
+                "unit": "kg",
+                "categories": ("air", "urban"),
+                "type": "emission",
+            }
+        }
+    )
+    Database("tech").write(
+        {
+            ("tech", "a"): {
+                "name": "A",
+                "reference product": "a",
+                "unit": "kg",
+                "location": "CH",
+                "exchanges": [
+                    {"input": ("tech", "a"), "amount": 1, "type": "production"},
+                    {"input": ("tech", "b"), "amount": 2, "type": "technosphere"},
+                    {"input": ("bio", "co2"), "amount": 3, "type": "biosphere"},
+                ],
+            },
+            ("tech", "b"): {
+                "name": "B",
+                "unit": "kWh",
+                "exchanges": [
+                    {"input": ("tech", "b"), "amount": 1, "type": "production"},
+                ],
+            },
+        }
+    )
+
+
+def test_lci_matrices(setup):
+    data = lci_matrices("tech")
+    products = {row[1]: row[0] for row in data["products"]}
+    activities = {row[1]: row[0] for row in data["activities"]}
+    a, b, co2 = get_id(("tech", "a")), get_id(("tech", "b")), get_id(("bio", "co2"))
+
+    tm = data["technosphere"].toarray()
+    assert tm[products[a], activities[a]] == 1
+    assert tm[products[b], activities[a]] == -2
+    assert tm[products[b], activities[b]] == 1
+    assert data["biosphere"].toarray()[0, activities[a]] == 3
+    assert data["biosphere flows"] == [
+        (0, co2, "bio", "co2", "CO2", None, "kg", None, "air::urban")
+    ]
+    assert sorted(row[2:6] for row in data["activities"]) == [
+        ("tech", "a", "A", "a"),
+        ("tech", "b", "B", None),
+    ]
+
+
+def test_write_lci_matrices_formats(setup, tmp_path):
+    expected = lci_matrices("tech")
+
+    dirpath = write_lci_matrices("tech", "mtx", tmp_path)
+    assert dirpath == tmp_path / "lci-matrices-tech"
+    given = scipy.io.mmread(dirpath / "technosphere.mtx")
+    assert np.allclose(given.toarray(), expected["technosphere"].toarray())
+
+    dirpath = write_lci_matrices("tech", "npz", tmp_path)
+    given = scipy.sparse.load_npz(dirpath / "biosphere.npz")
+    assert np.allclose(given.toarray(), expected["biosphere"].toarray())
+    with open(dirpath / "biosphere-flows.csv") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == list(LABEL_COLUMNS)
+    assert rows[1][4] == "CO2"
+
+
+def test_write_lci_matrices_parquet(setup, tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    dirpath = write_lci_matrices("tech", "parquet", tmp_path)
+    table = pq.read_table(dirpath / "technosphere.parquet").to_pydict()
+    assert sorted(table["value"]) == [-2, 1, 1]
+    assert pq.read_table(dirpath / "activities.parquet").num_rows == 2
+
+
+def test_write_lci_matrices_errors(setup, tmp_path):
+    with pytest.raises(ValueError):
+        write_lci_matrices("tech", "xlsx", tmp_path)
+    with pytest.raises(ValueError):
+        write_lci_matrices("missing", "npz", tmp_path)
@@ -0,0 +1,102 @@
+from bw2data import Database
+from bw2data.tests import bw2test
+
+from bw2io.modified_database import ModifiedDatabase
+
+
+def background():
+    Database("bio").write(
+        {("bio", "co2"): {"name": "CO2", "categories": ("air",), "unit": "kg"}}
+    )
+    Database("ref").write(
+        {
+            ("ref", code): {
+                "name": code,
+                "unit": "kg",
+                "location": "GLO",
+                "exchanges": [
+                    {"input": ("ref", code), "amount": 1, "type": "production"}
+                ]
+                + [
+                    {"input": ("ref", other), "amount": 2, "type": "technosphere"}
+                    for other in inputs
+                ]
+                + [{"input": ("bio", "co2"), "amount": 3, "type": "biosphere"}],
+            }
+            for code, inputs in {"a": "bd", "b": "c", "c": "", "d": ""}.items()
+        }
+    )
+
+
+def foreground():
+    data = []
+    for code, inputs in {"a": "bd", "b": "c", "c": "", "d": ""}.items():
+        ds = {
+            "database": "fg",
+            "code": code,
+            "name": code,
+            "unit": "kg",
+            "location": "GLO",
+        }
+        ds["exchanges"] = (
+            [dict(ds, input=("fg", code), amount=1, type="production")]
+            + [
+                dict(
+                    name=other,
+                    unit="kg",
+                    location="GLO",
+                    input=("fg", other),
+                    amount=2,
+                    type="technosphere",
+                )
+                for other in inputs
+            ]
+            + [
+                {
+                    "name": "CO2",
+                    "categories": ("air",),
+                    "unit": "kg",
+                    "input": ("bio", "co2"),
+                    "amount": 4 if code == "c" else 3,
+                    "type": "biosphere",
+                }
+            ]
+        )
+        for exc in ds["exchanges"]:
+            exc.pop("exchanges", None)
+        data.append(ds)
+    return data
+
+
+@bw2test
+def test_modified_database_diff():
+    background()
+    md = ModifiedDatabase(foreground(), "ref")
+    md.load_datasets()
+    assert not list(md.iterate_unmatched())
+
+    ((key, metadata, added, removed),) = md.iterate_modified()
+    assert metadata["code"] == "c"
+    assert [(obj["reason"], obj["exchange"]["amount"]) for obj in added] == [
+        ("New amount: 4 to 3", 4)
+    ]
+    assert [(obj["reason"], obj["exchange"]["amount"]) for obj in removed] == [
+        ("New amount: 3 to 4", 3)
+    ]
+
+
+@bw2test
+def test_modified_database_prune():
+    background()
+    md = ModifiedDatabase(foreground(), "ref")
+    kept = md.prune()
+
+    # ``c`` is modified, and ``b`` and ``a`` consume it; ``d`` is the same
+    assert sorted(ds["code"] for ds in kept) == ["a", "b", "c"]
+    (a,) = [ds for ds in kept if ds["code"] == "a"]
+    assert sorted(exc["input"] for exc in a["exchanges"]) == [
+        ("bio", "co2"),
+        ("fg", "a"),
+        ("fg", "b"),
+        ("ref", "d"),
+    ]
@@ -1,3 +1,10 @@
+from pathlib import Path
+
+from bw2data import projects
+from bw2data.tests import bw2test
+
+from bw2io.importers import SimaProCSVImporter
+
 # # from .fixtures.simapro_reference import background as background_data
 # import os
 # import sys
@@ -336,3 +343,14 @@
 
 
 # # # Test multiple background DBs
+
+
+@bw2test
+def test_simapro_extraction_records_no_diagnostics():
+    logs = set(Path(projects.logs_dir).iterdir())
+    importer = SimaProCSVImporter(
+        Path(__file__).parent / "fixtures" / "simapro" / "inventory.csv"
+    )
+    # Nothing went wrong, so there is nothing to record or log
+    assert not importer.diagnostics.records
+    assert set(Path(projects.logs_dir).iterdir()) == logs
@@ -1,13 +1,22 @@
+import numpy as np
+import pytest
+from bw2data import Database
+from bw2data.tests import bw2test
 from stats_arrays import LognormalUncertainty, UndefinedUncertainty
 
+from bw2io.bulk import project_nodes
 from bw2io.strategies.ecospold2 import (
     add_cpc_classification_from_single_reference_product,
+    delete_exchanges_missing_activity,
     delete_none_synonyms,
     drop_temporary_outdated_biosphere_flows,
     fix_unreasonably_high_lognormal_uncertainties,
+    link_biosphere_by_flow_uuid,
+    normalize_lognormal_uncertainties,
     remove_uncertainty_from_negative_loss_exchanges,
     reparametrize_lognormal_to_agree_with_static_amount,
     set_lognormal_loc_value,
+    update_social_flows_in_older_consequential,
 )
 
 
@@ -389,3 +398,121 @@ def test_delete_none_synonyms():
 
 if __name__ == "__main__":
     test_delete_none_synonyms()
+
+
+@bw2test
+def test_link_biosphere_by_flow_uuid():
+    Database("bio").write(
+        {
+            ("bio", "a"): {"name": "a", "type": "emission"},
+            ("bio", "residual"): {"name": "residual wood, dry", "type": "emission"},
+        }
+    )
+    db = [
+        {
+            "exchanges": [
+                {"type": "biosphere", "flow": "a", "name": "a"},
+                {"type": "biosphere", "flow": "b", "name": "b"},
+                {"type": "technosphere", "flow": "a", "name": "a"},
+                {"type": "biosphere", "name": "residual wood, dry"},
+            ]
+        }
+    ]
+    db = link_biosphere_by_flow_uuid(db, "bio")
+    db = update_social_flows_in_older_consequential(db, Database("bio"))
+    assert [exc.get("input") for exc in db[0]["exchanges"]] == [
+        ("bio", "a"),
+        None,
+        None,
+        ("bio", "residual"),
+    ]
+
+
+@bw2test
+def test_project_nodes():
+    db = Database("bio")
+    db.write({("bio", "a"): {"name": "a", "categories": ("air",), "type": "emission"}})
+    rows = project_nodes("bio", ("code", "categories", "name"))
+    assert rows == (("a", ("air",), "a"),)
+    assert project_nodes("bio", ("code", "categories", "name")) is rows
+    assert project_nodes("missing") == ()
+
+    db.new_node(code="b", name="b", type="emission").save()
+    assert sorted(project_nodes("bio")) == [("a",), ("b",)]
+
+
+def _uncertain_exchanges(seed):
+    rng = np.random.default_rng(seed)
+    db = []
+    for i in range(50):
+        exchanges = [
+            {
+                "type": "production",
+                "name": f"p{i}",
+                "amount": 1.0,
+                "uncertainty type": 0,
+            }
+        ]
+        for _ in range(40):
+            exchanges.append(
+                {
+                    "type": "technosphere",
+                    "name": f"p{i}" if rng.random() < 0.2 else "other",
+                    "amount": float(rng.normal() * 10.0 ** rng.integers(-5, 5)),
+                    "uncertainty type": int(rng.choice([0, 2, 2, 3])),
+                    "scale": float(rng.random() * 4),
+                    "loc": 0.0,
+                }
+            )
+        db.append({"exchanges": exchanges})
+    return db
+
+
+@pytest.mark.parametrize("reparametrize", [False, True])
+def test_normalize_lognormal_uncertainties_same_as_sequential(reparametrize):
+    expected = _uncertain_exchanges(42)
+    expected = remove_uncertainty_from_negative_loss_exchanges(expected)
+    expected = fix_unreasonably_high_lognormal_uncertainties(expected)
+    if reparametrize:
+        expected = reparametrize_lognormal_to_agree_with_static_amount(expected)
+    else:
+        expected = set_lognormal_loc_value(expected)
+
+    result = normalize_lognormal_uncertainties(
+        _uncertain_exchanges(42), reparametrize=reparametrize
+    )
+    # Exact equality, including `loc` values
+    assert result == expected
+
+
+@bw2test
+def test_delete_exchanges_missing_activity_writes_log(capsys):
+    db = [
+        {
+            "filename": "a.spold",
+            "exchanges": [
+                {"type": "technosphere", "name": "unlinked"},
+                {"type": "technosphere", "name": "linked", "input": ("db", "b")},
+                {"type": "biosphere", "name": "unlinked"},
+            ],
+        },
+        {"filename": "b.spold", "exchanges": [{"type": "production", "name": "c"}]},
+    ]
+    result = delete_exchanges_missing_activity(db)
+    assert [[exc["name"] for exc in ds["exchanges"]] for ds in result] == [
+        ["linked", "unlinked"],
+        [],
+    ]
+    output = capsys.readouterr().out
+    assert "2 exchanges couldn't be linked" in output
+    logfile = output.strip().split("\t")[-1]
+    with open(logfile, encoding="utf-8") as f:
+        content = f.read()
+    assert content.count("Purging unlinked exchange:") == 2
+    assert "Filename: b.spold" in content
+
+
+def test_delete_exchanges_missing_activity_no_issues(capsys):
+    db = [{"filename": "a", "exchanges": [{"type": "technosphere", "input": 1}]}]
+    assert delete_exchanges_missing_activity(db) == db
+    assert capsys.readouterr().out == ""
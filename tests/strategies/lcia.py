@@ -1,15 +1,17 @@
 import unittest
 
-from bw2data import Database
-from bw2data.tests import BW2DataTest
+from bw2data import Database, projects
+from bw2data.tests import BW2DataTest, bw2test
 
 from bw2io.strategies import (
     add_activity_hash_code,
     drop_unlinked_cfs,
+    lcia,
     match_subcategories,
     rationalize_method_names,
     set_biosphere_type,
 )
+from bw2io.strategies.lcia import subcategory_expansion_table
 
 
 class LCIATestCase(unittest.TestCase):
@@ -595,3 +597,80 @@ def test_rationalize_method_names_unneeded_total():
         {"name": ("f", "g", "bar")},
     ]
     assert rationalize_method_names(given) == expected
+
+
+@bw2test
+def test_subcategory_expansion_table_cache():
+    db = Database("b")
+    db.write(
+        {
+            ("b", "first"): {
+                "categories": ("air", "urban air close to ground"),
+                "name": "Boron trifluoride",
+                "type": "emission",
+                "unit": "kilogram",
+            },
+            ("b", "second"): {
+                "categories": ("air",),
+                "name": "Boron trifluoride",
+                "type": "emission",
+                "unit": "kilogram",
+            },
+        }
+    )
+    table = subcategory_expansion_table("b")
+    assert list(table) == [("air", "Boron trifluoride", "kilogram")]
+    assert subcategory_expansion_table("b") is table
+
+    data = [
+        {
+            "name": "Some LCIA method",
+            "exchanges": [
+                {
+                    "name": "Boron trifluoride",
+                    "categories": ("air",),
+                    "unit": "kilogram",
+                    "amount": 1,
+                }
+            ],
+        }
+    ]
+    match_subcategories(data, "b")
+    assert "amount" not in table[("air", "Boron trifluoride", "kilogram")][0]
+
+    db.new_node(
+        code="third",
+        categories=("air", "lower stratosphere"),
+        name="Boron trifluoride",
+        type="emission",
+        unit="kilogram",
+    ).save()
+    new_table = subcategory_expansion_table("b")
+    assert new_table is not table
+    assert len(new_table[("air", "Boron trifluoride", "kilogram")]) == 2
+
+
+@bw2test
+def test_subcategory_expansion_table_cache_is_bounded():
+    for index in range(lcia.SUBCATEGORY_CACHE_SIZE + 2):
+        name = "bio{}".format(index)
+        Database(name).write(
+            {
+                (name, "a"): {
+                    "categories": ("air", "urban air close to ground"),
+                    "name": "a",
+                    "type": "emission",
+                    "unit": "kilogram",
+                }
+            }
+        )
+        subcategory_expansion_table(name)
+    assert len(lcia._subcategory_tables) == lcia.SUBCATEGORY_CACHE_SIZE
+    assert not any(key[1] == "bio0" for key in lcia._subcategory_tables)
+
+    Database("bio3").delete(warn=False)
+    assert not any(key[1] == "bio3" for key in lcia._subcategory_tables)
+    assert any(key[1] == "bio4" for key in lcia._subcategory_tables)
+
+    projects.set_current("another project")
+    assert not lcia._subcategory_tables
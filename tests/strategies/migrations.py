@@ -1,8 +1,16 @@
+import os
+
 import pytest
+from bw2data import projects
 from bw2data.tests import bw2test
 
 from bw2io.errors import MissingMigration
-from bw2io.strategies import migrate_datasets, migrate_exchanges
+from bw2io.migrations import (
+    COMPILED_MIGRATION_CACHE_SIZE,
+    Migration,
+    _compiled_migrations,
+)
+from bw2io.strategies import migrate_datasets, migrate_exchanges, migrate_many
 
 
 @bw2test
@@ -15,3 +23,88 @@ def test_migrate_exchanges_missing_migration():
 def test_migrate_datasets_missing_migration():
     with pytest.raises(MissingMigration):
         migrate_datasets([], "foo")
+
+
+def _migration_test_data():
+    return [
+        {
+            "name": "a",
+            "unit": "kg",
+            "exchanges": [
+                {"name": "b", "unit": "kg", "amount": 2},
+                {"name": "c", "unit": "m3", "amount": 3},
+            ],
+        }
+    ]
+
+
+@bw2test
+def test_migrate_many_same_as_sequential():
+    Migration("first").write(
+        {
+            "fields": ["name"],
+            "data": [
+                [["a"], {"name": "a2"}],
+                [["b"], {"name": "b2", "multiplier": 10}],
+            ],
+        },
+        "first",
+    )
+    Migration("second").write(
+        {
+            "fields": ["name", "unit"],
+            "data": [
+                [["b2", "kg"], {"unit": "g", "multiplier": 1000}],
+                [["a2", "kg"], {"categories": ["x"]}],
+            ],
+        },
+        "second",
+    )
+    expected = _migration_test_data()
+    for name in ["first", "second"]:
+        expected = migrate_datasets(expected, name)
+        expected = migrate_exchanges(expected, name)
+
+    result = migrate_many(
+        _migration_test_data(), ["first", "second"], datasets=True, exchanges=True
+    )
+    assert result == expected
+    assert result[0]["name"] == "a2" and result[0]["categories"] == ["x"]
+    assert result[0]["exchanges"][0]["amount"] == 20000
+
+
+@bw2test
+def test_migrate_many_missing_migration():
+    data = _migration_test_data()
+    with pytest.raises(MissingMigration):
+        migrate_many(data, ["foo"])
+    assert data == _migration_test_data()
+
+
+@bw2test
+def test_compiled_migration_cache():
+    migration = Migration("first")
+    migration.write({"fields": ["name"], "data": [[["b"], {"name": "b2"}]]}, "")
+    compiled = migration.compiled()
+    assert Migration("first").compiled() is compiled
+
+    migration.write({"fields": ["name"], "data": [[["b"], {"name": "b3"}]]}, "")
+    assert migration.compiled() is not compiled
+    data = migrate_exchanges(_migration_test_data(), "first")
+    assert data[0]["exchanges"][0]["name"] == "b3"
+
+
+@bw2test
+def test_compiled_migration_cache_is_bounded():
+    paths = []
+    for index in range(COMPILED_MIGRATION_CACHE_SIZE + 2):
+        migration = Migration("m{}".format(index))
+        migration.write({"fields": ["name"], "data": [[["b"], {"name": "b2"}]]}, "")
+        migration.compiled()
+        paths.append(os.path.join(migration._intermediate_dir, migration.filename))
+    assert len(_compiled_migrations) == COMPILED_MIGRATION_CACHE_SIZE
+    assert paths[0] + ".json" not in _compiled_migrations
+    assert paths[-1] + ".json" in _compiled_migrations
+
+    projects.set_current("another project")
+    assert not _compiled_migrations
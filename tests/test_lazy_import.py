@@ -0,0 +1,52 @@
+import subprocess
+import sys
+
+import pytest
+
+import bw2io
+from bw2io.migrations import _Migrations
+from bw2io.unlinked_data import _UnlinkedData
+
+
+def test_import_is_lazy():
+    code = (
+        "import sys, bw2io; "
+        "print(sorted(name for name in sys.modules if name.split('.')[0] in "
+        "('bw2data', 'bw2io', 'scipy', 'numpy')))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == "['bw2io']"
+
+
+def test_public_names_resolve():
+    for name in bw2io.__all__:
+        assert getattr(bw2io, name) is not None
+    assert "ExcelImporter" in dir(bw2io)
+
+
+def test_submodules_dont_shadow_objects():
+    import bw2io.migrations
+    import bw2io.unlinked_data
+    from bw2io import migrations, unlinked_data
+
+    assert isinstance(migrations, _Migrations)
+    assert isinstance(unlinked_data, _UnlinkedData)
+    assert isinstance(bw2io.migrations, _Migrations)
+
+
+def test_submodule_attribute():
+    assert bw2io.strategies.migrate_many
+
+
+def test_missing_attribute():
+    with pytest.raises(AttributeError):
+        bw2io.does_not_exist
+
+
+def test_bw2data_aliases():
+    import bw2data
+
+    assert bw2io.databases is bw2data.databases
+    assert bw2io.config is bw2data.config
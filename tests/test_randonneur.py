@@ -1,3 +1,5 @@
+import warnings
+from copy import deepcopy
 from pathlib import Path
 
 import pytest
@@ -61,3 +63,116 @@ def test_rn_error():
                 FIXTURES_DIR / "randonneur-matching-template-test-fixture.xlsx"
             ),
         )
+
+
+def _datapackage(name, verb, data, graph_context=None):
+    dp = rn.Datapackage(
+        name=name,
+        description="",
+        contributors=[{"title": "test", "roles": ["author"], "path": "test"}],
+        mapping_source=rn.MappingConstants.SIMAPRO_CSV,
+        mapping_target=rn.MappingConstants.SIMAPRO_CSV,
+        graph_context=graph_context,
+    )
+    dp.add_data(verb, data)
+    return dp
+
+
+def test_randonneur_many():
+    data = [
+        {
+            "name": "foo",
+            "unit": "a",
+            "exchanges": [{"name": "foo", "unit": "bq", "amount": 1}, {"unit": "kbq"}],
+        }
+    ]
+    first = _datapackage(
+        "first",
+        "update",
+        [{"source": {"name": "foo"}, "target": {"name": "bar"}}],
+        ["edges", "nodes"],
+    )
+    units = _datapackage(
+        "units",
+        "update",
+        [
+            {"source": {"unit": "bq"}, "target": {"unit": "Becquerel"}},
+            {"source": {"unit": "kbq"}, "target": {"unit": "kilo Becquerel"}},
+        ],
+    )
+    second = _datapackage(
+        "second",
+        "update",
+        [{"source": {"name": "bar", "unit": "Becquerel"}, "target": {"unit": "Bq"}}],
+    )
+
+    imp = LCIImporter("test")
+    imp.data = deepcopy(data)
+    for transformation in [first, units, second]:
+        imp.randonneur(datapackage=transformation, migrate_nodes=True)
+    expected = imp.data
+
+    imp = LCIImporter("test")
+    imp.data = deepcopy(data)
+    report = imp.randonneur_many([first, units, second], migrate_nodes=True)
+    assert imp.data == expected
+    assert imp.data[0]["name"] == "bar"
+    assert imp.data[0]["exchanges"][0] == {"name": "bar", "unit": "Bq", "amount": 1}
+    assert [(row["transformation"], row["context"], row["hits"]) for row in report] == [
+        ("first", "edges", 1),
+        ("first", "nodes", 1),
+        ("units", "edges", 2),
+        ("units", "nodes", 0),
+        ("second", "edges", 1),
+        ("second", "nodes", 0),
+    ]
+
+
+def test_randonneur_many_registry_label():
+    imp = LCIImporter("test")
+    imp.data = [{"unit": "a", "exchanges": [{"unit": "bq"}]}]
+    report = imp.randonneur_many(["generic-brightway-units-normalization"])
+    assert imp.data == [{"unit": "a", "exchanges": [{"unit": "Becquerel"}]}]
+    assert report[0]["hits"] == 1
+
+
+def test_randonneur_refreshes_unlinked():
+    disaggregate = _datapackage(
+        "disaggregate",
+        "disaggregate",
+        [
+            {
+                "source": {"name": "foo"},
+                "targets": [
+                    {"name": "bar", "allocation": 0.25},
+                    {"name": "baz", "allocation": 0.75},
+                ],
+            }
+        ],
+    )
+    for method in ("randonneur", "randonneur_many"):
+        imp = LCIImporter("test")
+        imp.data = [{"name": "a", "exchanges": [{"name": "foo", "amount": 4}]}]
+        assert [exc["name"] for exc in imp.unlinked] == ["foo"]
+        if method == "randonneur":
+            imp.randonneur(datapackage=disaggregate)
+        else:
+            imp.randonneur_many([disaggregate])
+        assert sorted(exc["name"] for exc in imp.unlinked) == ["bar", "baz"]
+
+
+def test_randonneur_many_warns_create_without_node_filter():
+    create = _datapackage("create", "create", [{"target": {"name": "new"}}])
+    imp = LCIImporter("test")
+    imp.data = [{"name": "a", "exchanges": []}, {"name": "b", "exchanges": []}]
+    with pytest.warns(UserWarning, match="node_filter"):
+        imp.randonneur_many([create], verbs=["create"])
+    assert [len(ds["exchanges"]) for ds in imp.data] == [1, 1]
+
+    imp.data = [{"name": "a", "exchanges": []}, {"name": "b", "exchanges": []}]
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        imp.randonneur_many(
+            [create], verbs=["create"], node_filter=lambda node: node["name"] == "a"
+        )
+    assert [len(ds["exchanges"]) for ds in imp.data] == [1, 0]
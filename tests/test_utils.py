@@ -1,4 +1,6 @@
 import math
+import multiprocessing
+import threading
 
 import pytest
 from stats_arrays import (
@@ -12,10 +14,19 @@ from stats_arrays import (
 
 from bw2io.errors import UnsupportedExchange
 from bw2io.utils import (
+    TRANSIENT_HASH,
     activity_hash,
+    activity_hash_memo,
+    allocated_copy,
+    allocated_exchange,
+    copy_containers,
+    dataset_local,
     es2_activity_hash,
     format_for_logging,
+    intern_strings,
+    is_dataset_local,
     load_json_data_file,
+    process_pool_context,
     rescale_exchange,
     standardize_method_to_len_3,
 )
@@ -48,12 +59,110 @@ def test_activity_hash():
     assert activity_hash(ds) == "d2b18b4f9f9f88189c82224ffa524e93"
 
 
+def test_activity_hash_transient_algorithm():
+    ds = {"name": "care bears", "unit": "kilogram", "location": "GLO"}
+    transient = activity_hash(ds, algorithm=TRANSIENT_HASH)
+    assert len(transient) == 32
+    assert transient != activity_hash(ds)
+    assert transient == activity_hash(
+        {"name": "Care Bears", "unit": "kilogram", "location": "GLO"},
+        algorithm=TRANSIENT_HASH,
+    )
+
+
+def test_activity_hash_memo():
+    ds = {"name": "Care bears", "categories": ("toys", "fun"), "unit": "kilogram"}
+    expected = activity_hash(ds)
+    with activity_hash_memo():
+        assert activity_hash(ds) == expected
+        assert activity_hash(ds) == expected
+        assert activity_hash(ds, case_insensitive=False) != expected
+        assert activity_hash(ds, algorithm=TRANSIENT_HASH) != expected
+        # Changed values give a new key
+        ds["name"] = "Care Bears"
+        assert activity_hash(ds) == expected
+        ds["categories"] = ["toys", "fun"]
+        assert activity_hash(ds) == expected
+        ds["unit"] = "gram"
+        assert activity_hash(ds) != expected
+
+
 def test_format_for_logging():
     ds = {"name": "care bears", "unit": "kilogram", "location": "GLO"}
     answer = "{'location': 'GLO', 'name': 'care bears', 'unit': 'kilogram'}"
     assert format_for_logging(ds) == answer
 
 
+def test_dataset_local():
+    from functools import partial
+
+    from bw2io.strategies import link_iterable_by_fields, normalize_units
+
+    @dataset_local
+    def func(db, foo=None):
+        return db
+
+    assert func([1]) == [1]
+    assert is_dataset_local(func)
+    assert is_dataset_local(partial(func, foo=1))
+    assert is_dataset_local(normalize_units)
+    assert not is_dataset_local(link_iterable_by_fields)
+
+
+def test_process_pool_context():
+    default = multiprocessing.get_context()
+    if threading.active_count() == 1:
+        assert process_pool_context() is default
+
+    stop = threading.Event()
+    thread = threading.Thread(target=stop.wait)
+    thread.start()
+    try:
+        context = process_pool_context()
+    finally:
+        stop.set()
+        thread.join()
+    if default.get_start_method() == "fork":
+        assert context.get_start_method() in ("forkserver", "spawn")
+    else:
+        assert context is default
+
+
+def test_intern_strings():
+    data = [
+        {
+            "unit": "".join(["kilo", "gram"]),
+            "categories": ("air", "".join(["ur", "ban"])),
+        },
+        {
+            "unit": "".join(["kilo", "gram"]),
+            "categories": ("air", "".join(["ur", "ban"])),
+        },
+    ]
+    assert data[0]["unit"] is not data[1]["unit"]
+    result = intern_strings(data)
+    assert result is data
+    assert data == [
+        {"unit": "kilogram", "categories": ("air", "urban")},
+        {"unit": "kilogram", "categories": ("air", "urban")},
+    ]
+    assert data[0]["unit"] is data[1]["unit"]
+    assert data[0]["categories"] is data[1]["categories"]
+
+
+def test_intern_strings_doesnt_merge_equal_numbers():
+    data = [{"a": (1, 2)}, {"a": (1.0, 2.0)}, {"a": True, "b": 1}]
+    intern_strings(data)
+    assert isinstance(data[1]["a"][0], float)
+    assert data[2]["a"] is True
+
+
+def test_intern_strings_max_length():
+    data = ["".join(["a"] * 10), "".join(["a"] * 10)]
+    intern_strings(data, max_length=5)
+    assert data[0] is not data[1]
+
+
 def test_es2_activity_hash():
     ds = ("foo", "bar")
     assert es2_activity_hash(*ds) == "3858f62230ac3c915f300c664312c63f"
@@ -429,3 +538,44 @@ def test_rescale_exchange_uniform_no_amount():
         "maximum": 30,
     }
     assert rescale_exchange(given, 10) == expected
+
+
+def test_copy_containers():
+    categories = ("air", "urban air")
+    given = {
+        "name": "foo",
+        "categories": categories,
+        "properties": {"mass": [1, {"unit": "kg"}]},
+        "pairs": ([1], 2),
+        "tags": {"a"},
+    }
+    copied = copy_containers(given)
+    assert copied == given
+    assert copied["categories"] is categories
+    assert copied["properties"] is not given["properties"]
+    assert copied["properties"]["mass"][1] is not given["properties"]["mass"][1]
+    assert copied["pairs"][0] is not given["pairs"][0]
+    assert copied["tags"] is not given["tags"]
+
+
+def test_allocated_copy():
+    ds = {
+        "name": "foo",
+        "classifications": [("CPC", "1")],
+        "exchanges": [{"amount": 2, "uncertainty type": 0, "flow": {"id": 1}}],
+        "allocations": [1],
+    }
+    exchanges = [allocated_exchange(exc, 0.5) for exc in ds["exchanges"]]
+    new = allocated_copy(ds, exchanges, drop=("allocations",))
+    assert new == {
+        "name": "foo",
+        "classifications": [("CPC", "1")],
+        "exchanges": [
+            {"amount": 1, "loc": 1, "uncertainty type": 0, "flow": {"id": 1}}
+        ],
+    }
+    assert new["exchanges"] is exchanges
+    new["classifications"].append(("ISIC", "2"))
+    new["exchanges"][0]["flow"]["id"] = 2
+    assert ds["classifications"] == [("CPC", "1")]
+    assert ds["exchanges"] == [{"amount": 2, "uncertainty type": 0, "flow": {"id": 1}}]